@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""
+Benchmark the statistics used by the TaskArchiver to summarise the
+performance of a workflow (WMCore.Algorithms.MathAlgos) against the
+former implementation, on random job performance values.
+
+The former createHistogram rescanned the sorted values from the start for
+every bin and getLargestValues sorted the whole list of jobs. Both
+implementations must give the same results.
+
+Example:
+    python benchmarkPerformanceSummary.py --jobs 1000000 --bins 20
+"""
+from __future__ import print_function, division
+
+import math
+import random
+import time
+from argparse import ArgumentParser
+from array import array
+
+from WMCore.Algorithms import MathAlgos
+
+
+def oldCreateHistogram(numList, nBins, limit):
+    """
+    The former MathAlgos.createHistogram
+    """
+    average, stdDev = MathAlgos.getAverageStdDev(numList=numList)
+
+    underflow = []
+    overflow = []
+    histEvents = []
+    histogram = []
+    for value in numList:
+        if math.fabs(average - value) <= limit * stdDev:
+            histEvents.append(value)
+        elif average < value:
+            overflow.append(value)
+        elif average > value:
+            underflow.append(value)
+
+    if len(underflow) > 0:
+        binAvg, binStdDev = MathAlgos.getAverageStdDev(numList=underflow)
+        histogram.append({'type': 'underflow', 'average': binAvg,
+                          'stdDev': binStdDev, 'nEvents': len(underflow)})
+    if len(overflow) > 0:
+        binAvg, binStdDev = MathAlgos.getAverageStdDev(numList=overflow)
+        histogram.append({'type': 'overflow', 'average': binAvg,
+                          'stdDev': binStdDev, 'nEvents': len(overflow)})
+    if len(histEvents) < 1:
+        return histogram
+
+    histEvents.sort()
+    upperBound = max(histEvents)
+    lowerBound = min(histEvents)
+    if lowerBound == upperBound:
+        nBins = 1
+        upperBound = upperBound + 1
+        lowerBound = lowerBound - 1
+    binSize = MathAlgos.floorTruncate((upperBound - lowerBound) / nBins)
+
+    for x in range(nBins):
+        lowerEdge = MathAlgos.floorTruncate(lowerBound + (x * binSize))
+        histogram.append({'type': 'standard', 'lowerEdge': lowerEdge,
+                          'upperEdge': lowerEdge + binSize, 'average': 0.0,
+                          'stdDev': 0.0, 'nEvents': 0})
+
+    for hbin in histogram:
+        if hbin['type'] != 'standard':
+            continue
+        binList = []
+        for value in histEvents:
+            if hbin['lowerEdge'] <= value <= hbin['upperEdge']:
+                binList.append(value)
+            elif value > hbin['upperEdge']:
+                break
+        if len(binList) < 1:
+            continue
+        binAvg, binStdDev = MathAlgos.getAverageStdDev(numList=binList)
+        hbin['average'] = binAvg
+        hbin['stdDev'] = binStdDev
+        hbin['nEvents'] = len(binList)
+
+    return histogram
+
+
+def oldGetLargestValues(dictList, key, n=1):
+    """
+    The former MathAlgos.getLargestValues
+    """
+    return MathAlgos.sortDictionaryListByKey(dictList=dictList, key=key, reverse=True)[:n]
+
+
+def timeIt(func, *args, **kwargs):
+    """
+    Run func, return its result and the elapsed time
+    """
+    start = time.time()
+    result = func(*args, **kwargs)
+    return result, time.time() - start
+
+
+def main():
+    parser = ArgumentParser(description="Benchmark the TaskArchiver performance statistics")
+    parser.add_argument("--jobs", type=int, default=200000, help="Number of jobs (values)")
+    parser.add_argument("--bins", type=int, default=20, help="Number of histogram bins")
+    parser.add_argument("--limit", type=int, default=3, help="Histogram limit in standard deviations")
+    parser.add_argument("--offenders", type=int, default=3, help="Number of worst offenders")
+    parser.add_argument("--seed", type=int, default=1234, help="Random seed")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    rows = [{'jobID': jobID, 'totalJobTime': random.lognormvariate(8, 0.5)}
+            for jobID in range(args.jobs)]
+    values = [row['totalJobTime'] for row in rows]
+    valueArray = array('d', values)
+
+    oldHist, oldHistTime = timeIt(oldCreateHistogram, values, args.bins, args.limit)
+    newHist, newHistTime = timeIt(MathAlgos.createHistogram, valueArray, args.bins, args.limit)
+    if oldHist != newHist:
+        raise RuntimeError("The histograms are different")
+
+    oldTop, oldTopTime = timeIt(oldGetLargestValues, rows, 'totalJobTime', args.offenders)
+    newTop, newTopTime = timeIt(MathAlgos.getLargestValues, rows, 'totalJobTime', args.offenders)
+    if oldTop != newTop:
+        raise RuntimeError("The worst offenders are different")
+
+    print("%d jobs, %d bins" % (args.jobs, args.bins))
+    print("createHistogram:  former %.3fs, current %.3fs" % (oldHistTime, newHistTime))
+    print("getLargestValues: former %.3fs, current %.3fs" % (oldTopTime, newTopTime))
+
+
+if __name__ == '__main__':
+    main()
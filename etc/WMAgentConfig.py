@@ -175,6 +175,8 @@ config.JobAccountant.logLevel = globalLogLevel
 config.JobAccountant.workerThreads = 1
 config.JobAccountant.pollInterval = 300
 config.JobAccountant.specDir = config.General.workDir + "/JobAccountant/SpecCache"
+# number of processes loading the job reports, 0 to load them in the component thread
+config.JobAccountant.accountantProcesses = 0
 
 config.component_("JobCreator")
 config.JobCreator.namespace = "WMComponent.JobCreator.JobCreator"
@@ -189,6 +191,8 @@ config.JobCreator.pollInterval = 120
 config.JobCreator.jobCacheDir = config.General.workDir + "/JobCache"
 config.JobCreator.defaultJobType = "Processing"
 config.JobCreator.workerThreads = 1
+# number of processes creating the jobs of different workflows in parallel, 0 to do it in the component thread
+config.JobCreator.creatorProcesses = 0
 # glidein restrictions used for resource estimation (per core)
 config.JobCreator.GlideInRestriction = {"MinWallTimeSecs": 1 * 3600,  # 1h
                                         "MaxWallTimeSecs": 45 * 3600,  # pilot lifetime is usually 48h
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+Utilities for indexed container files, a JSON index followed by binary
+blobs, as used by the job archives, the compact job reports and the
+pileup configuration:
+
+  <MAGIC> <version> <index length>\\n
+  <JSON index>
+  <blobs>
+
+The index tells where every blob is, relative to the end of the index, so
+readers only need to load the blobs they ask for.
+"""
+
+from __future__ import division
+
+import itertools
+import json
+import os
+
+
+def encodeHeader(magic, version, index):
+    """
+    _encodeHeader_
+
+    First line and JSON index of a container
+    """
+    indexData = json.dumps(index, separators=(',', ':')).encode("utf-8")
+    return ("%s %d %d\n" % (magic, version, len(indexData))).encode("ascii") + indexData
+
+
+def readHeader(handle, magic, maxVersion):
+    """
+    _readHeader_
+
+    Read the header of a container from a file like object (file, mmap,
+    io.BytesIO...) positioned at its beginning. Returns the version, the
+    index and the offset of the first blob. Raises ValueError if it is not
+    a container of the given magic, or if its version is above maxVersion.
+    """
+    firstLine = handle.readline()
+    try:
+        fileMagic, version, indexLength = firstLine.decode("ascii").split()
+        version, indexLength = int(version), int(indexLength)
+    except ValueError:
+        raise ValueError("Malformed %s header" % magic)
+    if fileMagic != magic:
+        raise ValueError("Not a %s container" % magic)
+    if version > maxVersion:
+        raise ValueError("Unsupported %s version %d" % (magic, version))
+
+    index = json.loads(handle.read(indexLength).decode("utf-8"))
+    return version, index, len(firstLine) + indexLength
+
+
+def replaceFile(filename, chunks):
+    """
+    _replaceFile_
+
+    Write the chunks of bytes to a temporary file, then rename it to
+    filename so readers never see a partially written file
+    """
+    tmpFile = "%s.%d.tmp" % (filename, os.getpid())
+    with open(tmpFile, 'wb') as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+    os.rename(tmpFile, filename)
+    return
+
+
+def writeContainer(filename, magic, version, index, blobs):
+    """
+    _writeContainer_
+
+    Atomically write a container with the given index, followed by the blobs
+    """
+    replaceFile(filename, itertools.chain([encodeHeader(magic, version, index)], blobs))
+    return
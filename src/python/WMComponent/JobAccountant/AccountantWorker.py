@@ -22,7 +22,7 @@ from WMCore.ACDC.DataCollectionService import DataCollectionService
 from WMCore.DAOFactory import DAOFactory
 from WMCore.Database.CMSCouch import CouchServer
 from WMCore.FwkJobReport.Report import Report
-from WMCore.JobStateMachine.ChangeState import ChangeState
+from WMCore.JobStateMachine.ChangeState import ChangeState, prepareFWJR
 from WMCore.Lexicon import sanitizeURL
 from WMCore.Services.PhEDEx.PhEDEx import PhEDEx
 from WMCore.Services.WMStats.WMStatsWriter import WMStatsWriter
@@ -40,6 +40,137 @@ class AccountantWorkerException(WMException):
     """
 
 
+def createMissingFWKJR(errorCode=999, errorDescription='Failure of unknown type'):
+    """
+    _createMissingFWJR_
+
+    Create a missing FWJR if the report can't be found by the code in the
+    path location.
+    """
+    report = Report()
+    report.addError("cmsRun1", 84, errorCode, errorDescription)
+    report.data.cmsRun1.status = "Failed"
+    return report
+
+
+def loadJobReport(jobReportPath):
+    """
+    _loadJobReport_
+
+    Given a framework job report on disk, load it and return a
+    FwkJobReport instance.  If there is any problem loading or parsing the
+    framework job report return None.
+    """
+    # The jobReportPath may be prefixed with "file://" which needs to be
+    # removed so it doesn't confuse the FwkJobReport() parser.
+    if not jobReportPath:
+        logging.error("Bad FwkJobReport Path: %s", jobReportPath)
+        return createMissingFWKJR(99999, "FWJR path is empty")
+
+    jobReportPath = jobReportPath.replace("file://", "")
+    if not os.path.exists(jobReportPath):
+        logging.error("Bad FwkJobReport Path: %s", jobReportPath)
+        return createMissingFWKJR(99999, 'Cannot find file in jobReport path: %s' % jobReportPath)
+
+    if os.path.getsize(jobReportPath) == 0:
+        logging.error("Empty FwkJobReport: %s", jobReportPath)
+        return createMissingFWKJR(99998, 'jobReport of size 0: %s ' % jobReportPath)
+
+    jobReport = Report()
+
+    try:
+        jobReport.load(jobReportPath, lazy=True)
+    except Exception as ex:
+        msg = "Error loading jobReport %s\n" % jobReportPath
+        msg += str(ex)
+        logging.error(msg)
+        return createMissingFWKJR(99997, 'Cannot load jobReport')
+
+    if len(jobReport.listSteps()) == 0:
+        logging.error("FwkJobReport with no steps: %s", jobReportPath)
+        return createMissingFWKJR(99997, 'jobReport with no steps: %s ' % jobReportPath)
+
+    return jobReport
+
+
+def extractJobReportFiles(fwkJobReport):
+    """
+    _extractJobReportFiles_
+
+    Get from the job report everything handleJob needs that doesn't
+    depend on the database: whether all steps succeeded, the output files,
+    the logArchive files (all a failed job registers), the skipped files,
+    the steps and the task name.
+    """
+    taskSuccessful = fwkJobReport.taskSuccessful()
+    return {'taskSuccessful': taskSuccessful,
+            'steps': fwkJobReport.listSteps(),
+            'taskName': fwkJobReport.getTaskName(),
+            'allFiles': fwkJobReport.getAllFiles() if taskSuccessful else [],
+            'logArchFiles': fwkJobReport.getAllFilesFromStep(step='logArch1'),
+            'skippedFiles': fwkJobReport.getAllSkippedFiles() if taskSuccessful else []}
+
+
+def prepareJob(job, fwkJobReport=None):
+    """
+    _prepareJob_
+
+    Extract the files of the job report of a completed job, loading the
+    report if it's not given, and prepare the report for the state change
+    (see ChangeState.prepareFWJR). This is the part of the job handling that
+    can run in a separate process, the report itself is left out of the
+    result: pickling it back to the accountant would decode all its sections.
+    """
+    if fwkJobReport is None:
+        fwkJobReport = loadJobReport(job["fwjr_path"])
+
+    preparedJob = dict(job)
+    preparedJob.update(extractJobReportFiles(fwkJobReport))
+    preparedJob['fwjr'] = prepareFWJR(fwkJobReport)
+    return preparedJob
+
+
+def setMergedInPreparedFWJR(fwjrInfo, lfns):
+    """
+    _setMergedInPreparedFWJR_
+
+    Mark output files of a report prepared with prepareFWJR as merged, as
+    addFileToWMBS does in the report itself for merge jobs.
+    """
+    for jsonStep in fwjrInfo["json"]["steps"].values():
+        for jsonFiles in jsonStep["output"].values():
+            for jsonFile in jsonFiles:
+                if jsonFile.get("lfn") in lfns:
+                    jsonFile["merged"] = True
+    return
+
+
+def prepareJobWorker(workInput, results):
+    """
+    _prepareJobWorker_
+
+    Worker process preparing the jobs put in the workInput queue, until it
+    gets a STOP. Jobs that can't be prepared are sent back with the error,
+    so they are prepared (and fail) in the accountant itself.
+    """
+    while True:
+        try:
+            job = workInput.get()
+        except (EOFError, IOError):
+            logging.error("Hit EOF/IO in getting new work, assuming this is a graceful break attempt.")
+            break
+
+        if job == 'STOP':
+            break
+
+        try:
+            results.put(prepareJob(job))
+        except Exception as ex:
+            results.put({'id': job['id'], 'error': str(ex)})
+
+    return
+
+
 class AccountantWorker(WMConnectionBase):
     """
     Class that actually does the work of parsing FWJRs for the Accountant
@@ -157,40 +288,9 @@ class AccountantWorker(WMConnectionBase):
         """
         _loadJobReport_
 
-        Given a framework job report on disk, load it and return a
-        FwkJobReport instance.  If there is any problem loading or parsing the
-        framework job report return None.
+        Load a framework job report, see loadJobReport
         """
-        # The jobReportPath may be prefixed with "file://" which needs to be
-        # removed so it doesn't confuse the FwkJobReport() parser.
-        if not jobReportPath:
-            logging.error("Bad FwkJobReport Path: %s", jobReportPath)
-            return self.createMissingFWKJR(99999, "FWJR path is empty")
-
-        jobReportPath = jobReportPath.replace("file://", "")
-        if not os.path.exists(jobReportPath):
-            logging.error("Bad FwkJobReport Path: %s", jobReportPath)
-            return self.createMissingFWKJR(99999, 'Cannot find file in jobReport path: %s' % jobReportPath)
-
-        if os.path.getsize(jobReportPath) == 0:
-            logging.error("Empty FwkJobReport: %s", jobReportPath)
-            return self.createMissingFWKJR(99998, 'jobReport of size 0: %s ' % jobReportPath)
-
-        jobReport = Report()
-
-        try:
-            jobReport.load(jobReportPath)
-        except Exception as ex:
-            msg = "Error loading jobReport %s\n" % jobReportPath
-            msg += str(ex)
-            logging.error(msg)
-            return self.createMissingFWKJR(99997, 'Cannot load jobReport')
-
-        if len(jobReport.listSteps()) == 0:
-            logging.error("FwkJobReport with no steps: %s", jobReportPath)
-            return self.createMissingFWKJR(99997, 'jobReport with no steps: %s ' % jobReportPath)
-
-        return jobReport
+        return loadJobReport(jobReportPath)
 
     def isTaskExistInFWJR(self, jobReport, jobStatus):
         """
@@ -221,22 +321,32 @@ class AccountantWorker(WMConnectionBase):
         __call__
 
         Handle a completed job.  The parameters dictionary will contain the job
-        ID and the path to the framework job report.
+        ID and the path to the framework job report, and everything needed
+        from it (see prepareJob) if it was prepared by one of the accountant
+        processes, the report itself isn't loaded then.
         """
         returnList = []
         self.reset()
 
         for job in parameters:
             logging.info("Handling %s", job["fwjr_path"])
-
-            # Load the job and set the ID
-            fwkJobReport = self.loadJobReport(job["fwjr_path"])
-            fwkJobReport.setJobID(job['id'])
+            if 'taskSuccessful' in job:
+                fwkJobReport = None
+                preparedJob = job
+            else:
+                # lazily loaded, only the sections handleJob uses get decoded
+                fwkJobReport = loadJobReport(job["fwjr_path"])
+                fwkJobReport.setJobID(job['id'])
+                preparedJob = None
 
             jobSuccess = self.handleJob(jobID=job["id"],
-                                        fwkJobReport=fwkJobReport)
+                                        fwkJobReport=fwkJobReport,
+                                        preparedJob=preparedJob)
 
             if self.returnJobReport:
+                if fwkJobReport is None:
+                    fwkJobReport = loadJobReport(job["fwjr_path"])
+                    fwkJobReport.setJobID(job['id'])
                 returnList.append({'id': job["id"], 'jobSuccess': jobSuccess,
                                    'jobReport': fwkJobReport})
             else:
@@ -372,42 +482,56 @@ class AccountantWorker(WMConnectionBase):
         self.dbsFilesToCreate.append(dbsFile)
         return
 
-    def findDBSParents(self, lfn):
+    def findDBSParents(self, lfns):
         """
         _findDBSParents_
 
-        Find the parent of the file in DBS
-        This is meant to be called recursively
-        """
-        parentsInfo = self.getParentInfoAction.execute([lfn],
-                                                       conn=self.getDBConn(),
-                                                       transaction=self.existingTransaction())
-        newParents = set()
-        for parentInfo in parentsInfo:
-            # This will catch straight to merge files that do not have redneck
-            # parents.  We will mark the straight to merge file from the job
-            # as a child of the merged parent.
-            if int(parentInfo["merged"]) == 1:
-                newParents.add(parentInfo["lfn"])
-
-            elif parentInfo['gpmerged'] is None:
-                continue
-
-            # Handle the files that result from merge jobs that aren't redneck
-            # children.  We have to setup parentage and then check on whether or
-            # not this file has any redneck children and update their parentage
-            # information.
-            elif int(parentInfo["gpmerged"]) == 1:
-                newParents.add(parentInfo["gplfn"])
+        Find the parents in DBS of the given files, returns a dictionary of
+        {lfn: set(parent lfns)}. Unmerged ancestors are skipped, all the
+        files of a generation are looked up with a single query.
+        """
+        dbsParents = dict((lfn, set()) for lfn in lfns)
+        # lfn to look up -> output files it is an ancestor of
+        pending = dict((lfn, set([lfn])) for lfn in lfns)
+        visited = set()
+        while pending:
+            for lfn, outputLFNs in pending.items():
+                visited.update((lfn, outputLFN) for outputLFN in outputLFNs)
+            parentsInfo = self.getParentInfoAction.execute(list(pending),
+                                                           conn=self.getDBConn(),
+                                                           transaction=self.existingTransaction())
+            nextPending = {}
+            for parentInfo in parentsInfo:
+                outputLFNs = pending[parentInfo["child_lfn"]]
+                # This will catch straight to merge files that do not have redneck
+                # parents.  We will mark the straight to merge file from the job
+                # as a child of the merged parent.
+                if int(parentInfo["merged"]) == 1:
+                    parentLFN = parentInfo["lfn"]
+
+                elif parentInfo['gpmerged'] is None:
+                    continue
+
+                # Handle the files that result from merge jobs that aren't redneck
+                # children.  We have to setup parentage and then check on whether or
+                # not this file has any redneck children and update their parentage
+                # information.
+                elif int(parentInfo["gpmerged"]) == 1:
+                    parentLFN = parentInfo["gplfn"]
+
+                # If that didn't work, we've reached the great-grandparents
+                # and have to look one more generation up
+                else:
+                    for outputLFN in outputLFNs:
+                        if (parentInfo["gplfn"], outputLFN) not in visited:
+                            nextPending.setdefault(parentInfo["gplfn"], set()).add(outputLFN)
+                    continue
 
-            # If that didn't work, we've reached the great-grandparents
-            # And we have to work via recursion
-            else:
-                parentSet = self.findDBSParents(lfn=parentInfo['gplfn'])
-                for parent in parentSet:
-                    newParents.add(parent)
+                for outputLFN in outputLFNs:
+                    dbsParents[outputLFN].add(parentLFN)
+            pending = nextPending
 
-        return newParents
+        return dbsParents
 
     def addFileToWMBS(self, jobType, fwjrFile, jobMask, task, jobID=None):
         """
@@ -437,15 +561,19 @@ class AccountantWorker(WMConnectionBase):
 
         return wmbsFile
 
-    def handleJob(self, jobID, fwkJobReport):
+    def handleJob(self, jobID, fwkJobReport, preparedJob=None):
         """
         _handleJob_
 
         Figure out if a job was successful or not, handle it appropriately
-        (parse FWJR, update WMBS) and return the success status as a boolean
-
+        (parse FWJR, update WMBS) and return the success status as a boolean.
+        The job can be prepared instead (see prepareJob), the report is then
+        only loaded if its task name has to be recovered.
         """
-        jobSuccess = fwkJobReport.taskSuccessful()
+        if preparedJob is None:
+            preparedJob = extractJobReportFiles(fwkJobReport)
+        jobSuccess = preparedJob['taskSuccessful']
+        taskName = preparedJob['taskName']
 
         outputMap = self.getOutputMapAction.execute(jobID=jobID,
                                                     conn=self.getDBConn(),
@@ -456,7 +584,7 @@ class AccountantWorker(WMConnectionBase):
                                                 transaction=self.existingTransaction())
 
         if jobSuccess:
-            fileList = fwkJobReport.getAllFiles()
+            fileList = preparedJob['allFiles']
 
             # consistency check comparing outputMap to fileList
             # they should match except for some limited special cases
@@ -482,7 +610,7 @@ class AccountantWorker(WMConnectionBase):
                 failJob = True
                 if jobType in ["Processing", "Production"]:
                     cmsRunSteps = 0
-                    for step in fwkJobReport.listSteps():
+                    for step in preparedJob['steps']:
                         if step.startswith("cmsRun"):
                             cmsRunSteps += 1
                     if cmsRunSteps > 1:
@@ -494,13 +622,13 @@ class AccountantWorker(WMConnectionBase):
                                   jobID)
                     logging.debug("Job %d , expected outputModules %s", jobID, sorted(outputMap.keys()))
                     logging.debug("Job %d , fwjr outputModules %s", jobID, sorted(outputModules))
-                    fileList = fwkJobReport.getAllFilesFromStep(step='logArch1')
+                    fileList = preparedJob['logArchFiles']
                 else:
                     logging.warning(
                         "Job %d , list of expected outputModules does not match job report, accepted for multi-step CMSSW job",
                         jobID)
         else:
-            fileList = fwkJobReport.getAllFilesFromStep(step='logArch1')
+            fileList = preparedJob['logArchFiles']
 
         if jobSuccess:
             logging.info("Job %d , handle successful job", jobID)
@@ -508,20 +636,27 @@ class AccountantWorker(WMConnectionBase):
             logging.warning("Job %d , bad jobReport, failing job", jobID)
 
         # make sure the task name is present in FWJR (recover from WMBS if needed)
-        if len(fileList) > 0:
+        if len(fileList) > 0 and not taskName:
+            if fwkJobReport is None:
+                fwkJobReport = loadJobReport(preparedJob["fwjr_path"])
+                fwkJobReport.setJobID(jobID)
             if jobSuccess:
                 self.isTaskExistInFWJR(fwkJobReport, "success")
             else:
                 self.isTaskExistInFWJR(fwkJobReport, "failed")
+            taskName = fwkJobReport.getTaskName()
 
         # special check for LogCollect jobs
         skipLogCollect = False
         if jobSuccess and jobType == "LogCollect":
+            if 'fwjr' in preparedJob:
+                inputFileList = preparedJob['fwjr']['inputFiles']
+            else:
+                inputFileList = fwkJobReport.getAllInputFiles()
             for fwjrFile in fileList:
                 try:
                     # this assumes there is only one file for LogCollect jobs, not sure what happend if that changes
-                    self.associateLogCollectToParentJobsInWMStats(fwkJobReport, fwjrFile["lfn"],
-                                                                  fwkJobReport.getTaskName())
+                    self.associateLogCollectToParentJobsInWMStats(inputFileList, fwjrFile["lfn"], taskName)
                 except Exception as ex:
                     skipLogCollect = True
                     logging.error("Error occurred: associating log collect location, will try again\n %s", str(ex))
@@ -535,7 +670,7 @@ class AccountantWorker(WMConnectionBase):
             outputID = wmbsJob.loadOutputID()
             wmbsJob.getMask()
 
-            wmbsJob["fwjr"] = fwkJobReport
+            wmbsJob["fwjr"] = preparedJob.get('fwjr', fwkJobReport)
 
             if jobSuccess:
                 wmbsJob["outcome"] = "success"
@@ -547,7 +682,7 @@ class AccountantWorker(WMConnectionBase):
                 logging.debug("Job %d , register output %s", jobID, fwjrFile["lfn"])
 
                 wmbsFile = self.addFileToWMBS(jobType, fwjrFile, wmbsJob["mask"],
-                                              jobID=jobID, task=fwkJobReport.getTaskName())
+                                              jobID=jobID, task=taskName)
                 merged = fwjrFile['merged']
                 moduleLabel = fwjrFile["module_label"]
 
@@ -568,10 +703,15 @@ class AccountantWorker(WMConnectionBase):
                     for outputFileset in outputFilesets:
                         self.filesetAssoc.append({"lfn": wmbsFile["lfn"], "fileset": outputFileset})
 
+            # the merge output files were marked as merged in their copy of the report
+            if jobType == "Merge" and 'fwjr' in preparedJob:
+                setMergedInPreparedFWJR(preparedJob['fwjr'],
+                                        set([fwjrFile["lfn"] for fwjrFile in fileList if fwjrFile["merged"]]))
+
             # Check if the job had any skipped files, put them in ACDC containers
             # We assume full file processing (no job masks)
             if jobSuccess:
-                skippedFiles = fwkJobReport.getAllSkippedFiles()
+                skippedFiles = preparedJob['skippedFiles']
                 if skippedFiles and jobType not in ['LogCollect', 'Cleanup']:
                     self.jobsWithSkippedFiles[jobID] = skippedFiles
 
@@ -582,16 +722,16 @@ class AccountantWorker(WMConnectionBase):
 
         return jobSuccess
 
-    def associateLogCollectToParentJobsInWMStats(self, fwkJobReport, logAchiveLFN, task):
+    def associateLogCollectToParentJobsInWMStats(self, inputFileList, logAchiveLFN, task):
         """
         _associateLogCollectToParentJobsInWMStats_
 
-        Associate a logArchive output to its parent job
+        Associate a logArchive output to its parent job, given the input
+        files of the LogCollect job
         """
         if self.fwjrCouchDB is None:
             self.fwjrCouchDB = self.jobCouchdb.connectDatabase("%s/fwjrs" % self.jobDBName)
 
-        inputFileList = fwkJobReport.getAllInputFiles()
         requestName = task.split('/')[1]
         keys = []
         for inputFile in inputFileList:
@@ -627,13 +767,9 @@ class AccountantWorker(WMConnectionBase):
         """
         _createMissingFWJR_
 
-        Create a missing FWJR if the report can't be found by the code in the
-        path location.
+        Create a report for a missing FWJR, see createMissingFWKJR
         """
-        report = Report()
-        report.addError("cmsRun1", 84, errorCode, errorDescription)
-        report.data.cmsRun1.status = "Failed"
-        return report
+        return createMissingFWKJR(errorCode, errorDescription)
 
     def createFilesInDBSBuffer(self):
         """
@@ -896,9 +1032,9 @@ class AccountantWorker(WMConnectionBase):
         """
         outputLFNs = [f['lfn'] for f in self.mergedOutputFiles]
         bindList = []
+        dbsParents = self.findDBSParents(outputLFNs)
         for lfn in outputLFNs:
-            newParents = self.findDBSParents(lfn=lfn)
-            for parentLFN in newParents:
+            for parentLFN in dbsParents[lfn]:
                 bindList.append({'child': lfn, 'parent': parentLFN})
 
         # Now all the parents should exist
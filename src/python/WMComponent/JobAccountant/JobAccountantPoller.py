@@ -3,17 +3,24 @@
 _JobAccountantPoller_
 
 Poll WMBS for complete jobs and process their framework job reports.
+
+Loading and unpacking the framework job reports can be spread over
+accountantProcesses worker processes, the reports are then handled (WMBS,
+DBSBuffer and couch updates) in the component thread, one slice of
+accountantWorkSize jobs and one transaction at a time.
 """
 
-import threading
+import Queue
 import logging
+import multiprocessing
+import threading
 
 from Utils.IteratorTools import grouper
 from Utils.Timers import timeFunction
 from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
 from WMCore.Database.CouchUtils import CouchConnectionError
 from WMCore.DAOFactory import DAOFactory
-from WMComponent.JobAccountant.AccountantWorker import AccountantWorker
+from WMComponent.JobAccountant.AccountantWorker import AccountantWorker, prepareJobWorker
 from WMCore.WMException import WMException
 
 
@@ -32,7 +39,14 @@ class JobAccountantPoller(BaseWorkerThread):
         BaseWorkerThread.__init__(self)
         self.config = config
         self.accountantWorkSize = getattr(self.config.JobAccountant, 'accountantWorkSize', 100)
-
+        # 0 means the reports are loaded in the component thread
+        self.nProc = getattr(self.config.JobAccountant, 'accountantProcesses', 0)
+        # how long to wait for a report to be loaded by the processes, in seconds
+        self.processTimeout = getattr(self.config.JobAccountant, 'accountantProcessTimeout', 600)
+
+        self.pool = []
+        self.workInput = None
+        self.workResult = None
         return
 
     def setup(self, parameters=None):
@@ -50,6 +64,125 @@ class JobAccountantPoller(BaseWorkerThread):
         self.getJobsAction = daoFactory(classname="Jobs.GetFWJRByState")
         return
 
+    def setupPool(self):
+        """
+        _setupPool_
+
+        Start the processes loading the job reports, if configured
+        """
+        if self.nProc <= 0 or len(self.pool) > 0:
+            return
+
+        self.workInput = multiprocessing.Queue()
+        self.workResult = multiprocessing.Queue()
+
+        for _ in range(self.nProc):
+            p = multiprocessing.Process(target=prepareJobWorker,
+                                        args=(self.workInput, self.workResult))
+            p.daemon = True
+            p.start()
+            self.pool.append(p)
+
+        return
+
+    def __del__(self):
+        """
+        __del__
+
+        Trigger a close of the pool if necessary
+        """
+        self.close()
+        return
+
+    def close(self, terminate=False):
+        """
+        _close_
+
+        Stop the worker processes, killing them if terminate is set (i.e.
+        they may still be busy with work nobody is going to collect)
+        """
+        if not getattr(self, 'pool', None):
+            return
+
+        if not terminate:
+            for _ in self.pool:
+                try:
+                    self.workInput.put('STOP')
+                except Exception as ex:
+                    logging.debug("Hit some exception stopping the accountant processes\n%s", str(ex))
+                    terminate = True
+        for proc in self.pool:
+            if terminate:
+                proc.terminate()
+            else:
+                proc.join()
+        try:
+            self.workInput.close()
+            self.workResult.close()
+        except Exception:
+            pass
+        self.pool = []
+        self.workInput = None
+        self.workResult = None
+        return
+
+    def terminate(self, params):
+        """
+        _terminate_
+
+        Stop the worker processes before the component dies
+        """
+        self.close()
+        BaseWorkerThread.terminate(self, params)
+        return
+
+    def preparedSlices(self, completeJobs):
+        """
+        _preparedSlices_
+
+        Generator of the job slices to pass to the accountant worker.
+        With worker processes, the jobs of the next slice are queued
+        before the current one is returned, so the processes keep loading
+        reports while the accountant is updating the database. Jobs not
+        prepared in time are returned as they are, the accountant worker
+        then loads their reports itself.
+        """
+        if not self.pool:
+            for jobsSlice in grouper(completeJobs, self.accountantWorkSize):
+                yield jobsSlice
+            return
+
+        slices = list(grouper(completeJobs, self.accountantWorkSize))
+        prepared = {}
+        for jobsSlice in slices[:2]:
+            for job in jobsSlice:
+                self.workInput.put(job)
+
+        for i, jobsSlice in enumerate(slices):
+            missing = set(job['id'] for job in jobsSlice) - set(prepared)
+            while missing and self.pool:
+                try:
+                    result = self.workResult.get(timeout=self.processTimeout)
+                except Queue.Empty:
+                    logging.error("Timed out waiting for the accountant processes, %d jobs still pending. "
+                                  "Restarting them in the next cycle.", len(missing))
+                    self.close(terminate=True)
+                    break
+                if 'error' in result:
+                    logging.error("Failed to prepare job %s in an accountant process: %s",
+                                  result['id'], result['error'])
+                else:
+                    prepared[result['id']] = result
+                missing.discard(result['id'])
+
+            if self.pool and i + 2 < len(slices):
+                for job in slices[i + 2]:
+                    self.workInput.put(job)
+
+            yield [prepared.pop(job['id'], job) for job in jobsSlice]
+
+        return
+
     @timeFunction
     def algorithm(self, parameters=None):
         """
@@ -65,10 +198,13 @@ class JobAccountantPoller(BaseWorkerThread):
             logging.debug("No work to do; exiting")
             return
 
-        for jobsSlice in grouper(completeJobs, self.accountantWorkSize):
+        self.setupPool()
+        for jobsSlice in self.preparedSlices(completeJobs):
             try:
                 self.accountantWorker(jobsSlice)
             except WMException:
+                # drop whatever the processes are still working on
+                self.close(terminate=True)
                 myThread = threading.currentThread()
                 if getattr(myThread, 'transaction', None) is not None:
                     myThread.transaction.rollback()
@@ -81,6 +217,7 @@ class JobAccountantPoller(BaseWorkerThread):
                 if getattr(myThread, 'transaction', None) is not None:
                     myThread.transaction.rollback()
             except Exception as ex:
+                self.close(terminate=True)
                 myThread = threading.currentThread()
                 if getattr(myThread, 'transaction', None) is not None:
                     myThread.transaction.rollback()
@@ -21,7 +21,7 @@ from subprocess import Popen, PIPE
 from Utils.IteratorTools import grouper
 from WMCore.DAOFactory import DAOFactory
 from WMCore.WMException import WMException
-from WMCore.WMSpec.WMWorkload import WMWorkload, WMWorkloadHelper
+from WMCore.WMSpec.WMWorkloadCache import getWorkload
 
 
 def createDirectories(dirList):
@@ -88,8 +88,7 @@ def getMasterName(startDir, wmWorkload=None, workflow=None):
         logging.error(msg)
         raise CreateWorkAreaException(msg)
     else:
-        wmWorkload = WMWorkloadHelper(WMWorkload("workload"))
-        wmWorkload.load(workflow.spec)
+        wmWorkload = getWorkload(workflow.spec)
 
         workload = wmWorkload.name()
 
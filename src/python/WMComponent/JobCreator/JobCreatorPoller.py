@@ -4,7 +4,9 @@ The JobCreator Poller for the JSM
 """
 __all__ = []
 
+import Queue
 import logging
+import multiprocessing
 import os
 import os.path
 import threading
@@ -23,17 +25,21 @@ from WMCore.WMException import WMException
 from WMCore.JobSplitting.Generators.GeneratorManager import GeneratorManager
 from WMCore.JobStateMachine.ChangeState import ChangeState
 from WMCore.JobSplitting.SplitterFactory import SplitterFactory
+from WMCore.WMBS.JobArchive import archivePath, writeJobArchive
 from WMCore.WMBS.Subscription import Subscription
 from WMCore.WMBS.Workflow import Workflow
 from WMCore.WMSpec.WMWorkload import WMWorkload, WMWorkloadHelper
+from WMCore.WMSpec.WMWorkloadCache import getWorkload, getWorkloadCache
+from WMCore.WMInit import WMInit
 from WMCore.FwkJobReport.Report import Report
 
 
-def retrieveWMSpec(workflow=None, wmWorkloadURL=None):
+def retrieveWMSpec(workflow=None, wmWorkloadURL=None, cache=True):
     """
     _retrieveWMSpec_
 
-    Given a subscription, this function loads the WMSpec associated with that workload
+    Given a subscription, this function loads the WMSpec associated with that workload.
+    By default the spec comes from the process wide spec cache and must not be modified.
     """
     if not wmWorkloadURL and workflow:
         wmWorkloadURL = workflow.spec
@@ -42,6 +48,9 @@ def retrieveWMSpec(workflow=None, wmWorkloadURL=None):
         logging.error("WMWorkloadURL %s is empty", wmWorkloadURL)
         return None
 
+    if cache:
+        return getWorkload(wmWorkloadURL)
+
     wmWorkload = WMWorkloadHelper(WMWorkload("workload"))
     wmWorkload.load(wmWorkloadURL)
 
@@ -120,11 +129,12 @@ def saveJob(job, workflow, sandbox, wmTask=None, jobNumber=0,
             owner=None, ownerDN=None, ownerGroup='', ownerRole='',
             scramArch=None, swVersion=None, agentNumber=0, numberOfCores=1,
             inputDataset=None, inputDatasetLocations=None, inputPileup=None,
-            allowOpportunistic=False, agentName=''):
+            allowOpportunistic=False, agentName='', writePickle=True):
     """
     _saveJob_
 
-    Actually do the mechanics of saving the job to a pickle file
+    Actually do the mechanics of saving the job to a pickle file.
+    Without writePickle the job is only filled, to be saved in a job archive.
     """
     if wmTask:
         # If we managed to load the task,
@@ -151,9 +161,24 @@ def saveJob(job, workflow, sandbox, wmTask=None, jobNumber=0,
     job['inputPileup'] = inputPileup
     job['allowOpportunistic'] = allowOpportunistic
 
-    with open(os.path.join(cacheDir, 'job.pkl'), 'w') as output:
-        pickle.dump(job, output, pickle.HIGHEST_PROTOCOL)
+    if writePickle:
+        with open(os.path.join(cacheDir, 'job.pkl'), 'w') as output:
+            pickle.dump(job, output, pickle.HIGHEST_PROTOCOL)
+
+    return
+
+
+def saveJobArchives(jobs):
+    """
+    _saveJobArchives_
 
+    Write the jobs in the archives of their job collections
+    """
+    jobsByArchive = {}
+    for job in jobs:
+        jobsByArchive.setdefault(archivePath(job['cache_dir']), []).append(job)
+    for filename, archiveJobs in jobsByArchive.items():
+        writeJobArchive(filename, archiveJobs)
     return
 
 
@@ -224,7 +249,10 @@ def creatorProcess(work, jobCacheDir):
                     inputDatasetLocations=inputDatasetLocations,
                     inputPileup=inputPileup,
                     allowOpportunistic=allowOpportunistic,
-                    agentName=agentName)
+                    agentName=agentName,
+                    writePickle=False)
+
+        saveJobArchives(wmbsJobGroup.jobs)
 
     except Exception as ex:
         msg = "Exception in processing wmbsJobGroup %i\n. Error: %s" % (wmbsJobGroup.id, str(ex))
@@ -234,99 +262,53 @@ def creatorProcess(work, jobCacheDir):
     return wmbsJobGroup
 
 
-# This is the code for the multiprocessing based creator
-# It's kept around so I can remember how I arranged the exception tree
-# Keep this until we make a decision about large-scale transactions
-# in the JobCreator.
-
-# def creatorProcess(input, result, jobCacheDir):
-#    """
-#    _creatorProcess_
-#
-#    Run the CreateWorkArea code
-#    """
-#
-#
-#    createWorkArea  = CreateWorkArea()
-#
-#
-#    while True:
-#
-#        try:
-#            work = input.get()
-#        except (EOFError, IOError):
-#            crashMessage =  "Hit EOF/IO in getting new work\n"
-#            crashMessage += "Assuming this is a graceful break attempt.\n"
-#            logging.error(crashMessage)
-#            break
-#
-#        if work == 'STOP':
-#            # Put the brakes on
-#            break
-#
-#        try:
-#            wmbsJobGroup = work.get('jobGroup')
-#            workflow     = work.get('workflow')
-#            wmWorkload   = work.get('wmWorkload')
-#            wmTaskName   = work.get('wmTaskName')
-#            sandbox      = work.get('sandbox')
-#            jobNumber    = work.get('jobNumber', 0)
-#            wmTaskPrio   = work.get('wmTaskPrio', None)
-#        except KeyError, ex:
-#            msg =  "Could not find critical key-value in work input.\n"
-#            msg += str(ex)
-#            logging.error(msg)
-#            result.put({status: 'Error', 'msg': msg})
-#            continue
-#        except Exception, ex:
-#            msg =  "Exception in opening work package.\n"
-#            msg += str(ex)
-#            msg += str(traceback.format_exc())
-#            logging.error(msg)
-#            result.put({'success': False, 'msg': msg})
-#            continue
-#
-#
-#        try:
-#            #print "Retrieved work in creatorProcess %i: %s" % (os.getpid(), [x['id'] for x in wmbsJobGroup.jobs])
-#            createWorkArea.processJobs(jobGroup = wmbsJobGroup,
-#                                       startDir = jobCacheDir,
-#                                       workflow = workflow,
-#                                       wmWorkload = wmWorkload,
-#                                       cache = False)
-#
-#            for job in wmbsJobGroup.jobs:
-#                jobNumber += 1
-#                saveJob(job = job, workflow = workflow,
-#                        wmTask = wmTaskName,
-#                        jobNumber = jobNumber,
-#                        wmTaskPrio = wmTaskPrio,
-#                        sandbox = sandbox)
-#
-#            # If we got this far, it should be a success
-#            result.put({'success': True, 'jobGroup': wmbsJobGroup})
-#
-#        except Exception, ex:
-#            # Register as failure; move on
-#            msg =  "Exception in processing wmbsJobGroup %i\n" % wmbsJobGroup.id
-#            msg += str(ex)
-#            msg += str(traceback.format_exc())
-#            logging.error(msg)
-#            result.put({'success': False, 'msg': msg})
-#
-#        #print "Finished work in creatorProcess %i" % os.getpid()
-#        #print [x['id'] for x in wmbsJobGroup.jobs]
-#
-#        # END while loop that does the work
-#
-#    return 0
-
+# database handles inherited by the subscriptionWorker processes, kept
+# referenced until the process leaves through os._exit
+_inheritedConnections = []
 
 
+def subscriptionWorker(workInput, workResult, config):
+    """
+    _subscriptionWorker_
 
+    Worker process creating the jobs of the subscriptions put in the
+    workInput queue, with its own database connection. Each work unit is the
+    list of subscriptions of a workflow, processed one after the other so the
+    job numbering of the workflow stays sequential.
+    """
+    myThread = threading.currentThread()
+    # the connections inherited from the parent must never be freed here:
+    # MySQLdb would send COM_QUIT on the socket shared with the parent
+    _inheritedConnections.append((getattr(myThread, 'dbi', None), getattr(myThread, 'transaction', None)))
+    myThread.dialect = None
+    connectUrl = config.CoreDatabase.connectUrl
+    dialect = getattr(config.CoreDatabase, 'dialect', None) or connectUrl.split(":", 1)[0]
+    WMInit().setDatabaseConnection(dbConfig=connectUrl, dialect=dialect,
+                                   socketLoc=getattr(config.CoreDatabase, 'socket', None))
+    creator = JobCreatorPoller(config)
+
+    while True:
+        try:
+            work = workInput.get()
+        except (EOFError, IOError):
+            logging.error("Hit EOF/IO in getting new work, assuming this is a graceful break attempt.")
+            break
 
+        if work == 'STOP':
+            break
 
+        try:
+            for subscriptionID in work:
+                creator.processSubscription(subscriptionID)
+            workResult.put({'subscriptions': work, 'success': True})
+        except Exception as ex:
+            if getattr(myThread.transaction, 'transaction', False):
+                myThread.transaction.rollback()
+            msg = "Failed to create jobs for subscriptions %s. Error: %s" % (work, str(ex))
+            logging.exception(msg)
+            workResult.put({'subscriptions': work, 'success': False, 'msg': msg})
 
+    return
 
 
 class JobCreatorException(WMException):
@@ -362,6 +344,7 @@ class JobCreatorPoller(BaseWorkerThread):
         self.setBulkCache = self.daoFactory(classname="Jobs.SetCache")
         self.countJobs = self.daoFactory(classname="Jobs.GetNumberOfJobsPerWorkflow")
         self.subscriptionList = self.daoFactory(classname="Subscriptions.ListIncomplete")
+        self.subscriptionListByWorkflow = self.daoFactory(classname="Subscriptions.ListIncompleteByWorkflow")
         self.setFWJRPath = self.daoFactory(classname="Jobs.SetFWJRPath")
 
         # information
@@ -388,6 +371,14 @@ class JobCreatorPoller(BaseWorkerThread):
 
         self.changeState = ChangeState(self.config)
 
+        # Subscriptions of different workflows can be processed in parallel
+        # by creatorProcesses worker processes, 0 to process them in this thread
+        self.nProc = getattr(config.JobCreator, 'creatorProcesses', 0)
+        self.processTimeout = getattr(config.JobCreator, 'creatorProcessTimeout', 3600)
+        self.pool = []
+        self.workInput = None
+        self.workResult = None
+
         return
 
     def check(self):
@@ -442,6 +433,100 @@ class JobCreatorPoller(BaseWorkerThread):
         """
         logging.debug("terminating. doing one more pass before we die")
         self.algorithm(params)
+        self.close()
+
+    def setupPool(self):
+        """
+        _setupPool_
+
+        Start the worker processes, if configured
+        """
+        if self.nProc <= 0 or len(self.pool) > 0:
+            return
+
+        self.workInput = multiprocessing.Queue()
+        self.workResult = multiprocessing.Queue()
+
+        for _ in range(self.nProc):
+            p = multiprocessing.Process(target=subscriptionWorker,
+                                        args=(self.workInput, self.workResult, self.config))
+            p.start()
+            self.pool.append(p)
+
+        return
+
+    def __del__(self):
+        """
+        __del__
+
+        Trigger a close of the pool if necessary
+        """
+        self.close()
+        return
+
+    def close(self, terminate=False):
+        """
+        _close_
+
+        Stop the worker processes, killing them if terminate is set
+        """
+        if not getattr(self, 'pool', None):
+            return
+
+        if not terminate:
+            for _ in self.pool:
+                try:
+                    self.workInput.put('STOP')
+                except Exception as ex:
+                    logging.debug("Hit some exception stopping the creator processes\n%s", str(ex))
+                    terminate = True
+        for proc in self.pool:
+            if terminate:
+                proc.terminate()
+            else:
+                proc.join()
+        try:
+            self.workInput.close()
+            self.workResult.close()
+        except Exception:
+            pass
+        self.pool = []
+        self.workInput = None
+        self.workResult = None
+        return
+
+    def pollSubscriptionsInPool(self):
+        """
+        _pollSubscriptionsInPool_
+
+        Hand the subscriptions, grouped by workflow, to the worker processes
+        and wait for all of them to be done.
+        """
+        subscriptionsByWorkflow = self.subscriptionListByWorkflow.execute()
+        if not subscriptionsByWorkflow:
+            return
+
+        self.setupPool()
+        for workflowID in sorted(subscriptionsByWorkflow):
+            self.workInput.put(subscriptionsByWorkflow[workflowID])
+
+        failures = []
+        for _ in range(len(subscriptionsByWorkflow)):
+            try:
+                result = self.workResult.get(timeout=self.processTimeout)
+            except Queue.Empty:
+                # don't leave the processes working on stale work
+                self.close(terminate=True)
+                msg = "Timed out waiting for the creator processes after %s seconds" % self.processTimeout
+                logging.error(msg)
+                raise JobCreatorException(msg)
+            if not result['success']:
+                failures.append(result['msg'])
+
+        if failures:
+            msg = "Failed to create jobs for %d workflows:\n%s" % (len(failures), "\n".join(failures))
+            raise JobCreatorException(msg)
+        return
 
     def pollSubscriptions(self):
         """
@@ -449,200 +534,217 @@ class JobCreatorPoller(BaseWorkerThread):
 
         """
         logging.info("Beginning JobCreator.pollSubscriptions() cycle.")
+
+        if self.nProc > 0:
+            self.pollSubscriptionsInPool()
+        else:
+            # First, get list of Subscriptions
+            subscriptions = self.subscriptionList.execute()
+
+            # Okay, now we have a list of subscriptions
+            for subscriptionID in subscriptions:
+                self.processSubscription(subscriptionID)
+
+        logging.info("Workload spec cache: %s", getWorkloadCache().getStats())
+        return
+
+    def processSubscription(self, subscriptionID):
+        """
+        _processSubscription_
+
+        Split the available files of a subscription into jobs, create their
+        work areas and job pickles. Each batch of job groups is committed in
+        its own transaction.
+        """
         myThread = threading.currentThread()
 
-        # First, get list of Subscriptions
-        subscriptions = self.subscriptionList.execute()
+        wmbsSubscription = Subscription(id=subscriptionID)
+        try:
+            wmbsSubscription.load()
+        except IndexError:
+            # This happens when the subscription no longer exists
+            # i.e., someone executed a kill() function on the database
+            # while the JobCreator was in cycle
+            # Ignore this subscription
+            msg = "JobCreator cannot load subscription %i" % subscriptionID
+            logging.error(msg)
+            return
 
-        # Okay, now we have a list of subscriptions
-        for subscriptionID in subscriptions:
-            wmbsSubscription = Subscription(id=subscriptionID)
-            try:
-                wmbsSubscription.load()
-            except IndexError:
-                # This happens when the subscription no longer exists
-                # i.e., someone executed a kill() function on the database
-                # while the JobCreator was in cycle
-                # Ignore this subscription
-                msg = "JobCreator cannot load subscription %i" % subscriptionID
-                logging.error(msg)
-                continue
-
-            workflow = Workflow(id=wmbsSubscription["workflow"].id)
-            workflow.load()
-            wmbsSubscription['workflow'] = workflow
-            wmWorkload = retrieveWMSpec(workflow=workflow)
-
-            if not workflow.task or not wmWorkload:
-                # Then we have a problem
-                # We NEED a sandbox
-                # Abort this subscription!
-                # But do NOT fail
-                # We have no way of marking a subscription as bad per se
-                # We'll have to just keep skipping it
-                msg = "Have no task for workflow %i\n" % (workflow.id)
-                msg += "Aborting Subscription %i" % (subscriptionID)
-                logging.error(msg)
-                continue
+        workflow = Workflow(id=wmbsSubscription["workflow"].id)
+        workflow.load()
+        wmbsSubscription['workflow'] = workflow
+        wmWorkload = retrieveWMSpec(workflow=workflow)
+
+        if not workflow.task or not wmWorkload:
+            # Then we have a problem
+            # We NEED a sandbox
+            # Abort this subscription!
+            # But do NOT fail
+            # We have no way of marking a subscription as bad per se
+            # We'll have to just keep skipping it
+            msg = "Have no task for workflow %i\n" % (workflow.id)
+            msg += "Aborting Subscription %i" % (subscriptionID)
+            logging.error(msg)
+            return
+
+        logging.debug("Have loaded subscription %i with workflow %i\n", subscriptionID, workflow.id)
 
-            logging.debug("Have loaded subscription %i with workflow %i\n", subscriptionID, workflow.id)
+        # retrieve information from the workload to propagate down to the job configuration
+        allowOpport = wmWorkload.getAllowOpportunistic()
 
-            # retrieve information from the workload to propagate down to the job configuration
-            allowOpport = wmWorkload.getAllowOpportunistic()
+        # Set task object
+        wmTask = wmWorkload.getTaskByPath(workflow.task)
 
-            # Set task object
-            wmTask = wmWorkload.getTaskByPath(workflow.task)
+        # Get generators
+        # If you fail to load the generators, pass on the job
+        try:
+            if hasattr(wmTask.data, 'generators'):
+                manager = GeneratorManager(wmTask)
+                seederList = manager.getGeneratorList()
+            else:
+                seederList = []
+        except Exception as ex:
+            msg = "Had failure loading generators for subscription %i\n" % (subscriptionID)
+            msg += "Exception: %s\n" % str(ex)
+            msg += "Passing over this error.  It will reoccur next interation!\n"
+            msg += "Please check or remove this subscription!\n"
+            logging.error(msg)
+            return
 
-            # Get generators
-            # If you fail to load the generators, pass on the job
+        logging.debug("Going to call wmbsJobFactory for sub %i with limit %i", subscriptionID, self.limit)
+
+        splitParams = retrieveJobSplitParams(wmWorkload, workflow.task)
+        logging.debug("Split Params: %s", splitParams)
+
+        # Load the proper job splitting module
+        splitterFactory = SplitterFactory(splitParams.get('algo_package', "WMCore.JobSplitting"))
+        # and return an instance of the splitting algorithm
+        wmbsJobFactory = splitterFactory(package="WMCore.WMBS",
+                                         subscription=wmbsSubscription,
+                                         generators=seederList,
+                                         limit=self.limit)
+
+        # Turn on the jobFactory --> get available files for that subscription, keep result proxies
+        wmbsJobFactory.open()
+
+        # Create a function to hold it, calling __call__ from the JobFactory
+        # which then calls algorithm method of the job splitting algo instance
+        jobSplittingFunction = runSplitter(jobFactory=wmbsJobFactory,
+                                           splitParams=splitParams)
+
+        # Now we get to find out how many jobs there are.
+        jobNumber = self.countJobs.execute(workflow=workflow.id,
+                                           conn=myThread.transaction.conn,
+                                           transaction=True)
+        jobNumber += splitParams.get('initial_lfn_counter', 0)
+        logging.debug("Have %i jobs for workflow %s already in database.", jobNumber, workflow.name)
+
+        continueSubscription = True
+        while continueSubscription:
+            # This loop runs over the jobFactory,
+            # using yield statements and a pre-existing proxy to
+            # generate and process new jobs
+
+            # First we need the jobs.
+            myThread.transaction.begin()
             try:
-                if hasattr(wmTask.data, 'generators'):
-                    manager = GeneratorManager(wmTask)
-                    seederList = manager.getGeneratorList()
-                else:
-                    seederList = []
+                wmbsJobGroups = next(jobSplittingFunction)
+                logging.info("Retrieved %i jobGroups from jobSplitter", len(wmbsJobGroups))
+            except StopIteration:
+                # If you receive a stopIteration, we're done
+                logging.info("Completed iteration over subscription %i", subscriptionID)
+                continueSubscription = False
+                myThread.transaction.commit()
+                break
+
+            # If we have no jobGroups, we're done
+            if len(wmbsJobGroups) == 0:
+                logging.info("Found end in iteration over subscription %i", subscriptionID)
+                continueSubscription = False
+                myThread.transaction.commit()
+                break
+
+            # Assemble a dict of all the info
+            processDict = {'workflow': workflow,
+                           'wmWorkload': wmWorkload, 'wmTaskName': wmTask.getPathName(),
+                           'jobNumber': jobNumber, 'sandbox': wmTask.data.input.sandbox,
+                           'owner': wmWorkload.getOwner().get('name', None),
+                           'ownerDN': wmWorkload.getOwner().get('dn', None),
+                           'ownerGroup': wmWorkload.getOwner().get('vogroup', ''),
+                           'ownerRole': wmWorkload.getOwner().get('vorole', ''),
+                           'numberOfCores': 1,
+                           'inputDataset': wmTask.getInputDatasetPath(),
+                           'inputPileup': wmTask.getInputPileupDatasets()}
+            try:
+                maxCores = 1
+                stepNames = wmTask.listAllStepNames()
+                for stepName in stepNames:
+                    sh = wmTask.getStep(stepName)
+                    maxCores = max(maxCores, sh.getNumberOfCores())
+                processDict.update({'numberOfCores': maxCores})
+            except AttributeError:
+                logging.info("Failed to read multicore settings from task %s", wmTask.getPathName())
+
+            tempSubscription = Subscription(id=wmbsSubscription['id'])
+
+            # if we have glideinWMS constraints, then adapt all jobs
+            if self.glideinLimits:
+                capResourceEstimates(wmbsJobGroups, self.glideinLimits)
+
+            nameDictList = []
+            for wmbsJobGroup in wmbsJobGroups:
+                # For each jobGroup, put a dictionary
+                # together and run it with creatorProcess
+                jobsInGroup = len(wmbsJobGroup.jobs)
+                wmbsJobGroup.subscription = tempSubscription
+                tempDict = {}
+                tempDict.update(processDict)
+                tempDict['jobGroup'] = wmbsJobGroup
+                tempDict['swVersion'] = wmTask.getSwVersion(allSteps=True)
+                tempDict['scramArch'] = wmTask.getScramArch()
+                tempDict['jobNumber'] = jobNumber
+                tempDict['agentNumber'] = self.agentNumber
+                tempDict['agentName'] = self.agentName
+                tempDict['inputDatasetLocations'] = wmbsJobGroup.getLocationsForJobs()
+                tempDict['allowOpportunistic'] = allowOpport
+
+                jobGroup = creatorProcess(work=tempDict,
+                                          jobCacheDir=self.jobCacheDir)
+                jobNumber += jobsInGroup
+
+                # Set jobCache for group
+                for job in jobGroup.jobs:
+                    nameDictList.append({'jobid': job['id'],
+                                         'cacheDir': job['cache_dir']})
+                    job["user"] = wmWorkload.getOwner()["name"]
+                    job["group"] = wmWorkload.getOwner()["group"]
+            # Set the caches in the database
+            try:
+                if len(nameDictList) > 0:
+                    self.setBulkCache.execute(jobDictList=nameDictList,
+                                              conn=myThread.transaction.conn,
+                                              transaction=True)
+            except WMException:
+                raise
             except Exception as ex:
-                msg = "Had failure loading generators for subscription %i\n" % (subscriptionID)
-                msg += "Exception: %s\n" % str(ex)
-                msg += "Passing over this error.  It will reoccur next interation!\n"
-                msg += "Please check or remove this subscription!\n"
+                msg = "Unknown exception while setting the bulk cache:\n"
+                msg += str(ex)
                 logging.error(msg)
-                continue
-
-            logging.debug("Going to call wmbsJobFactory for sub %i with limit %i", subscriptionID, self.limit)
-
-            splitParams = retrieveJobSplitParams(wmWorkload, workflow.task)
-            logging.debug("Split Params: %s", splitParams)
-
-            # Load the proper job splitting module
-            splitterFactory = SplitterFactory(splitParams.get('algo_package', "WMCore.JobSplitting"))
-            # and return an instance of the splitting algorithm
-            wmbsJobFactory = splitterFactory(package="WMCore.WMBS",
-                                             subscription=wmbsSubscription,
-                                             generators=seederList,
-                                             limit=self.limit)
-
-            # Turn on the jobFactory --> get available files for that subscription, keep result proxies
-            wmbsJobFactory.open()
-
-            # Create a function to hold it, calling __call__ from the JobFactory
-            # which then calls algorithm method of the job splitting algo instance
-            jobSplittingFunction = runSplitter(jobFactory=wmbsJobFactory,
-                                               splitParams=splitParams)
-
-            # Now we get to find out how many jobs there are.
-            jobNumber = self.countJobs.execute(workflow=workflow.id,
-                                               conn=myThread.transaction.conn,
-                                               transaction=True)
-            jobNumber += splitParams.get('initial_lfn_counter', 0)
-            logging.debug("Have %i jobs for workflow %s already in database.", jobNumber, workflow.name)
-
-            continueSubscription = True
-            while continueSubscription:
-                # This loop runs over the jobFactory,
-                # using yield statements and a pre-existing proxy to
-                # generate and process new jobs
-
-                # First we need the jobs.
-                myThread.transaction.begin()
-                try:
-                    wmbsJobGroups = next(jobSplittingFunction)
-                    logging.info("Retrieved %i jobGroups from jobSplitter", len(wmbsJobGroups))
-                except StopIteration:
-                    # If you receive a stopIteration, we're done
-                    logging.info("Completed iteration over subscription %i", subscriptionID)
-                    continueSubscription = False
-                    myThread.transaction.commit()
-                    break
-
-                # If we have no jobGroups, we're done
-                if len(wmbsJobGroups) == 0:
-                    logging.info("Found end in iteration over subscription %i", subscriptionID)
-                    continueSubscription = False
-                    myThread.transaction.commit()
-                    break
-
-                # Assemble a dict of all the info
-                processDict = {'workflow': workflow,
-                               'wmWorkload': wmWorkload, 'wmTaskName': wmTask.getPathName(),
-                               'jobNumber': jobNumber, 'sandbox': wmTask.data.input.sandbox,
-                               'owner': wmWorkload.getOwner().get('name', None),
-                               'ownerDN': wmWorkload.getOwner().get('dn', None),
-                               'ownerGroup': wmWorkload.getOwner().get('vogroup', ''),
-                               'ownerRole': wmWorkload.getOwner().get('vorole', ''),
-                               'numberOfCores': 1,
-                               'inputDataset': wmTask.getInputDatasetPath(),
-                               'inputPileup': wmTask.getInputPileupDatasets()}
-                try:
-                    maxCores = 1
-                    stepNames = wmTask.listAllStepNames()
-                    for stepName in stepNames:
-                        sh = wmTask.getStep(stepName)
-                        maxCores = max(maxCores, sh.getNumberOfCores())
-                    processDict.update({'numberOfCores': maxCores})
-                except AttributeError:
-                    logging.info("Failed to read multicore settings from task %s", wmTask.getPathName())
-
-                tempSubscription = Subscription(id=wmbsSubscription['id'])
-
-                # if we have glideinWMS constraints, then adapt all jobs
-                if self.glideinLimits:
-                    capResourceEstimates(wmbsJobGroups, self.glideinLimits)
-
-                nameDictList = []
-                for wmbsJobGroup in wmbsJobGroups:
-                    # For each jobGroup, put a dictionary
-                    # together and run it with creatorProcess
-                    jobsInGroup = len(wmbsJobGroup.jobs)
-                    wmbsJobGroup.subscription = tempSubscription
-                    tempDict = {}
-                    tempDict.update(processDict)
-                    tempDict['jobGroup'] = wmbsJobGroup
-                    tempDict['swVersion'] = wmTask.getSwVersion(allSteps=True)
-                    tempDict['scramArch'] = wmTask.getScramArch()
-                    tempDict['jobNumber'] = jobNumber
-                    tempDict['agentNumber'] = self.agentNumber
-                    tempDict['agentName'] = self.agentName
-                    tempDict['inputDatasetLocations'] = wmbsJobGroup.getLocationsForJobs()
-                    tempDict['allowOpportunistic'] = allowOpport
-
-                    jobGroup = creatorProcess(work=tempDict,
-                                              jobCacheDir=self.jobCacheDir)
-                    jobNumber += jobsInGroup
-
-                    # Set jobCache for group
-                    for job in jobGroup.jobs:
-                        nameDictList.append({'jobid': job['id'],
-                                             'cacheDir': job['cache_dir']})
-                        job["user"] = wmWorkload.getOwner()["name"]
-                        job["group"] = wmWorkload.getOwner()["group"]
-                # Set the caches in the database
-                try:
-                    if len(nameDictList) > 0:
-                        self.setBulkCache.execute(jobDictList=nameDictList,
-                                                  conn=myThread.transaction.conn,
-                                                  transaction=True)
-                except WMException:
-                    raise
-                except Exception as ex:
-                    msg = "Unknown exception while setting the bulk cache:\n"
-                    msg += str(ex)
-                    logging.error(msg)
-                    logging.debug("Error while setting bulkCache with following values: %s\n", nameDictList)
-                    raise JobCreatorException(msg)
-
-                # Advance the jobGroup in changeState
-                for wmbsJobGroup in wmbsJobGroups:
-                    self.advanceJobGroup(wmbsJobGroup=wmbsJobGroup)
-
-                # Now end the transaction so that everything is wrapped
-                # in a single rollback
-                myThread.transaction.commit()
+                logging.debug("Error while setting bulkCache with following values: %s\n", nameDictList)
+                raise JobCreatorException(msg)
+
+            # Advance the jobGroup in changeState
+            for wmbsJobGroup in wmbsJobGroups:
+                self.advanceJobGroup(wmbsJobGroup=wmbsJobGroup)
+
+            # Now end the transaction so that everything is wrapped
+            # in a single rollback
+            myThread.transaction.commit()
 
-            # END: While loop over jobFactory
+        # END: While loop over jobFactory
 
-            # Close the jobFactory
-            wmbsJobFactory.close()
+        # Close the jobFactory
+        wmbsJobFactory.close()
 
         return
 
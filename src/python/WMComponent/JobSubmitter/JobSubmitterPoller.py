@@ -14,11 +14,8 @@ import os.path
 import threading
 import json
 import time
+import heapq
 from collections import defaultdict, Counter
-try:
-    import cPickle as pickle
-except ImportError:
-    import pickle
 
 from Utils.Timers import timeFunction
 from WMCore.DAOFactory import DAOFactory
@@ -27,6 +24,7 @@ from WMCore.WMExceptions import WM_JOB_ERROR_CODES
 from WMCore.JobStateMachine.ChangeState import ChangeState
 from WMCore.WorkerThreads.BaseWorkerThread import BaseWorkerThread
 from WMCore.ResourceControl.ResourceControl import ResourceControl
+from WMCore.WMBS.JobArchive import JobLoader
 from WMCore.DataStructs.JobPackage import JobPackage
 from WMCore.FwkJobReport.Report import Report
 from WMCore.WMException import WMException
@@ -97,6 +95,7 @@ class JobSubmitterPoller(BaseWorkerThread):
         # Additions for caching-based JobSubmitter
         self.jobsByPrio = {}  # key'ed by the final job priority, which contains a set of job ids
         self.jobDataCache = {}  # key'ed by the job id, containing the whole job info dict
+        self.jobsBySiteType = {}  # key'ed by (site, task type), containing a dict of job prio to set of job ids
         self.jobsToPackage = {}
         self.locationDict = {}
         self.drainSites = dict()
@@ -290,126 +289,128 @@ class JobSubmitterPoller(BaseWorkerThread):
 
         logging.info("Determining possible sites for new jobs...")
         jobCount = 0
-        for newJob in newJobs:
-            jobCount += 1
-            if jobCount % 5000 == 0:
-                logging.info("Processed %d/%d new jobs.", jobCount, len(newJobs))
-
-            # whether newJob belongs to aborted or force-complete workflow, and skip it if it is.
-            if newJob['request_name'] in abortedAndForceCompleteRequests and \
-                            newJob['task_type'] not in ['LogCollect', "Cleanup"]:
-                continue
-
-            jobID = newJob['id']
-            newJobIds.add(jobID)
-            if jobID in self.jobDataCache:
-                continue
-
-            pickledJobPath = os.path.join(newJob["cache_dir"], "job.pkl")
+        jobLoader = JobLoader()
+        try:
+            for newJob in newJobs:
+                jobCount += 1
+                if jobCount % 5000 == 0:
+                    logging.info("Processed %d/%d new jobs.", jobCount, len(newJobs))
+
+                # whether newJob belongs to aborted or force-complete workflow, and skip it if it is.
+                if newJob['request_name'] in abortedAndForceCompleteRequests and \
+                                newJob['task_type'] not in ['LogCollect', "Cleanup"]:
+                    continue
 
-            if not os.path.isfile(pickledJobPath):
-                # Then we have a problem - there's no file
-                logging.error("Could not find pickled jobObject %s", pickledJobPath)
-                badJobs[71103].append(newJob)
-                continue
-            try:
-                with open(pickledJobPath, 'r') as jobHandle:
-                    loadedJob = pickle.load(jobHandle)
-            except Exception as ex:
-                msg = "Error while loading pickled job object %s\n" % pickledJobPath
-                msg += str(ex)
-                logging.error(msg)
-                raise JobSubmitterPollerException(msg)
-
-            # figure out possible locations for job
-            possibleLocations = loadedJob["possiblePSN"]
-
-            # Create another set of locations that may change when a site goes white/black listed
-            # Does not care about the non_draining or aborted sites, they may change and that is the point
-            potentialLocations = set()
-            potentialLocations.update(possibleLocations)
-
-            # check if there is at least one site left to run the job
-            if len(possibleLocations) == 0:
-                newJob['fileLocations'] = loadedJob.get('fileLocations', [])
-                newJob['siteWhitelist'] = loadedJob.get('siteWhitelist', [])
-                newJob['siteBlacklist'] = loadedJob.get('siteBlacklist', [])
-                logging.warning("Input data location doesn't pass the site restrictions for job id: %s", jobID)
-                badJobs[71101].append(newJob)
-                continue
+                jobID = newJob['id']
+                newJobIds.add(jobID)
+                if jobID in self.jobDataCache:
+                    continue
 
-            # if agent is in speed drain and has hit the threshold to submit to all sites, we can skip the logic below that exclude sites
-            if not self.enableAllSites:
-                # check for sites in aborted state and adjust the possible locations
-                nonAbortSites = [x for x in possibleLocations if x not in self.abortSites]
-                if nonAbortSites:  # if there is at least a non aborted/down site then run there, otherwise fail the job
-                    possibleLocations = nonAbortSites
-                else:
-                    newJob['possibleSites'] = possibleLocations
-                    logging.warning("Job id %s can only run at a site in Aborted state", jobID)
-                    badJobs[71102].append(newJob)
+                if not jobLoader.exists(newJob["cache_dir"], jobID):
+                    # Then we have a problem - there's no file
+                    logging.error("Could not find pickled jobObject %s in %s", jobID, newJob["cache_dir"])
+                    badJobs[71103].append(newJob)
+                    continue
+                try:
+                    loadedJob = jobLoader.load(newJob["cache_dir"], jobID)
+                except Exception as ex:
+                    msg = "Error while loading pickled job object %s in %s\n" % (jobID, newJob["cache_dir"])
+                    msg += str(ex)
+                    logging.error(msg)
+                    raise JobSubmitterPollerException(msg)
+
+                # figure out possible locations for job
+                possibleLocations = loadedJob["possiblePSN"]
+
+                # Create another set of locations that may change when a site goes white/black listed
+                # Does not care about the non_draining or aborted sites, they may change and that is the point
+                potentialLocations = set()
+                potentialLocations.update(possibleLocations)
+
+                # check if there is at least one site left to run the job
+                if len(possibleLocations) == 0:
+                    newJob['fileLocations'] = loadedJob.get('fileLocations', [])
+                    newJob['siteWhitelist'] = loadedJob.get('siteWhitelist', [])
+                    newJob['siteBlacklist'] = loadedJob.get('siteBlacklist', [])
+                    logging.warning("Input data location doesn't pass the site restrictions for job id: %s", jobID)
+                    badJobs[71101].append(newJob)
                     continue
 
-                # try to remove draining sites if possible, this is needed to stop
-                # jobs that could run anywhere blocking draining sites
-                # if the job type is Merge, LogCollect or Cleanup this is skipped
-                if newJob['task_type'] not in self.ioboundTypes:
-                    nonDrainingSites = [x for x in possibleLocations if x not in self.drainSites]
-                    if nonDrainingSites:  # if >1 viable non-draining site remove draining ones
-                        possibleLocations = nonDrainingSites
-                    elif self.failJobDrain(timeNow, possibleLocations):
-                        newJob['possibleSites'] = possibleLocations
-                        logging.warning("Job id %s can only run at a sites in Draining state", jobID)
-                        badJobs[71104].append(newJob)
-                        continue
+                # if agent is in speed drain and has hit the threshold to submit to all sites, we can skip the logic below that exclude sites
+                if not self.enableAllSites:
+                    # check for sites in aborted state and adjust the possible locations
+                    nonAbortSites = [x for x in possibleLocations if x not in self.abortSites]
+                    if nonAbortSites:  # if there is at least a non aborted/down site then run there, otherwise fail the job
+                        possibleLocations = nonAbortSites
                     else:
-                        countDrainingJobs += 1
+                        newJob['possibleSites'] = possibleLocations
+                        logging.warning("Job id %s can only run at a site in Aborted state", jobID)
+                        badJobs[71102].append(newJob)
                         continue
 
-            # Sigh...make sure the job added to the package has the proper retry_count
-            loadedJob['retry_count'] = newJob['retry_count']
-            batchDir = self.addJobsToPackage(loadedJob)
-
-            # calculate the final job priority such that we can order cached jobs by prio
-            jobPrio = newJob['task_prio'] * self.maxTaskPriority + newJob['wf_priority']
-            self.jobsByPrio.setdefault(jobPrio, set())
-            self.jobsByPrio[jobPrio].add(jobID)
-
-            # allow job baggage to override numberOfCores
-            #       => used for repacking to get more slots/disk
-            numberOfCores = loadedJob.get('numberOfCores', 1)
-            if numberOfCores == 1:
-                baggage = loadedJob.getBaggage()
-                numberOfCores = getattr(baggage, "numberOfCores", 1)
-            loadedJob['numberOfCores'] = numberOfCores
-
-            # Create a job dictionary object and put it in the cache (needs to be in sync with RunJob)
-            jobInfo = {'taskPriority': newJob['task_prio'],
-                       'activity': loadedJob.get("taskType"),
-                       'custom': {'location': None},  # update later
-                       'packageDir': batchDir,
-                       'retry_count': newJob["retry_count"],
-                       'sandbox': loadedJob["sandbox"],  # remove before submit
-                       'userdn': loadedJob.get("ownerDN", None),
-                       'usergroup': loadedJob.get("ownerGroup", ''),
-                       'userrole': loadedJob.get("ownerRole", ''),
-                       'possibleSites': frozenset(possibleLocations),  # abort and drain sites filtered out
-                       'potentialSites': frozenset(potentialLocations),  # original list of sites
-                       'scramArch': loadedJob.get("scramArch", None),
-                       'swVersion': loadedJob.get("swVersion", []),
-                       'proxyPath': loadedJob.get("proxyPath", None),
-                       'estimatedJobTime': loadedJob.get("estimatedJobTime", None),
-                       'estimatedDiskUsage': loadedJob.get("estimatedDiskUsage", None),
-                       'estimatedMemoryUsage': loadedJob.get("estimatedMemoryUsage", None),
-                       'numberOfCores': loadedJob.get("numberOfCores"),  # may update it later
-                       'inputDataset': loadedJob.get('inputDataset', None),
-                       'inputDatasetLocations': loadedJob.get('inputDatasetLocations', None),
-                       'inputPileup': loadedJob.get('inputPileup', None),
-                       'allowOpportunistic': loadedJob.get('allowOpportunistic', False)}
-            # then update it with the info retrieved from the database
-            jobInfo.update(newJob)
-
-            self.jobDataCache[jobID] = jobInfo
+                    # try to remove draining sites if possible, this is needed to stop
+                    # jobs that could run anywhere blocking draining sites
+                    # if the job type is Merge, LogCollect or Cleanup this is skipped
+                    if newJob['task_type'] not in self.ioboundTypes:
+                        nonDrainingSites = [x for x in possibleLocations if x not in self.drainSites]
+                        if nonDrainingSites:  # if >1 viable non-draining site remove draining ones
+                            possibleLocations = nonDrainingSites
+                        elif self.failJobDrain(timeNow, possibleLocations):
+                            newJob['possibleSites'] = possibleLocations
+                            logging.warning("Job id %s can only run at a sites in Draining state", jobID)
+                            badJobs[71104].append(newJob)
+                            continue
+                        else:
+                            countDrainingJobs += 1
+                            continue
+
+                # Sigh...make sure the job added to the package has the proper retry_count
+                loadedJob['retry_count'] = newJob['retry_count']
+                batchDir = self.addJobsToPackage(loadedJob)
+
+                # calculate the final job priority such that we can order cached jobs by prio
+                jobPrio = newJob['task_prio'] * self.maxTaskPriority + newJob['wf_priority']
+                self.jobsByPrio.setdefault(jobPrio, set())
+                self.jobsByPrio[jobPrio].add(jobID)
+
+                # allow job baggage to override numberOfCores
+                #       => used for repacking to get more slots/disk
+                numberOfCores = loadedJob.get('numberOfCores', 1)
+                if numberOfCores == 1:
+                    baggage = loadedJob.getBaggage()
+                    numberOfCores = getattr(baggage, "numberOfCores", 1)
+                loadedJob['numberOfCores'] = numberOfCores
+
+                # Create a job dictionary object and put it in the cache (needs to be in sync with RunJob)
+                jobInfo = {'taskPriority': newJob['task_prio'],
+                           'activity': loadedJob.get("taskType"),
+                           'custom': {'location': None},  # update later
+                           'packageDir': batchDir,
+                           'retry_count': newJob["retry_count"],
+                           'sandbox': loadedJob["sandbox"],  # remove before submit
+                           'userdn': loadedJob.get("ownerDN", None),
+                           'usergroup': loadedJob.get("ownerGroup", ''),
+                           'userrole': loadedJob.get("ownerRole", ''),
+                           'possibleSites': frozenset(possibleLocations),  # abort and drain sites filtered out
+                           'potentialSites': frozenset(potentialLocations),  # original list of sites
+                           'scramArch': loadedJob.get("scramArch", None),
+                           'swVersion': loadedJob.get("swVersion", []),
+                           'proxyPath': loadedJob.get("proxyPath", None),
+                           'estimatedJobTime': loadedJob.get("estimatedJobTime", None),
+                           'estimatedDiskUsage': loadedJob.get("estimatedDiskUsage", None),
+                           'estimatedMemoryUsage': loadedJob.get("estimatedMemoryUsage", None),
+                           'numberOfCores': loadedJob.get("numberOfCores"),  # may update it later
+                           'inputDataset': loadedJob.get('inputDataset', None),
+                           'inputDatasetLocations': loadedJob.get('inputDatasetLocations', None),
+                           'inputPileup': loadedJob.get('inputPileup', None),
+                           'allowOpportunistic': loadedJob.get('allowOpportunistic', False)}
+                # then update it with the info retrieved from the database
+                jobInfo.update(newJob)
+
+                self.jobDataCache[jobID] = jobInfo
+                self._indexJob(jobID, jobPrio, jobInfo)
+        finally:
+            jobLoader.close()
 
         # Register failures in submission
         for errorCode in badJobs:
@@ -461,14 +462,46 @@ class JobSubmitterPoller(BaseWorkerThread):
             return
 
         for jobid in jobIDsToPurge:
-            self.jobDataCache.pop(jobid, None)
+            jobInfo = self.jobDataCache.pop(jobid, None)
             for jobPrio in self.jobsByPrio:
                 if jobid in self.jobsByPrio[jobPrio]:
                     # then the jobid was found, go to the next one
                     self.jobsByPrio[jobPrio].discard(jobid)
+                    if jobInfo is not None:
+                        self._unindexJob(jobid, jobPrio, jobInfo)
                     break
         return
 
+    def _indexJob(self, jobID, jobPrio, jobInfo):
+        """
+        _indexJob_
+
+        Add a cached job to the (site, task type) index used by assignJobLocations
+        """
+        jobType = jobInfo['task_type']
+        for siteName in jobInfo['possibleSites']:
+            jobsByPrio = self.jobsBySiteType.setdefault((siteName, jobType), {})
+            jobsByPrio.setdefault(jobPrio, set()).add(jobID)
+        return
+
+    def _unindexJob(self, jobID, jobPrio, jobInfo):
+        """
+        _unindexJob_
+
+        Remove a job from the (site, task type) index
+        """
+        jobType = jobInfo['task_type']
+        for siteName in jobInfo['possibleSites']:
+            jobsByPrio = self.jobsBySiteType.get((siteName, jobType))
+            if jobsByPrio is None or jobPrio not in jobsByPrio:
+                continue
+            jobsByPrio[jobPrio].discard(jobID)
+            if not jobsByPrio[jobPrio]:
+                del jobsByPrio[jobPrio]
+            if not jobsByPrio:
+                del self.jobsBySiteType[(siteName, jobType)]
+        return
+
     def _handleSubmitFailedJobs(self, badJobs, exitCode):
         """
         __handleSubmitFailedJobs_
@@ -540,6 +573,7 @@ class JobSubmitterPoller(BaseWorkerThread):
             logging.info("Draining or Aborted sites have changed, the cache will be rebuilt.")
             self.jobsByPrio = {}
             self.jobDataCache = {}
+            self.jobsBySiteType = {}
 
         self.currentRcThresholds = rcThresholds
         self.abortSites = newAbortSites
@@ -636,6 +670,21 @@ class JobSubmitterPoller(BaseWorkerThread):
                      "Threshold": totalTaskTheshold}]
         return jobSubmitCondition(jobStats)
 
+    def _siteJobStream(self, siteType, saturated):
+        """
+        _siteJobStream_
+
+        Yield (-job prio, job id, (site, task type)) for the jobs indexed under a site
+        and task type, from the highest to the lowest prio and job id. The stream ends
+        as soon as the site/task type pair gets saturated.
+        """
+        jobsByPrio = self.jobsBySiteType.get(siteType, {})
+        for jobPrio in sorted(jobsByPrio, reverse=True):
+            for jobid in sorted(jobsByPrio.get(jobPrio, ())):
+                if siteType in saturated:
+                    return
+                yield (-jobPrio, jobid, siteType)
+
     def assignJobLocations(self):
         """
         _assignJobLocations_
@@ -652,60 +701,79 @@ class JobSubmitterPoller(BaseWorkerThread):
         """
         jobsToSubmit = {}
         jobsCount = 0
-        exitLoop = False
         jobSubmitLogBySites = defaultdict(lambda: defaultdict(Counter))
         jobSubmitLogByPriority = defaultdict(lambda: defaultdict(Counter))
 
-        # iterate over jobs from the highest to the lowest prio
-        for jobPrio in sorted(self.jobsByPrio, reverse=True):
-
-            # then we're completely done and have our basket full of jobs to submit
-            if exitLoop:
-                break
-
-            # can we assume jobid=1 is older than jobid=3? I think so...
-            for jobid in sorted(self.jobsByPrio[jobPrio]):
-                jobType = self.jobDataCache[jobid]['task_type']
-                possibleSites = self.jobDataCache[jobid]['possibleSites']
-                # remove sites with 0 task thresholds
-                possibleSites = self.checkZeroTaskThresholds(jobType, possibleSites)
-                jobSubmitLogByPriority[jobPrio][jobType]['Total'] += 1
-                # now look for sites with free pending slots
-                for siteName in possibleSites:
-                    condition = self._getJobSubmitCondition(jobPrio, siteName, jobType)
-                    if condition != "JobSubmitReady":
-                        jobSubmitLogBySites[siteName][jobType][condition] += 1
-                        logging.debug("Found a job for %s : %s", siteName, condition)
-                        continue
+        # (site, task type) pairs that can't take any other job in this cycle. Jobs are visited
+        # from the highest to the lowest prio and the pending counters only increase, so a pair
+        # which can't take a job can't take any of the following ones either.
+        saturated = set()
+        siteStreams = []
+        for siteType in self.jobsBySiteType:
+            siteName, jobType = siteType
+            if not self.checkZeroTaskThresholds(jobType, [siteName]):
+                saturated.add(siteType)
+                continue
+            condition = self._getJobSubmitCondition(max(self.jobsBySiteType[siteType]), siteName, jobType)
+            if condition != "JobSubmitReady":
+                jobSubmitLogBySites[siteName][jobType][condition] += 1
+                saturated.add(siteType)
+                continue
+            siteStreams.append(self._siteJobStream(siteType, saturated))
+
+        # iterate over jobs that can still go to one of their sites, from the highest to the lowest prio
+        # can we assume jobid=1 is older than jobid=3? I think so...
+        visited = set()
+        for negJobPrio, jobid, _ in heapq.merge(*siteStreams):
+            # a job is in the stream of each one of its sites
+            if jobid in visited:
+                continue
+            visited.add(jobid)
+            jobPrio = -negJobPrio
+            jobType = self.jobDataCache[jobid]['task_type']
+            possibleSites = self.jobDataCache[jobid]['possibleSites']
+            # remove sites with 0 task thresholds
+            possibleSites = self.checkZeroTaskThresholds(jobType, possibleSites)
+            jobSubmitLogByPriority[jobPrio][jobType]['Visited'] += 1
+            # now look for sites with free pending slots
+            for siteName in possibleSites:
+                if (siteName, jobType) in saturated:
+                    continue
+                condition = self._getJobSubmitCondition(jobPrio, siteName, jobType)
+                if condition != "JobSubmitReady":
+                    saturated.add((siteName, jobType))
+                    jobSubmitLogBySites[siteName][jobType][condition] += 1
+                    logging.debug("Found a job for %s : %s", siteName, condition)
+                    continue
 
-                    # pop the job dictionary object and update it
-                    cachedJob = self.jobDataCache.pop(jobid)
-                    cachedJob['custom'] = {'location': siteName}
-                    cachedJob['possibleSites'] = possibleSites
+                # jobs that will be submitted must leave the job data cache
+                cachedJob = self.jobDataCache.pop(jobid)
+                self.jobsByPrio[jobPrio].discard(jobid)
+                self._unindexJob(jobid, jobPrio, cachedJob)
 
-                    # Sort jobs by jobPackage and get it in place to be submitted by the plugin
-                    package = cachedJob['packageDir']
-                    jobsToSubmit.setdefault(package, [])
-                    jobsToSubmit[package].append(cachedJob)
+                # update the job dictionary object
+                cachedJob['custom'] = {'location': siteName}
+                cachedJob['possibleSites'] = possibleSites
 
-                    # update site/task thresholds and the component job counter
-                    self.currentRcThresholds[siteName]["total_pending_jobs"] += 1
-                    self.currentRcThresholds[siteName]['thresholds'][jobType]["task_pending_jobs"] += 1
-                    jobsCount += 1
-                    jobSubmitLogBySites[siteName][jobType]["submitted"] += 1
-                    jobSubmitLogByPriority[jobPrio][jobType]['submitted'] += 1
+                # Sort jobs by jobPackage and get it in place to be submitted by the plugin
+                package = cachedJob['packageDir']
+                jobsToSubmit.setdefault(package, [])
+                jobsToSubmit[package].append(cachedJob)
 
-                    # jobs that will be submitted must leave the job data cache
-                    self.jobsByPrio[jobPrio].discard(jobid)
+                # update site/task thresholds and the component job counter
+                self.currentRcThresholds[siteName]["total_pending_jobs"] += 1
+                self.currentRcThresholds[siteName]['thresholds'][jobType]["task_pending_jobs"] += 1
+                jobsCount += 1
+                jobSubmitLogBySites[siteName][jobType]["submitted"] += 1
+                jobSubmitLogByPriority[jobPrio][jobType]['submitted'] += 1
 
-                    # found a site to submit this job, so go to the next job
-                    break
+                # found a site to submit this job, so go to the next job
+                break
 
-                # set the flag and get out of the job iteration
-                if jobsCount >= self.maxJobsThisCycle:
-                    logging.info("Submitter reached limit of submit slots for this cycle: %i", self.maxJobsThisCycle)
-                    exitLoop = True
-                    break
+            # then we're completely done and have our basket full of jobs to submit
+            if jobsCount >= self.maxJobsThisCycle:
+                logging.info("Submitter reached limit of submit slots for this cycle: %i", self.maxJobsThisCycle)
+                break
 
         logging.info("Site submission report ...")
         for site in jobSubmitLogBySites:
@@ -713,6 +781,8 @@ class JobSubmitterPoller(BaseWorkerThread):
         logging.info("Priority submission report ...")
         for prio in jobSubmitLogByPriority:
             logging.info("    %s : %s", prio, json.dumps(jobSubmitLogByPriority[prio]))
+        logging.info("Visited %d out of %d cached jobs, %d site/task type pairs are full.",
+                     len(visited), len(self.jobDataCache) + jobsCount, len(saturated))
         logging.info("Have %s packages to submit.", len(jobsToSubmit))
         logging.info("Have %s jobs to submit.", jobsCount)
         logging.info("Done assigning site locations.")
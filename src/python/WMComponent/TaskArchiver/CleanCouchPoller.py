@@ -10,6 +10,7 @@ import shutil
 import threading
 import time
 import urllib2
+from array import array
 from contextlib import closing
 from Utils.Timers import timeFunction
 from WMComponent.JobCreator.CreateWorkArea import getMasterName
@@ -202,9 +203,10 @@ class CleanCouchPoller(BaseWorkerThread):
         2. Pulblish to Dashboard
         3. TODO: update LogCollect and Cleanup status in central couchdb
         """
-        # Upload summary to couch
+        # Upload summary to couch, these specs are only loaded once, don't keep them in the cache
         for workflow in finishedwfsWithLogCollectAndCleanUp:
-            spec = retrieveWMSpec(wmWorkloadURL=finishedwfsWithLogCollectAndCleanUp[workflow]["spec"])
+            spec = retrieveWMSpec(wmWorkloadURL=finishedwfsWithLogCollectAndCleanUp[workflow]["spec"],
+                                  cache=False)
             if spec:
                 self.archiveWorkflowSummary(spec=spec)
                 # Send Reconstruciton performance information to DashBoard
@@ -384,7 +386,7 @@ class CleanCouchPoller(BaseWorkerThread):
         wfsToDelete = {}
         for workflow in deletablewfs:
             try:
-                spec = retrieveWMSpec(wmWorkloadURL=deletablewfs[workflow]["spec"])
+                spec = retrieveWMSpec(wmWorkloadURL=deletablewfs[workflow]["spec"], cache=False)
 
                 # This is used both tier0 and normal agent case
                 result = self.centralRequestDBWriter.getStatusAndTypeByRequest(workflow)
@@ -761,7 +763,7 @@ class CleanCouchPoller(BaseWorkerThread):
                                                    "endkey": [workflowName],
                                                    "stale": "update_after"})['rows']
 
-        failedJobs = self.getFailedJobs(workflowName)
+        failedJobs = set(self.getFailedJobs(workflowName))
 
         taskList = {}
         finalTask = {}
@@ -779,8 +781,9 @@ class CleanCouchPoller(BaseWorkerThread):
         for taskName in taskList.keys():
             final = {}
             for stepName in taskList[taskName].keys():
-                output = {'jobTime': []}
-                outputFailed = {'jobTime': []}  # This will be same, but only for failed jobs
+                # the values are kept in arrays of doubles, a lot smaller than lists of floats
+                output = {'jobTime': array('d')}
+                outputFailed = {'jobTime': array('d')}  # This will be same, but only for failed jobs
                 final[stepName] = {}
                 masterList = []
 
@@ -791,10 +794,10 @@ class CleanCouchPoller(BaseWorkerThread):
                     for key in row.keys():
                         if key in ['startTime', 'stopTime', 'taskName', 'stepName', 'jobID']:
                             continue
-                        if key not in output.keys():
-                            output[key] = []
+                        if key not in output:
+                            output[key] = array('d')
                             if len(failedJobs) > 0:
-                                outputFailed[key] = []
+                                outputFailed[key] = array('d')
                         try:
                             output[key].append(float(row[key]))
                             if row['jobID'] in failedJobs:
@@ -888,9 +891,11 @@ class CleanCouchPoller(BaseWorkerThread):
                                                         "endkey": [workflowName, 999999999, 999999],
                                                         "stale": "update_after"})['rows']
         failedJobs = []
+        seenJobs = set()
         for row in errorView:
             jobId = row['value']['jobid']
-            if jobId not in failedJobs:
+            if jobId not in seenJobs:
+                seenJobs.add(jobId)
                 failedJobs.append(jobId)
 
         return failedJobs
@@ -114,8 +114,9 @@ class CouchFileset(Fileset):
             maskLumis = mask.getRunAndLumis()
             if maskLumis != {}:
                 # Then we actually have to do something
+                compiledMask = mask.compile()
                 for f in files:
-                    newRuns = mask.filterRunLumisByMask(runs=f['runs'])
+                    newRuns = compiledMask.filterRuns(runs=f['runs'])
                     if newRuns != set([]):
                         f['runs'] = newRuns
                         filteredFiles.append(f)
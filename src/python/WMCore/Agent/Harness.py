@@ -33,6 +33,7 @@ from WMCore import WMLogging
 from WMCore.Agent.ConfigDBMap import ConfigDBMap
 from WMCore.Agent.Daemon.Create import createDaemon
 from WMCore.Agent.HeartbeatAPI import HeartbeatAPI
+from WMCore.DAOFactory import DAOFactory
 from WMCore.Database.DBFactory import DBFactory
 from WMCore.Database.Transaction import Transaction
 from WMCore.WMException import WMException
@@ -183,6 +184,14 @@ class Harness:
                 myThread.dbi = myThread.dbFactory.connect()
                 myThread.transaction = Transaction(myThread.dbi)
 
+                # resolve the DAOs declared by the component upfront, e.g.:
+                # config.JobAccountant.preloadDAOs = {"WMCore.WMBS": ["Jobs.GetFWJRByState"]}
+                for package, classnames in getattr(compSect, "preloadDAOs", {}).items():
+                    daoFactory = DAOFactory(package=package, logger=myThread.logger,
+                                            dbinterface=myThread.dbi)
+                    loadTime = daoFactory.preload(classnames)
+                    logging.info(">>>Preloaded %d DAOs from %s in %.3f secs", len(classnames), package, loadTime)
+
             else:
 
                 myThread.dbi = myThread.config.CoreDatabase.connectUrl
@@ -7,9 +7,11 @@ Simple mathematical tools and tricks that might prove to
 be useful.
 """
 from __future__ import print_function, division
-import math
+import bisect
 import decimal
+import heapq
 import logging
+import math
 
 from WMCore.WMException import WMException
 
@@ -116,8 +118,8 @@ def createHistogram(numList, nBins, limit):
         return histogram
 
     histEvents.sort()
-    upperBound = max(histEvents)
-    lowerBound = min(histEvents)
+    upperBound = histEvents[-1]
+    lowerBound = histEvents[0]
     if lowerBound == upperBound:
         # This is a problem
         logging.debug("Only one value in the histogram!")
@@ -129,38 +131,22 @@ def createHistogram(numList, nBins, limit):
 
     for x in range(nBins):
         lowerEdge = floorTruncate(lowerBound + (x * binSize))
-        histogram.append({'type': 'standard',
-                          'lowerEdge': lowerEdge,
-                          'upperEdge': lowerEdge + binSize,
-                          'average': 0.0,
-                          'stdDev': 0.0,
-                          'nEvents': 0})
-
-    for bin in histogram:
-        if bin['type'] != 'standard':
-            continue
-        binList = []
-        for value in histEvents:
-            if value >= bin['lowerEdge'] and value <= bin['upperEdge']:
-                # Then we're in the bin
-                binList.append(value)
-            elif value > bin['upperEdge']:
-                # Because this is a sorted list we are now out of the bin range
-                # Calculate our values and break
-                break
-            else:
-                continue
-
-        # If we get here, it's because we're out of values in the bin
-        # Time to do some math
-        if len(binList) < 1:
-            # Nothing to do here, leave defaults
-            continue
-
-        binAvg, binStdDev = getAverageStdDev(numList=binList)
-        bin['average'] = binAvg
-        bin['stdDev']  = binStdDev
-        bin['nEvents'] = len(binList)
+        upperEdge = lowerEdge + binSize
+        # the values are sorted, the ones in [lowerEdge, upperEdge] are a slice
+        binList = histEvents[bisect.bisect_left(histEvents, lowerEdge):
+                             bisect.bisect_right(histEvents, upperEdge)]
+        bin = {'type': 'standard',
+               'lowerEdge': lowerEdge,
+               'upperEdge': upperEdge,
+               'average': 0.0,
+               'stdDev': 0.0,
+               'nEvents': 0}
+        if len(binList) > 0:
+            binAvg, binStdDev = getAverageStdDev(numList=binList)
+            bin['average'] = binAvg
+            bin['stdDev'] = binStdDev
+            bin['nEvents'] = len(binList)
+        histogram.append(bin)
 
     return histogram
 
@@ -200,13 +186,12 @@ def getLargestValues(dictList, key, n=1):
 
     Take a list of dictionaries, sort them by the value of a
     particular key, and return the n largest entries.
+    Same result as sorting the whole list, without sorting it.
 
     Key must be a numerical key.
     """
 
-    sortedList = sortDictionaryListByKey(dictList=dictList, key=key, reverse=True)
-
-    return sortedList[:n]
+    return heapq.nlargest(n, dictList, key=lambda k: k.get(key, 0.0))
 
 
 def validateNumericInput(value):
@@ -6,6 +6,9 @@ _ParseXMLFile_
 This holds the methods used to take an xmlFilename and return a tree structure.
 Used for the expat xml parsers
 
+xmlFileToNodeStream doesn't keep the whole tree: the nodes at a given depth
+are sent to a consumer as soon as they're closed and then dropped.
+
 """
 
 import os
@@ -68,6 +71,24 @@ def xmlFileToNode(reportFile):
     return node
 
 
+def xmlFileToNodeStream(xmlFile, target, dispatchDepth=2, leafHandlers=None):
+    """
+    _xmlFileToNodeStream_
+
+    Parse the XML file sending a (root node, node) tuple to the target
+    coroutine for every node at dispatchDepth (the root being at depth 1)
+    as soon as the node is closed. The root node has no children.
+
+    leafHandlers maps (parent name, element name) to a function called with
+    the parent node and the element attributes, these elements (and their
+    content) are folded into the parent instead of becoming nodes.
+
+    """
+    with open(xmlFile, 'r') as f:
+        expat_parse(f, streamBuild(target, dispatchDepth, leafHandlers or {}))
+    return
+
+
 def expat_parse(f, target):
     """
     _expat_parse_
@@ -113,3 +134,47 @@ def build(topNode):
             nodeStack[-1].text = str(''.join(charCache)).strip()
             nodeStack.pop()
             charCache = []
+
+
+@coroutine
+def streamBuild(target, dispatchDepth, leafHandlers):
+    """
+    _streamBuild_
+
+    Node builder fed from the expat_parse method that sends the nodes at
+    dispatchDepth to the target instead of adding them to their parent.
+    Folded elements are kept in the stack as None.
+
+    """
+    nodeStack = []
+    charCache = []
+    while True:
+        event, value = (yield)
+        if event == "start":
+            charCache = []
+            parent = nodeStack[-1] if nodeStack else None
+            if nodeStack and parent is None:
+                # inside a folded element
+                nodeStack.append(None)
+                continue
+            if parent is not None:
+                handler = leafHandlers.get((parent.name, value[0]))
+                if handler is not None:
+                    handler(parent, value[1])
+                    nodeStack.append(None)
+                    continue
+            newnode = Node(value[0], value[1])
+            if parent is not None and len(nodeStack) != dispatchDepth - 1:
+                parent.children.append(newnode)
+            nodeStack.append(newnode)
+
+        elif event == "text":
+            charCache.append(value)
+
+        else: # end
+            node = nodeStack.pop()
+            if node is not None:
+                node.text = str(''.join(charCache)).strip()
+                if len(nodeStack) == dispatchDepth - 1:
+                    target.send((nodeStack[0], node))
+            charCache = []
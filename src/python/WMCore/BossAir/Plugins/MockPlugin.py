@@ -8,14 +8,11 @@ Base class for BossAir plugins
 import os
 import logging
 from WMCore.BossAir.Plugins.BasePlugin import BasePlugin, BossAirPluginException
+from WMCore.FwkJobReport.Report import Report
 from datetime import datetime
 from datetime import timedelta
 from random import randint
 import multiprocessing
-try:
-    import cPickle as pickle
-except ImportError:
-    import pickle
 
 def processWorker(myinput, tmp):
     try:
@@ -34,10 +31,9 @@ def processWorker(myinput, tmp):
             taskName = targetDir.split('/')[5]
             if jj['cache_dir'].count("Production/LogCollect") > 0:
                 if lcreport is not None:
-                    lcreport.task = "/" + taskName + "/Production/LogCollect"
-                    with open(outfile, 'w') as f:
-                        logging.debug('Process worker is dumping the LogCollect report to ' + f.name)
-                        pickle.dump(lcreport, f)
+                    lcreport.data.task = "/" + taskName + "/Production/LogCollect"
+                    logging.debug('Process worker is dumping the LogCollect report to ' + outfile)
+                    lcreport.save(outfile)
                     continue
                 else:
                     msg = "Parameter lcFakeReport is mandatory if you are using logCollect jobs"
@@ -45,24 +41,24 @@ def processWorker(myinput, tmp):
 
             #ensure each lfn of each output file in the job is unique by adding the jobid
             jobid = str(jj['id'])
+            data = report.data
 
-            if hasattr(report, 'cmsRun1') and hasattr(report.cmsRun1.output, 'output'):
-                tmpname = report.cmsRun1.output.output.files.file0.lfn.split('.root')[0]
+            if hasattr(data, 'cmsRun1') and hasattr(data.cmsRun1.output, 'output'):
+                tmpname = data.cmsRun1.output.output.files.file0.lfn.split('.root')[0]
                 tmpname = tmpname + jobid
-                report.cmsRun1.output.output.files.file0.lfn = tmpname + '.root'
+                data.cmsRun1.output.output.files.file0.lfn = tmpname + '.root'
 
-            if hasattr(report, 'logArch1') and hasattr(report.logArch1, 'output'):
-                tmpname = report.logArch1.output.logArchive.files.file0.lfn.split('.tar.gz')[0]
+            if hasattr(data, 'logArch1') and hasattr(data.logArch1, 'output'):
+                tmpname = data.logArch1.output.logArchive.files.file0.lfn.split('.tar.gz')[0]
                 tmpname = tmpname + jobid
-                report.logArch1.output.logArchive.files.file0.lfn = tmpname + '.root'
+                data.logArch1.output.logArchive.files.file0.lfn = tmpname + '.root'
 
             #get target diretory and set task name
-            report.task = "/" + taskName + "/Production"
+            data.task = "/" + taskName + "/Production"
 
-            #pickle the report again
-            with open(outfile, 'w') as f:
-                logging.debug('Process worker is dumping the report to ' + f.name)
-                pickle.dump(report, f)
+            #save the report again
+            logging.debug('Process worker is dumping the report to ' + outfile)
+            report.save(outfile)
     except Exception as ex:
         logging.exception(ex)
 
@@ -162,13 +158,14 @@ class MockPlugin(BasePlugin):
             self.start( self.myinput )
 
         #for each job we will need to modify the default Report (the output of each job).
-        with open(self.fakeReport) as f:
-            report = pickle.load(f)
+        report = Report()
+        report.load(self.fakeReport)
 
         lcreport = getattr(self.config.BossAir.MockPlugin, 'lcFakeReport', None)
         if lcreport != None:
-            with open(lcreport) as f:
-                lcreport = pickle.load(f)
+            lcreportPath = lcreport
+            lcreport = Report()
+            lcreport.load(lcreportPath)
 
         for jj in jobs:
             if jj['id'] not in self.jobsScheduledEnd:
@@ -3,7 +3,47 @@ A basic action is a thing that will run a SQL statement
 
 A more complex one would be something that ran multiple SQL
 objects to produce a single output.
+
+DAO classes are resolved only once per process: the (package, dialect,
+classname) -> class mapping is kept in a module level registry shared by
+all the DAOFactory instances, together with the time spent importing each
+class and the number of instances created from it (see getDAOStats).
 """
+import threading
+import time
+
+# (package, dialect, classname) -> DAO class
+_daoClasses = {}
+# (package, dialect, classname) -> {'imported': seconds, 'instances': count}
+_daoStats = {}
+# engine dialect type -> dialect name
+_dialectNames = {}
+_registryLock = threading.Lock()
+
+
+def getDAOStats():
+    """
+    _getDAOStats_
+
+    Return a copy of the per DAO counters, keyed by "package.dialect.classname",
+    with the time spent importing it and the number of instances created
+    """
+    with _registryLock:
+        return dict(("%s.%s.%s" % key, dict(value)) for key, value in _daoStats.items())
+
+
+def clearDAORegistry():
+    """
+    _clearDAORegistry_
+
+    Forget all the resolved DAO classes and their counters
+    """
+    with _registryLock:
+        _daoClasses.clear()
+        _daoStats.clear()
+        _dialectNames.clear()
+
+
 class DAOFactory(object):
     def __init__(self, package='WMCore', logger=None, dbinterface=None, owner=""):
         self.package = package
@@ -16,28 +56,69 @@ class DAOFactory(object):
         self.dialects = {"Oracle" : OracleDialect,
                     "MySQL" : MySQLDialect,}
 
-    def __call__(self, classname):
+    def getDialect(self):
         """
-        Somewhat fugly method to load generic SQL classes...
+        _getDialect_
+
+        Name of the dialect package (Oracle, MySQL or CouchDB) for the
+        database interface, cached per engine dialect type
         """
-        if not isinstance(self.dbinterface, str):
+        if isinstance(self.dbinterface, str):
+            return 'CouchDB'
 
-            dia = self.dbinterface.engine.dialect
+        dia = self.dbinterface.engine.dialect
+        dialect = _dialectNames.get(type(dia))
+        if dialect is None:
             #TODO: Make good
-            dialect = None
             for i in self.dialects.keys():
                 if isinstance(dia, self.dialects[i]):
                     dialect = i
             if not dialect:
                 raise TypeError("unknown connection type: %s" % dia)
-        else:
-            dialect = 'CouchDB'
+            _dialectNames[type(dia)] = dialect
+        return dialect
+
+    def getDAOClass(self, classname):
+        """
+        _getDAOClass_
+
+        Resolve the DAO class for this package and dialect, importing
+        it only the first time it's requested in the process
+        """
+        key = (self.package, self.getDialect(), classname)
+        daoClass = _daoClasses.get(key)
+        if daoClass is None:
+            startTime = time.time()
+            module = "%s.%s.%s" % key
+            #self.logger.debug("importing %s, %s" % (module, classname))
+            module = __import__(module, globals(), locals(), [classname])#, -1)
+            daoClass = getattr(module, classname.split('.')[-1])
+            with _registryLock:
+                _daoClasses[key] = daoClass
+                _daoStats.setdefault(key, {'imported': time.time() - startTime, 'instances': 0})
+        return daoClass, key
+
+    def preload(self, classnames):
+        """
+        _preload_
 
+        Resolve a list of DAO classes upfront (e.g. at component startup),
+        so polling cycles don't pay for the imports.
+        Returns the time spent, in seconds.
+        """
+        startTime = time.time()
+        for classname in classnames:
+            self.getDAOClass(classname)
+        return time.time() - startTime
+
+    def __call__(self, classname):
+        """
+        Somewhat fugly method to load generic SQL classes...
+        """
+        instance, key = self.getDAOClass(classname)
+        with _registryLock:
+            _daoStats.setdefault(key, {'imported': 0.0, 'instances': 0})['instances'] += 1
 
-        module = "%s.%s.%s" % (self.package, dialect, classname)
-        #self.logger.debug("importing %s, %s" % (module, classname))
-        module = __import__(module, globals(), locals(), [classname])#, -1)
-        instance = getattr(module, classname.split('.')[-1])
         if self.owner:
             return instance(self.logger, self.dbinterface, self.owner)
         else:
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""
+_LumiIntervals_
+
+Interval based engine for run/lumi set algebra.
+
+Each run is stored as sorted, non-overlapping and non-adjacent [start, end]
+lumi intervals held in two array columns. Union, intersection and difference
+are done with single merge passes over the interval columns and membership
+checks are a binary search, so lumi ranges are never expanded into
+individual lumis.
+
+"""
+
+from __future__ import print_function, division
+
+from array import array
+from bisect import bisect_right
+
+# open ended lumi ranges (end == 0) run up to this lumi, same value LumiList
+# uses for a full run
+MAX_LUMI = 0xFFFFFFF
+TYPECODE = 'l'
+
+
+class RunIntervals(object):
+    """
+    _RunIntervals_
+
+    Sorted, non-overlapping lumi intervals of a single run
+    """
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self, starts=None, ends=None):
+        """
+        starts and ends must already be sorted and non-overlapping,
+        use fromRanges/fromLumis to build it from arbitrary input
+        """
+        self.starts = array(TYPECODE, starts or [])
+        self.ends = array(TYPECODE, ends or [])
+
+    @classmethod
+    def fromRanges(cls, ranges):
+        """
+        Build it from a list of [start, end] lumi pairs, in any order
+        and possibly overlapping. An end of 0 means up to the end of the
+        run, except for [0, 0] which is lumi 0 only (as in Mask).
+        """
+        newIntervals = cls()
+        for start, end in sorted((int(r[0]), int(r[1])) for r in ranges):
+            if end == 0 and start > 0:
+                end = MAX_LUMI
+            newIntervals._append(start, end)
+        return newIntervals
+
+    @classmethod
+    def fromLumis(cls, lumis):
+        """
+        Build it from a list of single lumi numbers, in any order
+        """
+        newIntervals = cls()
+        for lumi in sorted(set(int(l) for l in lumis)):
+            newIntervals._append(lumi, lumi)
+        return newIntervals
+
+    def _append(self, start, end):
+        """
+        Add an interval starting at or after the last one, coalescing it with
+        the last interval if they overlap or are adjacent
+        """
+        if self.ends and start <= self.ends[-1] + 1:
+            if end > self.ends[-1]:
+                self.ends[-1] = end
+        else:
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def __len__(self):
+        """
+        Number of intervals
+        """
+        return len(self.starts)
+
+    def __eq__(self, other):
+        return self.starts == other.starts and self.ends == other.ends
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __contains__(self, lumi):
+        """
+        Binary search for the interval that could contain the lumi
+        """
+        pos = bisect_right(self.starts, lumi) - 1
+        return pos >= 0 and lumi <= self.ends[pos]
+
+    def numLumis(self):
+        """
+        Number of lumis covered by the intervals
+        """
+        return sum(self.ends) - sum(self.starts) + len(self.starts)
+
+    def getRanges(self):
+        """
+        Return the intervals as a list of [start, end] pairs
+        """
+        return [[start, end] for start, end in zip(self.starts, self.ends)]
+
+    def filterLumis(self, lumis):
+        """
+        Return the lumis, in the original order, that are within the intervals
+        """
+        return [lumi for lumi in lumis if lumi in self]
+
+    def union(self, other):
+        """
+        Merge pass over both interval columns, ordered by start
+        """
+        result = RunIntervals()
+        i, j = 0, 0
+        nSelf, nOther = len(self.starts), len(other.starts)
+        while i < nSelf or j < nOther:
+            if j >= nOther or (i < nSelf and self.starts[i] <= other.starts[j]):
+                result._append(self.starts[i], self.ends[i])
+                i += 1
+            else:
+                result._append(other.starts[j], other.ends[j])
+                j += 1
+        return result
+
+    def intersection(self, other):
+        """
+        Two pointer walk emitting the overlap of each pair of intervals
+        """
+        result = RunIntervals()
+        i, j = 0, 0
+        nSelf, nOther = len(self.starts), len(other.starts)
+        while i < nSelf and j < nOther:
+            start = max(self.starts[i], other.starts[j])
+            end = min(self.ends[i], other.ends[j])
+            if start <= end:
+                result._append(start, end)
+            if self.ends[i] < other.ends[j]:
+                i += 1
+            else:
+                j += 1
+        return result
+
+    def difference(self, other):
+        """
+        Two pointer walk removing the other intervals from each of ours
+        """
+        result = RunIntervals()
+        j = 0
+        nOther = len(other.starts)
+        for start, end in zip(self.starts, self.ends):
+            current = start
+            while j < nOther and other.ends[j] < current:
+                j += 1
+            while j < nOther and other.starts[j] <= end:
+                if other.starts[j] > current:
+                    result._append(current, other.starts[j] - 1)
+                current = max(current, other.ends[j] + 1)
+                if other.ends[j] > end:
+                    break
+                j += 1
+            if current <= end:
+                result._append(current, end)
+        return result
+
+
+class LumiIntervals(object):
+    """
+    _LumiIntervals_
+
+    Run number -> RunIntervals mapping supporting the same set algebra as
+    LumiList (|, +, &, -, contains and filterLumis)
+    """
+
+    def __init__(self, compactList=None):
+        """
+        compactList is the LumiList compact format:
+        {'1': [[1, 33], [35, 35]], '2': [[1, 45]]}
+        """
+        self.runs = {}
+        for run, ranges in (compactList or {}).items():
+            runIntervals = RunIntervals.fromRanges(ranges)
+            if runIntervals:
+                self.runs[int(run)] = runIntervals
+
+    @classmethod
+    def fromLumiList(cls, lumiList):
+        """
+        Build it from a WMCore.DataStructs.LumiList object
+        """
+        return cls(lumiList.getCompactList())
+
+    def _combine(self, other, operation, runs):
+        """
+        Apply a RunIntervals operation run by run, keeping non-empty results
+        """
+        result = LumiIntervals()
+        empty = RunIntervals()
+        for run in runs:
+            runIntervals = operation(self.runs.get(run, empty), other.runs.get(run, empty))
+            if runIntervals:
+                result.runs[run] = runIntervals
+        return result
+
+    def __or__(self, other):
+        return self._combine(other, RunIntervals.union, set(self.runs) | set(other.runs))
+
+    def __add__(self, other):
+        # + is the same as |
+        return self.__or__(other)
+
+    def __and__(self, other):
+        return self._combine(other, RunIntervals.intersection, set(self.runs) & set(other.runs))
+
+    def __sub__(self, other):
+        return self._combine(other, RunIntervals.difference, set(self.runs))
+
+    def __len__(self):
+        """
+        Number of runs
+        """
+        return len(self.runs)
+
+    def __eq__(self, other):
+        return self.runs == other.runs
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __contains__(self, runLumi):
+        return self.contains(runLumi)
+
+    def contains(self, run, lumiSection=None):
+        """
+        Same input formats as LumiList.contains: a (run, lumi) tuple,
+        separate run and lumi numbers or a single run number
+        """
+        if lumiSection is None:
+            if isinstance(run, (int, long, basestring)):
+                return int(run) in self.runs
+            try:
+                run, lumiSection = run[0], run[1]
+            except (TypeError, IndexError):
+                raise RuntimeError("Improper format for run '%s'" % run)
+        runIntervals = self.runs.get(int(run))
+        if runIntervals is None:
+            return False
+        return lumiSection in runIntervals
+
+    def filterLumis(self, lumiList):
+        """
+        Return the (run, lumi) pairs of lumiList that are within the intervals
+        """
+        filteredList = []
+        for run, lumi in lumiList:
+            runIntervals = self.runs.get(int(run))
+            if runIntervals is not None and lumi in runIntervals:
+                filteredList.append((run, lumi))
+        return filteredList
+
+    def numLumis(self):
+        """
+        Number of lumis covered in all runs
+        """
+        return sum(runIntervals.numLumis() for runIntervals in self.runs.values())
+
+    def getCompactList(self):
+        """
+        Return the LumiList compact list representation
+        """
+        return dict((str(run), runIntervals.getRanges()) for run, runIntervals in self.runs.items())
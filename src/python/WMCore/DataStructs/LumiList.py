@@ -13,13 +13,14 @@ This code began life in COMP/CRAB/python/LumiList.py
 """
 
 
-import copy
 import itertools
 import json
 import re
 import urllib2
 from contextlib import closing
 
+from WMCore.DataStructs.LumiIntervals import LumiIntervals, RunIntervals
+
 class LumiList(object):
     """
     Deal with lists of lumis in several different forms:
@@ -55,6 +56,7 @@ class LumiList(object):
         """
         self.compactList = {}
         self.duplicates = {}
+        self._runIntervals = {}  # per run lookup cache used by contains
         if filename:
             self.filename = filename
             with open(self.filename,'r') as jsonFile:
@@ -146,80 +148,25 @@ class LumiList(object):
                     newLumis.append(lumi)
             self.compactList[run] = newLumis
 
+    def getIntervals(self):
+        """
+        Return the interval based representation (LumiIntervals) of this list
+        """
+        return LumiIntervals(self.compactList)
+
     def __sub__(self, other): # Things from self not in other
-        result = {}
-        for run in sorted(self.compactList.keys()):
-            alumis = sorted(self.compactList[run])
-            blumis = sorted(other.compactList.get(run, []))
-            alist = []                    # verified part
-            for alumi in alumis:
-                tmplist = [alumi[0], alumi[1]] # may be part
-                for blumi in blumis:
-                    if blumi[0] <= tmplist[0] and blumi[1] >= tmplist[1]: # blumi has all of alumi
-                        tmplist = []
-                        break # blumi is has all of alumi
-                    if blumi[0] > tmplist[0] and blumi[1] < tmplist[1]: # blumi is part of alumi
-                        alist.append([tmplist[0], blumi[0]-1])
-                        tmplist = [blumi[1]+1, tmplist[1]]
-                    elif blumi[0] <= tmplist[0] and blumi[1] < tmplist[1] and blumi[1]>=tmplist[0]: # overlaps start
-                        tmplist = [blumi[1]+1, tmplist[1]]
-                    elif blumi[0] > tmplist[0] and blumi[1] >= tmplist[1] and blumi[0]<=tmplist[1]: # overlaps end
-                        alist.append([tmplist[0], blumi[0]-1])
-                        tmplist = []
-                        break
-                if tmplist:
-                    alist.append(tmplist)
-            result[run] = alist
-
-        return LumiList(compactList = result)
+        result = self.getIntervals() - other.getIntervals()
+        return LumiList(compactList = result.getCompactList())
 
 
     def __and__(self, other): # Things in both
-        result = {}
-        aruns = set(self.compactList.keys())
-        bruns = set(other.compactList.keys())
-        for run in aruns & bruns:
-            lumiList = []                    # List for this run
-            unique = []                    # List for this run
-            for alumi in self.compactList[run]:
-                for blumi in other.compactList[run]:
-                    if blumi[0] <= alumi[0] and blumi[1] >= alumi[1]: # blumi has all of alumi
-                        lumiList.append(alumi)
-                    if blumi[0] > alumi[0] and blumi[1] < alumi[1]: # blumi is part of alumi
-                        lumiList.append(blumi)
-                    elif blumi[0] <= alumi[0] and blumi[1] < alumi[1] and blumi[1] >= alumi[0]: # overlaps start
-                        lumiList.append([alumi[0], blumi[1]])
-                    elif blumi[0] > alumi[0] and blumi[1] >= alumi[1] and blumi[0] <= alumi[1]: # overlaps end
-                        lumiList.append([blumi[0], alumi[1]])
-
-
-            if lumiList:
-                unique = [lumiList[0]]
-            for pair in lumiList[1:]:
-                if pair[0] == unique[-1][1]+1:
-                    unique[-1][1] = copy.deepcopy(pair[1])
-                else:
-                    unique.append(copy.deepcopy(pair))
-
-            result[run] = unique
-        return LumiList(compactList = result)
+        result = self.getIntervals() & other.getIntervals()
+        return LumiList(compactList = result.getCompactList())
 
 
     def __or__(self, other):
-        result = {}
-        aruns = self.compactList.keys()
-        bruns = other.compactList.keys()
-        runs = set(aruns + bruns)
-        for run in runs:
-            overlap = sorted(self.compactList.get(run, []) + other.compactList.get(run, []))
-            unique = [overlap[0]]
-            for pair in overlap[1:]:
-                if pair[0] >= unique[-1][0] and pair[0] <= unique[-1][1]+1 and pair[1] > unique[-1][1]:
-                    unique[-1][1] = copy.deepcopy(pair[1])
-                elif pair[0] > unique[-1][1]:
-                    unique.append(copy.deepcopy(pair))
-            result[run] = unique
-        return LumiList(compactList = result)
+        result = self.getIntervals() | other.getIntervals()
+        return LumiList(compactList = result.getCompactList())
 
 
     def __add__(self, other):
@@ -236,14 +183,7 @@ class LumiList(object):
         lumilist is of the simple form
         [(run1,lumi1),(run1,lumi2),(run2,lumi1)]
         """
-        filteredList = []
-        for (run, lumi) in lumiList:
-            runsInLumi = self.compactList.get(str(run), [[0, -1]])
-            for (first, last) in runsInLumi:
-                if lumi >= first and lumi <= last:
-                    filteredList.append((run, lumi))
-                    break
-        return filteredList
+        return self.getIntervals().filterLumis(lumiList)
 
 
     def __str__ (self):
@@ -349,6 +289,7 @@ class LumiList(object):
             run = str(run)
             if run in self.compactList:
                 del self.compactList[run]
+            self._runIntervals.pop(run, None)
 
         return
 
@@ -364,6 +305,7 @@ class LumiList(object):
 
         for run in runsToDelete:
             del self.compactList[run]
+            self._runIntervals.pop(run, None)
 
         return
 
@@ -389,17 +331,12 @@ class LumiList(object):
         if not lumiRangeList:
             # the run isn't there, so no need to look any further
             return False
-        for lumiRange in lumiRangeList:
-            # we want to make this as found if either the lumiSection
-            # is inside the range OR if the lumi section is greater
-            # than or equal to the lower bound of the lumi range and
-            # the upper bound is 0 (which means extends to the end of
-            # the run)
-            if lumiRange[0] <= lumiSection and \
-               (0 == lumiRange[1] or lumiSection <= lumiRange[1]):
-                # got it
-                return True
-        return False
+        # a range with an upper bound of 0 extends to the end of the run,
+        # RunIntervals takes care of that
+        runString = str(run)
+        if runString not in self._runIntervals:
+            self._runIntervals[runString] = RunIntervals.fromRanges(lumiRangeList)
+        return lumiSection in self._runIntervals[runString]
 
 
     def __contains__ (self, runTuple):
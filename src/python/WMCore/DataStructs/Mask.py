@@ -10,9 +10,98 @@ job in two ways:
 
 """
 
+from WMCore.DataStructs.LumiIntervals import LumiIntervals
 from WMCore.DataStructs.Run import Run
 
 
+class CompiledMask(object):
+    """
+    _CompiledMask_
+
+    Read-only lookup structure built once from the run/lumi ranges of a Mask
+    (or from a lumi mask dictionary like the splitting goodRunList), which
+    answers "is (run, lumi) in mask" with a binary search over the ranges.
+    An empty mask accepts every run and lumi, like Mask does.
+    """
+
+    def __init__(self, runAndLumis=None):
+        runAndLumis = runAndLumis or {}
+        self.acceptAll = not runAndLumis
+        self.runs = set(int(run) for run in runAndLumis)
+        self.intervals = LumiIntervals(runAndLumis)
+
+    def runInMask(self, run):
+        """
+        _runInMask_
+
+        See if a particular run is in the mask
+        """
+        return self.acceptAll or int(run) in self.runs
+
+    def runLumiInMask(self, run, lumi):
+        """
+        _runLumiInMask_
+
+        See if a particular runLumi is in the mask
+        """
+        return self.acceptAll or self.intervals.contains(run, lumi)
+
+    def filterLumis(self, run, lumis):
+        """
+        _filterLumis_
+
+        Return the lumis of a run, in the original order, that are in the mask
+        """
+        if self.acceptAll:
+            return list(lumis)
+        runIntervals = self.intervals.runs.get(int(run))
+        if runIntervals is None:
+            return []
+        return runIntervals.filterLumis(lumis)
+
+    def filterRun(self, run):
+        """
+        _filterRun_
+
+        Return a new Run object with only the lumis (and their events) in
+        the mask, or None if none of them is
+        """
+        if self.acceptAll:
+            return run
+        runIntervals = self.intervals.runs.get(int(run.run))
+        if runIntervals is None:
+            return None
+        filteredLumiEvents = [(lumi, events) for lumi, events in run.items() if lumi in runIntervals]
+        if not filteredLumiEvents:
+            return None
+        return Run(run.run, *filteredLumiEvents)
+
+    def filterRuns(self, runs):
+        """
+        _filterRuns_
+
+        Same as Mask.filterRunLumisByMask, runs with the same run number
+        are combined before being filtered
+        """
+        if self.acceptAll:
+            return runs
+
+        runDict = {}
+        for r in runs:
+            if r.run in runDict:
+                runDict[r.run].extendLumis(r.lumis)
+            else:
+                runDict[r.run] = r
+
+        newRuns = set()
+        for run in runDict.values():
+            newRun = self.filterRun(run)
+            if newRun is not None:
+                newRuns.add(newRun)
+
+        return newRuns
+
+
 class Mask(dict):
     """
     _Mask_
@@ -155,11 +244,22 @@ class Mask(dict):
 
         return self['runAndLumis']
 
+    def compile(self):
+        """
+        _compile_
+
+        Build a CompiledMask out of the current run/lumi ranges, to be used
+        when the same mask is checked against many lumis. It's a snapshot,
+        it does not follow later changes to the mask.
+        """
+        return CompiledMask(self['runAndLumis'])
+
     def runLumiInMask(self, run, lumi):
         """
         _runLumiInMask_
 
-        See if a particular runLumi is in the mask
+        See if a particular runLumi is in the mask. Use compile() instead
+        when checking many lumis against the same mask.
         """
 
         if self['runAndLumis'] == {}:
@@ -183,36 +283,7 @@ class Mask(dict):
         _filterRunLumisByMask_
 
         Pass a Mask a list of run objects, get back a list of
-        run objects that correspond to the actual mask allowed values
+        run objects that correspond to the actual mask allowed values.
+        Use compile() instead when filtering many files with the same mask.
         """
-        if self['runAndLumis'] == {}:
-            # Empty dictionary
-            # ALWAYS TRUE
-            return runs
-
-        runDict = {}
-        for r in runs:
-            if r.run in runDict:
-                runDict[r.run].extendLumis(r.lumis)
-            else:
-                runDict[r.run] = r
-
-        maskRuns = set(self["runAndLumis"].keys())
-        passedRuns = set([r.run for r in runs])
-        filteredRuns = maskRuns.intersection(passedRuns)
-
-        newRuns = set()
-        for runNumber in filteredRuns:
-            maskLumis = set()
-            for pair in self["runAndLumis"][runNumber]:
-                if pair[0] == pair[1]:
-                    maskLumis.add(pair[0])
-                else:
-                    maskLumis = maskLumis.union(range(pair[0], pair[1] + 1))
-
-            filteredLumis = set(runDict[runNumber].lumis).intersection(maskLumis)
-            if len(filteredLumis) > 0:
-                filteredLumiEvents = [(lumi, runDict[runNumber].getEventsByLumi(lumi)) for lumi in filteredLumis]
-                newRuns.add(Run(runNumber, *filteredLumiEvents))
-
-        return newRuns
+        return self.compile().filterRuns(runs)
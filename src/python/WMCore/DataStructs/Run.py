@@ -8,20 +8,62 @@ container representing a run, and its constituent lumi sections and event counts
 
 from __future__ import print_function
 
+from array import array
+from bisect import bisect_left
+
 from WMCore.DataStructs.WMObject import WMObject
 
+# array typecodes for the lumi and event count columns. Event counts use a
+# sentinel value since a lumi can be known without knowing its events.
+LUMI_TYPECODE = 'i'
+EVENTS_TYPECODE = 'l'
+NO_EVENTS = -1
+
+
+def _eventsToColumn(events):
+    """
+    Convert an event count (or None) into its storage value
+    """
+    if events is None:
+        return NO_EVENTS
+    return int(events)
+
+
+def _eventsFromColumn(value):
+    """
+    Convert a storage value back into an event count (or None)
+    """
+    if value == NO_EVENTS:
+        return None
+    return value
+
+
+def _addEvents(oldEvents, newEvents):
+    """
+    Merge rule used when the same lumi is added twice: events are summed,
+    unless the existing value is either 0 or None in which case it's replaced
+    """
+    if oldEvents:
+        return oldEvents + newEvents
+    return newEvents
+
 
 class Run(WMObject):
     """
     _Run_
 
     Run container, is a list of lumi sections with associate event counts
+
+    Lumis are kept sorted in two parallel array columns (lumi number and
+    event count), so index/contains lookups are a bisect and adding two
+    runs together is a single merge pass.
     """
 
     def __init__(self, runNumber=None, *newLumis):
         WMObject.__init__(self)
         self.run = runNumber
-        self.eventsPerLumi = {}
+        self._lumis = array(LUMI_TYPECODE)
+        self._events = array(EVENTS_TYPECODE)
         self.extendLumis(newLumis)
 
     def __str__(self):
@@ -33,9 +75,9 @@ class Run(WMObject):
         """
         if self.run != rhs.run:
             return self.run < rhs.run
-        if sorted(self.eventsPerLumi.keys()) != sorted(rhs.eventsPerLumi.keys()):
-            return sorted(self.eventsPerLumi.keys()) < sorted(rhs.eventsPerLumi.keys())
-        return self.eventsPerLumi < rhs.eventsPerLumi
+        if self._lumis != rhs._lumis:
+            return self._lumis < rhs._lumis
+        return self._events < rhs._events
 
     def __gt__(self, rhs):
         """
@@ -43,9 +85,9 @@ class Run(WMObject):
         """
         if self.run != rhs.run:
             return self.run > rhs.run
-        if sorted(self.eventsPerLumi.keys()) != sorted(rhs.eventsPerLumi.keys()):
-            return sorted(self.eventsPerLumi.keys()) > sorted(rhs.eventsPerLumi.keys())
-        return self.eventsPerLumi > rhs.eventsPerLumi
+        if self._lumis != rhs._lumis:
+            return self._lumis > rhs._lumis
+        return self._events > rhs._events
 
     def extend(self, items):
         """
@@ -66,15 +108,11 @@ class Run(WMObject):
             msg += "Run %s does not equal Run %s" % (self.run, rhs.run)
             raise RuntimeError(msg)
 
-        for lumi, events in rhs.eventsPerLumi.iteritems():
-            if lumi not in self.eventsPerLumi or not self.eventsPerLumi[lumi]:  # Either doesn't exist, 0, or None
-                self.eventsPerLumi[lumi] = events
-            else:
-                self.eventsPerLumi[lumi] += events
+        self._merge(rhs.items(), _addEvents)
         return self
 
     def __iter__(self):
-        return self.eventsPerLumi.__iter__()
+        return iter(self._lumis)
 
     def __next__(self):
         """
@@ -86,41 +124,45 @@ class Run(WMObject):
         """
         Number of lumis
         """
-        return self.eventsPerLumi.__len__()
+        return len(self._lumis)
+
+    def __contains__(self, lumi):
+        """
+        Check whether the lumi belongs to this run (binary search)
+        """
+        return self._find(lumi) is not None
 
     def __getitem__(self, key):
         """
         Get the nth lumi from the list (no event count)
         """
-        return sorted(self.eventsPerLumi.keys()).__getitem__(key)
+        if isinstance(key, slice):
+            return self._lumis[key].tolist()
+        return self._lumis[key]
 
     def __setitem__(self, key, lumi):
         """
         Replace the nth lumi from the list (no event count)
         """
-        try:
-            oldLumi = sorted(self.eventsPerLumi.keys())[key]  # Extract the lumi from the sorted list
-            del self.eventsPerLumi[oldLumi]  # Delete it and add the new one
-        except IndexError:
-            pass
+        self.__delitem__(key)
         self.appendLumi(lumi)
 
     def __delitem__(self, key):
         try:
-            oldLumi = sorted(self.eventsPerLumi.keys())[key]  # Extract the lumi from the sorted list
-            del self.eventsPerLumi[oldLumi]  # Delete it
+            del self._lumis[key]
+            del self._events[key]
         except IndexError:
             pass
 
     def __eq__(self, rhs):
         """
-        Check equality of run numbers and then underlying lumi/event dicts
+        Check equality of run numbers and then underlying lumi/event columns
         """
         if not isinstance(rhs, Run):
             return False
         if self.run != rhs.run:
             return False
-        return self.eventsPerLumi == rhs.eventsPerLumi
+        return self._lumis == rhs._lumis and self._events == rhs._events
 
     def __ne__(self, rhs):
         return not self.__eq__(rhs)
@@ -130,66 +172,176 @@ class Run(WMObject):
         Calculate the value of the hash
         """
         value = self.run.__hash__()
-        value += hash(frozenset(self.eventsPerLumi.items()))  # Hash that represents the dictionary
+        value += hash((tuple(self._lumis), tuple(self._events)))
         return value
 
+    def __getstate__(self):
+        """
+        Pickle the columns as plain lists, they are smaller than arrays
+        once pickled and python version agnostic
+        """
+        state = self.__dict__.copy()
+        state['_lumis'] = self._lumis.tolist()
+        state['_events'] = self._events.tolist()
+        return state
+
+    def __setstate__(self, state):
+        """
+        Restore a pickled Run, including the ones pickled before the
+        lumis were stored in columns (with an eventsPerLumi dictionary)
+        """
+        state = dict(state)
+        oldEventsPerLumi = state.pop('eventsPerLumi', None)
+        self.__dict__.update(state)
+        self._lumis = array(LUMI_TYPECODE, state.get('_lumis', []))
+        self._events = array(EVENTS_TYPECODE, state.get('_events', []))
+        if oldEventsPerLumi is not None:
+            self.eventsPerLumi = oldEventsPerLumi
+
+    def _find(self, lumi):
+        """
+        Return the position of lumi in the lumi column, or None if missing
+        """
+        try:
+            lumi = int(lumi)
+        except (TypeError, ValueError):
+            return None
+        pos = bisect_left(self._lumis, lumi)
+        if pos < len(self._lumis) and self._lumis[pos] == lumi:
+            return pos
+        return None
+
+    def _merge(self, pairs, combine):
+        """
+        Merge an iterable of (lumi, events) pairs, sorted by lumi, into the
+        columns in a single pass. combine(oldEvents, newEvents) decides the
+        events stored for lumis present on both sides.
+        """
+        oldLumis = self._lumis
+        oldEvents = self._events
+        newLumis = array(LUMI_TYPECODE)
+        newEvents = array(EVENTS_TYPECODE)
+
+        i = 0
+        nOld = len(oldLumis)
+        for lumi, events in pairs:
+            lumi = int(lumi)
+            while i < nOld and oldLumis[i] < lumi:
+                newLumis.append(oldLumis[i])
+                newEvents.append(oldEvents[i])
+                i += 1
+            if i < nOld and oldLumis[i] == lumi:
+                events = combine(_eventsFromColumn(oldEvents[i]), events)
+                i += 1
+            newLumis.append(lumi)
+            newEvents.append(_eventsToColumn(events))
+
+        newLumis.extend(oldLumis[i:])
+        newEvents.extend(oldEvents[i:])
+        self._lumis = newLumis
+        self._events = newEvents
+
+    def items(self):
+        """
+        Generator of (lumi, events) pairs sorted by lumi
+        """
+        for lumi, events in zip(self._lumis, self._events):
+            yield lumi, _eventsFromColumn(events)
+
     @property
     def lumis(self):
         """
         Property that makes existing uses of myRun.lumis function by returning a list
         """
-        return sorted(self.eventsPerLumi.keys())
+        return self._lumis.tolist()
 
     @lumis.setter
     def lumis(self, lumiList):
         """
         Setter to allow for replacement of the lumis with a list or list of tuples
         """
-        self.eventsPerLumi = {}  # Remove existing dictionary
+        newLumis = {}
         for lumi in lumiList:
             if isinstance(lumi, (list, tuple)):
-                self.eventsPerLumi[lumi[0]] = lumi[1]
+                newLumis[int(lumi[0])] = lumi[1]
             else:
-                self.eventsPerLumi[lumi] = None
+                newLumis[int(lumi)] = None
+        pairs = sorted(newLumis.items())
+        self._lumis = array(LUMI_TYPECODE, [lumi for lumi, _ in pairs])
+        self._events = array(EVENTS_TYPECODE, [_eventsToColumn(events) for _, events in pairs])
+
+    @property
+    def eventsPerLumi(self):
+        """
+        Dictionary of lumi -> events (None if unknown), built from the columns
+        """
+        return dict(self.items())
+
+    @eventsPerLumi.setter
+    def eventsPerLumi(self, lumiDict):
+        """
+        Replace the lumis and event counts with the content of a dictionary
+        """
+        self.lumis = list(lumiDict.items())
 
     def extendLumis(self, lumiList):
         """
         Method to replace myRun.lumis.extend() which does not work with the property
         """
+        # accumulate the final value of every touched lumi, then merge once
+        updates = {}
+
+        def currentEvents(lumi):
+            if lumi in updates:
+                return updates[lumi]
+            return self.getEventsByLumi(lumi)
+
         for lumi in lumiList:
             if not isinstance(lumi, (list, tuple)):  # comma separated lumi numbers
-                self.eventsPerLumi[lumi] = None
+                updates[int(lumi)] = None
             else:
                 if isinstance(lumi, list) and not isinstance(lumi[0], tuple):  # then it's a plain list
                     for l in lumi:
-                        self.eventsPerLumi[l] = None
+                        updates[int(l)] = None
                 else:
                     if isinstance(lumi, tuple):  # it's an unpacked list of tuples
                         lumi = [(lumi)]
                     # it's a list/tuple of tuples
                     for tp in lumi:
-                        if tp[0] in self.eventsPerLumi and self.eventsPerLumi[tp[0]]:
-                            self.eventsPerLumi[tp[0]] += tp[1]  # Already exists, add events
-                        else:  # Doesn't exist or is 0 or None
-                            self.eventsPerLumi[tp[0]] = tp[1]
+                        lumiNumber = int(tp[0])
+                        updates[lumiNumber] = _addEvents(currentEvents(lumiNumber), tp[1])
+
+        if updates:
+            self._merge(sorted(updates.items()), lambda oldEvents, newEvents: newEvents)
 
     def appendLumi(self, lumi):
         """
         Method to replace myRun.lumis.append() which does not work with the property
         """
-        if isinstance(lumi, (list, tuple)) and self.eventsPerLumi[lumi[0]]:  # Already exists, add events
-            self.eventsPerLumi[lumi[0]] += lumi[1]
-        elif isinstance(lumi, (list, tuple)):  # Doesn't exist or is 0 or None
-            self.eventsPerLumi[lumi[0]] = lumi[1]
+        if isinstance(lumi, (list, tuple)):
+            lumiNumber, events = int(lumi[0]), lumi[1]
+            combine = _addEvents
         else:  # Just given lumis, not events
-            if lumi not in self.eventsPerLumi:  # Don't overwrite existing events
-                self.eventsPerLumi[lumi] = None
+            lumiNumber, events = int(lumi), None
+            # Don't overwrite existing events
+            combine = lambda oldEvents, newEvents: oldEvents
+
+        pos = self._find(lumiNumber)
+        if pos is not None:
+            self._events[pos] = _eventsToColumn(combine(_eventsFromColumn(self._events[pos]), events))
+        else:
+            pos = bisect_left(self._lumis, lumiNumber)
+            self._lumis.insert(pos, lumiNumber)
+            self._events.insert(pos, _eventsToColumn(events))
 
     def getEventsByLumi(self, lumi):
         """
         getter to select event counts by given lumi
         """
-        return self.eventsPerLumi.get(lumi)
+        pos = self._find(lumi)
+        if pos is None:
+            return None
+        return _eventsFromColumn(self._events[pos])
 
     def json(self):
         """
@@ -217,8 +369,6 @@ class Run(WMObject):
         Convert JSON data back into a Run object with integer lumi numbers
         """
         self.run = jsondata["Run"]
-        self.eventsPerLumi = {}
-        for lumi, events in jsondata["Lumis"].iteritems():
-            self.eventsPerLumi[int(lumi)] = events  # Make the keys integers again
+        self.eventsPerLumi = jsondata["Lumis"]  # keys are made integers again
 
         return self
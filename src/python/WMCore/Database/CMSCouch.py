@@ -385,6 +385,46 @@ class Database(CouchDBRequests):
             self.updateBulkDocumentsWithConflictHandle(conflictDocIDs, updateParams, maxConflictLimit=maxConflictLimit - 1)
         return []
 
+    def updateBulkDocumentsWithFunction(self, doc_ids, updateFunc, updateLimits=1000, maxConflictLimit=10):
+        """
+        param: doc_ids: list couch doc ids for updates, shouldn't contain any duplicate or empty string
+        param: updateFunc: function called with the doc id and the current document (None if the
+                           document doesn't exist), returning the document to be written back
+        param: updateLimits: number of documents in one commit
+        param: maxConflictLimit: number of conflicts fix tries before we give up to fix it to prevent infinite calls
+        return: list of the doc ids which couldn't be updated, still in conflict or
+                failed with another error (e.g. forbidden)
+
+        Documents in conflict are loaded again and updateFunc is applied to their new revision.
+        """
+        uri = '/%s/_bulk_docs/' % self.name
+        conflictDocIDs = []
+        failedDocIDs = []
+        for ids in grouper(doc_ids, updateLimits):
+            # get original documents
+            rows = self.allDocs(options={"include_docs": True}, keys=ids)['rows']
+            data = {'docs': []}
+            for row in rows:
+                data['docs'].append(updateFunc(row['key'], row.get('doc')))
+
+            if len(data['docs']) > 0:
+                retval = self.post(uri, data)
+                for result in retval:
+                    error = result.get('error', None)
+                    if error == 'conflict':
+                        conflictDocIDs.append(result['id'])
+                    elif error is not None:
+                        logging.error("Failed to update document %s in %s: %s, %s", result['id'],
+                                      self.name, error, result.get('reason', ''))
+                        failedDocIDs.append(result['id'])
+
+        if len(conflictDocIDs) > 0 and maxConflictLimit > 0:
+            # wait a second before trying again for the confict documents
+            time.sleep(1)
+            conflictDocIDs = self.updateBulkDocumentsWithFunction(conflictDocIDs, updateFunc, updateLimits,
+                                                                  maxConflictLimit=maxConflictLimit - 1)
+        return failedDocIDs + conflictDocIDs
+
     def putDocument(self, doc_id, fields):
         """
         Call the update function update_func defined in the design document
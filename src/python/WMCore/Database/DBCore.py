@@ -6,6 +6,7 @@ Core Database APIs
 
 
 """
+import re
 from copy import copy
 
 from Utils.IteratorTools import grouper
@@ -36,6 +37,8 @@ class DBInterface(WMObject):
         self.logger.info ("Instantiating base WM DBInterface")
         self.engine = engine
         self.maxBindsPerQuery = 500
+        # Oracle does not accept more than 1000 expressions in an IN-list
+        self.maxInListSize = 1000
 
     def buildbinds(self, sequence, thename, therest=[{}]):
         """
@@ -113,6 +116,73 @@ class DBInterface(WMObject):
         result = connection.execute(s, b)
         return self.makelist(result)
 
+    def buildInList(self, sqlstmt, bindName, values):
+        """
+        _buildInList_
+
+        Expand the :bindName bind of sqlstmt into a list of binds, one for
+        each value, ready to be used in an IN clause. To avoid a different
+        statement for every list length (and a hard parse for each of them
+        in Oracle), the list is padded up to the next power of two by
+        repeating the last value.
+
+        returns the new statement and its binds dictionary
+        """
+        listSize = 1
+        while listSize < len(values):
+            listSize *= 2
+        listSize = min(listSize, max(self.maxInListSize, len(values)))
+        values = list(values) + [values[-1]] * (listSize - len(values))
+
+        bindNames = ["%s_%d" % (bindName, i) for i in range(listSize)]
+        inList = ", ".join(":%s" % name for name in bindNames)
+        newsql = re.sub(r":%s(?!\w)" % re.escape(bindName), inList, sqlstmt)
+        return newsql, dict(zip(bindNames, values))
+
+    def processBulkSelect(self, sqlstmt, bindName, values, binds=None,
+                          conn=None, transaction=False, returnCursor=False):
+        """
+        _processBulkSelect_
+
+        Run a select for a (possibly very long) list of values of a single
+        bind variable, batching the values into IN-lists instead of doing a
+        round trip per value like processData would. The bind must be used
+        in an IN clause, e.g.:
+
+        SELECT run, lumi FROM wmbs_file_runlumi_map WHERE fileid IN (:fileid)
+
+        binds is an optional dictionary with the other (common) bind
+        variables of the statement. Values are deduplicated and run in
+        chunks of at most maxInListSize.
+
+        returns a list with a single ResultSet holding all the rows, or
+        the list of result proxies (one per chunk) if returnCursor is True
+        """
+        values = list(set(self.makelist(values)))
+        result = ResultSet()
+        if not values:
+            return [result]
+
+        sqlList = []
+        bindList = []
+        for subValues in grouper(values, self.maxInListSize):
+            newsql, newbinds = self.buildInList(sqlstmt, bindName, subValues)
+            newbinds.update(binds or {})
+            sqlList.append(newsql)
+            bindList.append(newbinds)
+
+        if returnCursor:
+            return self.processData(sqlList, bindList, conn=conn,
+                                    transaction=transaction, returnCursor=True)
+
+        for resultSet in self.processData(sqlList, bindList, conn=conn,
+                                          transaction=transaction):
+            if resultSet.data and not result.keys:
+                result.keys.extend(resultSet.keys)
+            result.data.extend(resultSet.data)
+
+        return [result]
+
     def connection(self):
         """
         Return a connection to the engine (from the connection pool)
@@ -9,8 +9,36 @@ interactions.
 import datetime
 import time
 import types
+from collections import namedtuple
 
 from WMCore.DataStructs.WMObject import WMObject
+from WMCore.Database.ResultSet import ResultSet
+
+# namedtuple classes used for streamed rows, one per set of column names
+_rowClasses = {}
+
+
+def columnNames(keys):
+    """
+    _columnNames_
+
+    Normalise the column names of a result (Oracle returns them in CAPS)
+    """
+    if isinstance(keys, types.MethodType):
+        keys = keys()
+    return tuple(str(x).lower() for x in keys)
+
+
+def rowClass(names):
+    """
+    _rowClass_
+
+    Return the (cached) namedtuple class for a tuple of column names.
+    Names which are not valid identifiers are renamed to _<position>.
+    """
+    if names not in _rowClasses:
+        _rowClasses[names] = namedtuple("DBRow", names, rename=True)
+    return _rowClasses[names]
 
 
 class DBFormatter(WMObject):
@@ -68,19 +96,10 @@ class DBFormatter(WMObject):
         """
         dictOut = []
         for r in result:
-            descriptions = r.keys
+            # WARNING: Oracle returns table names in CAP!
+            descriptions = columnNames(r.keys)
             for i in r.fetchall():
-                # WARNING: this can generate errors for some stupid reason
-                # in both oracle and mysql.
-                entry = {}
-                for index in xrange(0, len(descriptions)):
-                    # WARNING: Oracle returns table names in CAP!
-                    if isinstance(i[index], unicode):
-                        entry[str(descriptions[index].lower())] = str(i[index])
-                    else:
-                        entry[str(descriptions[index].lower())] = i[index]
-
-                dictOut.append(entry)
+                dictOut.append(dict(zip(descriptions, [str(x) if isinstance(x, unicode) else x for x in i])))
 
             r.close()
 
@@ -125,10 +144,7 @@ class DBFormatter(WMObject):
         Use fetchmany(size = default arraysize = 50)
 
         """
-        if isinstance(cursor.keys, types.MethodType):
-            keys = [x.lower() for x in cursor.keys()]
-        else:
-            keys = [x.lower() for x in cursor.keys]
+        keys = columnNames(cursor.keys)
         result = []
         while True:
             if not cursor.closed:
@@ -144,6 +160,66 @@ class DBFormatter(WMObject):
             cursor.close()
         return result
 
+    def iterRows(self, results, size=1000):
+        """
+        _iterRows_
+
+        Generator over the rows of a list of ResultSet or of result proxies
+        (processData with returnCursor=True), the latter are read with
+        fetchmany(size) as rows are consumed and closed once exhausted.
+        Column names are mapped only once per result and every row is
+        yielded as a namedtuple (lower case column names as attributes).
+        """
+        for result in self.dbi.makelist(results):
+            if isinstance(result, ResultSet):
+                if not result.data:
+                    continue
+                makeRow = rowClass(columnNames(result.keys))._make
+                for row in result.data:
+                    yield makeRow([str(x) if isinstance(x, unicode) else x for x in row])
+                continue
+
+            try:
+                if result.closed or not result.returns_rows:
+                    continue
+                makeRow = rowClass(columnNames(result.keys))._make
+                while True:
+                    rows = result.fetchmany(size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield makeRow([str(x) if isinstance(x, unicode) else x for x in row])
+            finally:
+                result.close()
+
+    def iterQuery(self, sqlstmt, binds=None, bindName=None, conn=None,
+                  transaction=False, size=1000):
+        """
+        _iterQuery_
+
+        Run a select with returnCursor=True and stream its rows (see
+        iterRows) straight from the cursor, instead of loading them all
+        into a ResultSet first. If bindName is given, binds[bindName] is a
+        list of values run through processBulkSelect. When conn is None a
+        connection is taken from the pool and held until the rows are
+        exhausted (or the generator is closed).
+        """
+        binds = dict(binds or {})
+        connection = conn or self.dbi.connection()
+        try:
+            if bindName:
+                results = self.dbi.processBulkSelect(sqlstmt, bindName, binds.pop(bindName), binds,
+                                                     conn=connection, transaction=transaction,
+                                                     returnCursor=True)
+            else:
+                results = self.dbi.processData(sqlstmt, binds, conn=connection,
+                                               transaction=transaction, returnCursor=True)
+            for row in self.iterRows(results, size):
+                yield row
+        finally:
+            if not conn:
+                connection.close()
+
     def getBinds(self, **kwargs):
         binds = {}
         for i in kwargs.keys():
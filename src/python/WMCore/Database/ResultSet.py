@@ -8,9 +8,6 @@ like the SQLAlchemy class to minimise the impact of adding this class.
 
 
 
-
-import threading
-
 class ResultSet:
     def __init__(self):
         self.data = []
@@ -30,14 +27,12 @@ class ResultSet:
 
     def add(self, resultproxy):
 
-        myThread = threading.currentThread()
-
         if resultproxy.closed:
             return
         elif resultproxy.returns_rows:
-            for r in resultproxy:
-                if len(self.keys) == 0:
-                    self.keys.extend(r.keys())
-                self.data.append(r)
+            rows = resultproxy.fetchall()
+            if rows and len(self.keys) == 0:
+                self.keys.extend(rows[0].keys())
+            self.data.extend(rows)
 
         return
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+"""
+_CompactReport_
+
+Versioned, compact on-disk format for framework job reports.
+
+A report is written as an indexed container (see Utils.IndexedContainer):
+
+  WMFWJR <version> <header length>\\n
+  <JSON header>
+  <blobs>
+
+The JSON header is an index of the ConfigSection tree: every section down to
+LAZY_DEPTH levels (report -> steps -> step sections such as output, errors or
+performance -> output modules, input sources...) has its own zlib compressed
+pickle blob with its plain settings, deeper subtrees are pickled as a single
+blob. Reports can then be loaded lazily: only the top level settings (list
+of steps, task, job id...) are decoded upfront and each section is decoded
+the first time it's accessed.
+"""
+
+from __future__ import division
+
+import io
+import zlib
+
+from Utils.IndexedContainer import encodeHeader, readHeader, replaceFile
+from WMCore.Configuration import ConfigSection
+from WMCore.WMException import WMException
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+MAGIC = "WMFWJR"
+FORMAT_VERSION = 1
+LAZY_DEPTH = 3
+# readable by both python 2 and 3
+PICKLE_PROTOCOL = 2
+
+
+class CompactReportException(WMException):
+    """
+    _CompactReportException_
+
+    Malformed or unsupported compact report
+    """
+    pass
+
+
+class LazySection(ConfigSection):
+    """
+    _LazySection_
+
+    ConfigSection whose child sections are decoded from the report blobs
+    the first time they're accessed
+    """
+
+    def __init__(self, name=None, blobs=None):
+        ConfigSection.__init__(self, name)
+        self._internal_lazy_blobs = blobs
+        self._internal_lazy_nodes = {}
+
+    def __getattr__(self, name):
+        # only called for attributes not set yet, i.e. sections still encoded
+        if name.startswith("_internal_"):
+            raise AttributeError(name)
+        nodes = self.__dict__.get("_internal_lazy_nodes")
+        if not nodes or name not in nodes:
+            raise AttributeError("'%s' object has no attribute '%s'" % (self.__class__.__name__, name))
+        section = _decodeNode(name, nodes.pop(name), self._internal_lazy_blobs, lazy=True)
+        setattr(self, name, section)
+        return section
+
+    def __delattr__(self, name):
+        nodes = self.__dict__.get("_internal_lazy_nodes")
+        if nodes and name in nodes:
+            del nodes[name]
+            self._internal_children.discard(name)
+            self._internal_settings.discard(name)
+            return
+        ConfigSection.__delattr__(self, name)
+
+    def section_(self, sectionName):
+        nodes = self.__dict__.get("_internal_lazy_nodes")
+        if nodes and sectionName in nodes:
+            return getattr(self, sectionName)
+        return ConfigSection.section_(self, sectionName)
+
+    def materialize_(self):
+        """
+        _materialize_
+
+        Decode all the pending sections of this subtree
+        """
+        for name in list(self.__dict__.get("_internal_lazy_nodes", {})):
+            getattr(self, name)
+        for name in self._internal_children:
+            child = getattr(self, name)
+            if isinstance(child, LazySection):
+                child.materialize_()
+
+    def __getstate__(self):
+        self.materialize_()
+        state = dict(self.__dict__)
+        state.pop("_internal_lazy_blobs", None)
+        state.pop("_internal_lazy_nodes", None)
+        return state
+
+
+def _dumpDetached(section):
+    """
+    Pickle a section subtree without following the reference to its parent
+    """
+    parent = section._internal_parent_ref
+    section._internal_parent_ref = None
+    try:
+        return pickle.dumps(section, PICKLE_PROTOCOL)
+    finally:
+        section._internal_parent_ref = parent
+
+
+def _encodeSection(section, depth, chunks):
+    """
+    Add the blobs of a section to chunks and return its header node
+    """
+
+    def addBlob(data):
+        data = zlib.compress(data)
+        offset = chunks[-1][0] + len(chunks[-1][1]) if chunks else 0
+        chunks.append((offset, data))
+        return [offset, len(data)]
+
+    settings = {}
+    sections = {}
+    for name in section._internal_settings:
+        value = getattr(section, name)
+        if isinstance(value, ConfigSection):
+            if depth > 1:
+                sections[name] = _encodeSection(value, depth - 1, chunks)
+            else:
+                sections[name] = {"blob": addBlob(_dumpDetached(value))}
+        else:
+            settings[name] = value
+
+    state = {"settings": settings,
+             "documentation": section._internal_documentation,
+             "docstrings": section._internal_docstrings,
+             "skipChecks": getattr(section, "_internal_skipChecks", False)}
+    return {"name": section._internal_name,
+            "state": addBlob(pickle.dumps(state, PICKLE_PROTOCOL)),
+            "sections": sections}
+
+
+def _readBlob(blobs, ref):
+    return pickle.loads(zlib.decompress(blobs[ref[0]:ref[0] + ref[1]]))
+
+
+def _decodeNode(name, node, blobs, lazy):
+    """
+    Rebuild the section for a header node, leaving its children
+    encoded if lazy
+    """
+    if "blob" in node:
+        return _readBlob(blobs, node["blob"])
+
+    sectionName = str(node["name"]) if node["name"] is not None else None
+    section = LazySection(sectionName, blobs) if lazy else ConfigSection(sectionName)
+    state = _readBlob(blobs, node["state"])
+    section._internal_documentation = state["documentation"]
+    section._internal_docstrings = state["docstrings"]
+    section._internal_skipChecks = state["skipChecks"]
+    for key, value in state["settings"].items():
+        # restore the settings as they were, without the type checks
+        object.__setattr__(section, key, value)
+        section._internal_settings.add(key)
+
+    for childName, childNode in node["sections"].items():
+        childName = str(childName)
+        if lazy:
+            section._internal_lazy_nodes[childName] = childNode
+            section._internal_settings.add(childName)
+            section._internal_children.add(childName)
+        else:
+            setattr(section, childName, _decodeNode(childName, childNode, blobs, lazy))
+    return section
+
+
+def isCompactReport(content):
+    """
+    _isCompactReport_
+
+    Check whether the (beginning of the) file content is a compact report
+    """
+    return content[:len(MAGIC)] == MAGIC.encode("ascii")
+
+
+def dumpReportData(data):
+    """
+    _dumpReportData_
+
+    Encode a report ConfigSection tree (Report.data) in the compact format
+    """
+    if isinstance(data, LazySection):
+        data.materialize_()
+    chunks = []
+    index = _encodeSection(data, LAZY_DEPTH, chunks)
+    return b"".join([encodeHeader(MAGIC, FORMAT_VERSION, index)] + [chunk for _, chunk in chunks])
+
+
+def loadReportData(content, lazy=False):
+    """
+    _loadReportData_
+
+    Decode a compact report into its ConfigSection tree. If lazy, the
+    sections are decoded when they're first accessed.
+    """
+    try:
+        _, index, dataStart = readHeader(io.BytesIO(content), MAGIC, FORMAT_VERSION)
+    except ValueError as ex:
+        raise CompactReportException(str(ex))
+
+    return _decodeNode(index["name"], index, content[dataStart:], lazy)
+
+
+def convertPickledReport(filename, newFilename=None):
+    """
+    _convertPickledReport_
+
+    Rewrite a pickled report in the compact format, in place unless a
+    new file name is given. Reports already in the compact format are
+    left alone. Returns the name of the compact report.
+    """
+    newFilename = newFilename or filename
+    with open(filename, "rb") as handle:
+        content = handle.read()
+    if isCompactReport(content):
+        data = None
+    else:
+        data = pickle.loads(content)
+
+    if data is not None:
+        content = dumpReportData(data)
+    if data is not None or newFilename != filename:
+        replaceFile(newFilename, [content])
+    return newFilename
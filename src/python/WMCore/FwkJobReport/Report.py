@@ -7,6 +7,7 @@ Framework job report object.
 """
 from __future__ import print_function
 
+import copy
 import logging
 import math
 import re
@@ -17,6 +18,7 @@ import traceback
 from WMCore.Configuration import ConfigSection
 from WMCore.DataStructs.File import File
 from WMCore.DataStructs.Run import Run
+from WMCore.FwkJobReport.CompactReport import dumpReportData, isCompactReport, loadReportData
 from WMCore.FwkJobReport.FileInfo import FileInfo
 from WMCore.WMException import WMException
 from WMCore.WMExceptions import WM_JOB_ERROR_CODES
@@ -137,11 +139,18 @@ class Report(object):
         _parse_
 
         Read in the FrameworkJobReport XML file produced
-        by cmsRun and pull the information from it into this object
+        by cmsRun and pull the information from it into this object.
+        The file is parsed into a copy of the report, which replaces its
+        content only if the whole file could be parsed.
         """
         from WMCore.FwkJobReport.XMLParser import xmlToJobReport
+        scratchReport = Report()
+        scratchReport.data = copy.deepcopy(self.data)
+        scratchReport.reportname = self.reportname
+        if self.report is not None:
+            scratchReport.report = getattr(scratchReport.data, self.report._internal_name)
         try:
-            xmlToJobReport(self, xmlfile)
+            xmlToJobReport(scratchReport, xmlfile)
         except Exception as ex:
             msg = "Error reading XML job report file, possibly corrupt XML File:\n"
             msg += "Details: %s" % str(ex)
@@ -156,6 +165,9 @@ class Report(object):
             logging.debug(crashMessage)
             raise FwkJobReportException(msg)
 
+        self.data = scratchReport.data
+        self.report = scratchReport.report
+
     @staticmethod
     def jsonizeFiles(reportModule):
         """
@@ -370,25 +382,36 @@ class Report(object):
 
         return returnCode, returnMessage
 
-    def persist(self, filename):
+    def persist(self, filename, compact=True):
         """
         _persist_
 
-        Pickle this object and save it to disk.
+        Save this object to disk, in the compact report format
+        (see WMCore.FwkJobReport.CompactReport) or pickled.
         """
-        with open(filename, 'w') as handle:
-            pickle.dump(self.data, handle)
+        if compact:
+            with open(filename, 'wb') as handle:
+                handle.write(dumpReportData(self.data))
+        else:
+            with open(filename, 'wb') as handle:
+                pickle.dump(self.data, handle)
 
         return
 
-    def unpersist(self, filename, reportname=None):
+    def unpersist(self, filename, reportname=None, lazy=False):
         """
         _unpersist_
 
-        Load a pickled FWJR from disk.
+        Load a compact or pickled FWJR from disk. Compact reports can
+        be loaded lazily, decoding each step section on first access.
         """
-        with open(filename, 'r') as handle:
-            self.data = pickle.load(handle)
+        with open(filename, 'rb') as handle:
+            content = handle.read()
+
+        if isCompactReport(content):
+            self.data = loadReportData(content, lazy)
+        else:
+            self.data = pickle.loads(content)
 
         # old self.report (if it existed) became unattached
         if reportname:
@@ -725,13 +748,13 @@ class Report(object):
         reportSection = getattr(self.data, step, None)
         return reportSection
 
-    def load(self, filename):
+    def load(self, filename, lazy=False):
         """
         _load_
 
         This just maps to unpersist
         """
-        self.unpersist(filename)
+        self.unpersist(filename, lazy=lazy)
         return
 
     def save(self, filename):
@@ -3,13 +3,19 @@
 _XMLParser_
 
 Read the raw XML output from the cmsRun executable.
+
+The report is parsed as a stream: each top level element of the
+FrameworkJobReport (File, InputFile, PerformanceReport...) is handed to the
+handlers as soon as it's closed and then dropped, lumi sections are folded
+into their run while parsing and branch names are skipped, so the whole
+XML tree is never held in memory.
 """
 from __future__ import division, print_function
 
 import logging
 import re
 
-from WMCore.Algorithms.ParseXMLFile import coroutine, xmlFileToNode
+from WMCore.Algorithms.ParseXMLFile import coroutine, xmlFileToNode, xmlFileToNodeStream
 from WMCore.DataStructs.Run import Run
 from WMCore.FwkJobReport import Report
 
@@ -25,6 +31,18 @@ def reportBuilder(nodeStruct, report, target):
         target.send((report, node))
 
 
+def dispatchReportNode(report, subnode, targets):
+    """
+    _dispatchReportNode_
+
+    Send a child of the FrameworkJobReport node to its handler.
+    """
+    if subnode.name in targets:
+        targets[subnode.name].send((report, subnode))
+    else:
+        setattr(report.report.parameters, subnode.name, subnode.text)
+
+
 @coroutine
 def reportDispatcher(targets):
     """
@@ -41,24 +59,27 @@ def reportDispatcher(targets):
             continue
 
         for subnode in node.children:
-            if subnode.name == "File":
-                targets['File'].send((report, subnode))
-            elif subnode.name == "InputFile":
-                targets['InputFile'].send((report, subnode))
-            elif subnode.name == "AnalysisFile":
-                targets['AnalysisFile'].send((report, subnode))
-            elif subnode.name == "PerformanceReport":
-                targets['PerformanceReport'].send((report, subnode))
-            elif subnode.name == "FrameworkError":
-                targets['FrameworkError'].send((report, subnode))
-            elif subnode.name == "SkippedFile":
-                targets['SkippedFile'].send((report, subnode))
-            elif subnode.name == "FallbackAttempt":
-                targets['FallbackAttempt'].send((report, subnode))
-            elif subnode.name == "SkippedEvent":
-                targets['SkippedEvent'].send((report, subnode))
-            else:
-                setattr(report.report.parameters, subnode.name, subnode.text)
+            dispatchReportNode(report, subnode, targets)
+
+
+@coroutine
+def streamDispatcher(report, targets):
+    """
+    _streamDispatcher_
+
+    Dispatch the children of the FrameworkJobReport node to the handlers
+    as they're parsed.
+    """
+    notHandled = None
+    while True:
+        root, subnode = (yield)
+        if root.name != "FrameworkJobReport":
+            if root is not notHandled:
+                print("Not Handling: ", root.name)
+                notHandled = root
+            continue
+
+        dispatchReportNode(report, subnode, targets)
 
 
 @coroutine
@@ -234,23 +255,41 @@ def runHandler():
                 if runId is None:
                     continue
 
-                lumis = []
-                for lumi in subnode.children:
-                    if "ID" in lumi.attrs:
-                        lumiNumber = int(lumi.attrs['ID'])
-                        nEvents = lumi.attrs.get("NEvents", None)
-                        if nEvents is not None:
-                            try:
-                                nEvents = int(nEvents)
-                            except ValueError:
-                                nEvents = None
-                        lumis.append((lumiNumber, nEvents))
+                # already folded into the run node by the stream parser
+                lumis = getattr(subnode, "lumis", None)
+                if lumis is None:
+                    lumis = []
+                    for lumi in subnode.children:
+                        addLumiSection(subnode, lumi.attrs, lumis)
                 runInfo = Run(runNumber=runId)
                 runInfo.extendLumis(lumis)
 
                 Report.addRunInfoToFile(fileSection, runInfo)
 
 
+def addLumiSection(runNode, attrs, lumis=None):
+    """
+    _addLumiSection_
+
+    Add the (lumi, events) of a LumiSection element to the lumis of its
+    Run node, or to the given list.
+    """
+    if "ID" not in attrs:
+        return
+    lumiNumber = int(attrs['ID'])
+    nEvents = attrs.get("NEvents", None)
+    if nEvents is not None:
+        try:
+            nEvents = int(nEvents)
+        except ValueError:
+            nEvents = None
+    if lumis is None:
+        if not hasattr(runNode, "lumis"):
+            runNode.lumis = []
+        lumis = runNode.lumis
+    lumis.append((lumiNumber, nEvents))
+
+
 @coroutine
 def branchHandler():
     """
@@ -491,20 +530,13 @@ def perfStoreHandler():
             logging.error("Not adding any storage performance info to report.")
 
 
-def xmlToJobReport(reportInstance, xmlFile):
+def reportHandlers():
     """
-    _xmlToJobReport_
-
-    parse the XML file and insert the information into the
-    Report instance provided
+    _reportHandlers_
 
+    Set up the coroutine pipeline handling the children of the
+    FrameworkJobReport node
     """
-    # read XML, build node structure
-    node = xmlFileToNode(xmlFile)
-
-    #  //
-    # // Set up coroutine pipeline
-    # //
     fileDispatchers = {
         "Runs": runHandler(),
         "Branches": branchHandler(),
@@ -518,7 +550,7 @@ def xmlToJobReport(reportInstance, xmlFile):
         "Storage": perfStoreHandler(),
     }
 
-    dispatchers = {
+    return {
         "File": fileHandler(fileDispatchers),
         "InputFile": inputFileHandler(fileDispatchers),
         "PerformanceReport": perfRepHandler(perfRepDispatchers),
@@ -529,12 +561,45 @@ def xmlToJobReport(reportInstance, xmlFile):
         "SkippedEvent": skippedEventHandler(),
     }
 
+
+# elements folded into their parent node by the stream parser
+streamLeafHandlers = {
+    ("Run", "LumiSection"): addLumiSection,
+    # the branch names are not used
+    ("Branches", "Branch"): lambda node, attrs: None,
+}
+
+
+def xmlToJobReport(reportInstance, xmlFile):
+    """
+    _xmlToJobReport_
+
+    parse the XML file and insert the information into the
+    Report instance provided
+
+    """
+    xmlFileToNodeStream(xmlFile, streamDispatcher(reportInstance, reportHandlers()),
+                        dispatchDepth=2, leafHandlers=streamLeafHandlers)
+    return
+
+
+def xmlTreeToJobReport(reportInstance, xmlFile):
+    """
+    _xmlTreeToJobReport_
+
+    Same as xmlToJobReport, building the whole node structure of the XML
+    file first
+
+    """
+    # read XML, build node structure
+    node = xmlFileToNode(xmlFile)
+
     #  //
     # // Feed pipeline with node structure and report result instance
     # //
     reportBuilder(
         node, reportInstance,
-        reportDispatcher(dispatchers)
+        reportDispatcher(reportHandlers())
     )
 
     return
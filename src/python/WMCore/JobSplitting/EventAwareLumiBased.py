@@ -16,6 +16,7 @@ import logging
 import math
 import operator
 
+from WMCore.DataStructs.Mask import CompiledMask
 from WMCore.DataStructs.Run import Run
 from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.JobSplitting.LumiBased import isGoodLumi, isGoodRun, LumiChecker
@@ -100,6 +101,9 @@ class EventAwareLumiBased(JobFactory):
                 logging.exception(msg)
                 return
 
+        # lumis are checked against the mask one by one, compile it once
+        goodRunList = CompiledMask(goodRunList)
+
         lDict = self.getFilesSortedByLocation(avgEventsPerJob)
         if not lDict:
             logging.info("There are not enough events/files to be splitted. Trying again next cycle")
@@ -6,6 +6,7 @@ File based splitting algorithm that will chop a fileset into
 a set of jobs based on file boundaries
 """
 
+from WMCore.DataStructs.Mask import CompiledMask
 from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.WMBS.File import File
 from WMCore.WMSpec.WMTask import buildLumiMask
@@ -36,7 +37,7 @@ class FileBased(JobFactory):
 
         goodRunList = {}
         if runs and lumis:
-            goodRunList = buildLumiMask(runs, lumis)
+            goodRunList = CompiledMask(buildLumiMask(runs, lumis))
 
         #Get a dictionary of sites, files
         lDict = self.sortByLocation()
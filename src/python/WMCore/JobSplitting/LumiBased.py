@@ -10,6 +10,7 @@ import logging
 import operator
 
 from Utils.IteratorTools import flattenList
+from WMCore.DataStructs.Mask import CompiledMask
 from WMCore.DataStructs.Run import Run
 from WMCore.JobSplitting.JobFactory import JobFactory
 from WMCore.WMBS.File import File
@@ -22,10 +23,15 @@ def isGoodLumi(goodRunList, run, lumi):
 
     Checks to see if runs match a run-lumi combination in the goodRunList
     This is a pain in the ass.
+    goodRunList can also be a CompiledMask, which is much faster to check
+    when looping over many lumis.
     """
     if goodRunList is None or goodRunList == {}:
         return True
 
+    if isinstance(goodRunList, CompiledMask):
+        return goodRunList.runLumiInMask(run, lumi)
+
     if not isGoodRun(goodRunList=goodRunList, run=run):
         return False
 
@@ -49,6 +55,9 @@ def isGoodRun(goodRunList, run):
     if goodRunList is None or goodRunList == {}:
         return True
 
+    if isinstance(goodRunList, CompiledMask):
+        return goodRunList.runInMask(run)
+
     if str(run) in goodRunList.keys():
         # @e can find a run
         return True
@@ -198,6 +207,9 @@ class LumiBased(JobFactory):
                 logging.exception(msg)
                 return
 
+        # lumis are checked against the mask one by one, compile it once
+        goodRunList = CompiledMask(goodRunList)
+
         lDict = self.getFilesSortedByLocation(lumisPerJob)
         if not lDict:
             logging.info("There are not enough lumis/files to be splitted. Trying again next cycle")
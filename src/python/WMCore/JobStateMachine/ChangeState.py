@@ -60,6 +60,24 @@ def discardConflictingDocument(couchDbInstance, data, result):
         return result
 
 
+def addStateTransitions(docID, doc, transitions):
+    """
+    _addStateTransitions_
+
+    Append state transitions to a job document, the same way the
+    stateTransition update handler of the JobDump couchapp does.
+    Returns the updated document.
+    """
+    if doc is None:
+        doc = {"_id": docID, "states": {}}
+    states = doc.setdefault("states", {})
+    nextKey = max([int(key) for key in states] + [0]) + 1
+    for transition in transitions:
+        states[str(nextKey)] = transition
+        nextKey += 1
+    return doc
+
+
 def getDataFromSpecFile(specFile):
     workload = WMWorkloadHelper()
     workload.load(specFile)
@@ -70,6 +88,91 @@ def getDataFromSpecFile(specFile):
     return result
 
 
+def getFWJRInformation(fwjr):
+    """
+    _getFWJRInformation_
+
+    Get from a job report what recordInCouch needs: the fwjr document, the
+    site name, exit code, log URL and worker node info, the input files and
+    the output files for the job summary.
+    """
+    fwjrInfo = {"json": fwjr.__to_json__(None),
+                "siteName": fwjr.getSiteName(),
+                "exitCode": fwjr.getExitCode(),
+                "logURL": fwjr.getLogURL(),
+                "workerNodeInfo": fwjr.getWorkerNodeInfo()}
+
+    outputs = []
+    outputDataset = None
+    for singlestep in fwjr.listSteps():
+        for singlefile in fwjr.getAllFilesFromStep(step=singlestep):
+            if singlefile:
+                outputs.append({'type': 'output' if CMSSTEP.match(singlestep) else singlefile.get('module_label', None),
+                                'lfn': singlefile.get('lfn', None),
+                                'location': list(singlefile.get('locations', set([]))) if len(
+                                    singlefile.get('locations', set([]))) > 1
+                                else singlefile['locations'].pop(),
+                                'checksums': singlefile.get('checksums', {}),
+                                'size': singlefile.get('size', None)})
+                # it should have one output dataset for all the files
+                outputDataset = singlefile.get('dataset', None) if not outputDataset else outputDataset
+    fwjrInfo["outputs"] = outputs
+    fwjrInfo["outputDataset"] = outputDataset
+
+    inputFiles = []
+    for inputFileStruct in fwjr.getAllInputFiles():
+        # check if inputFileSummary needs to be extended
+        inputFileSummary = {}
+        inputFileSummary["lfn"] = inputFileStruct["lfn"]
+        inputFileSummary["input_type"] = inputFileStruct["input_type"]
+        inputFiles.append(inputFileSummary)
+    fwjrInfo["inputFiles"] = inputFiles
+
+    return fwjrInfo
+
+
+def prepareFWJR(fwjr):
+    """
+    _prepareFWJR_
+
+    Get from a job report everything propagate needs, as plain python
+    objects. The result can be set as the job fwjr instead of the report,
+    so that it can be prepared in another process (see the JobAccountant).
+    """
+    # in the order propagate uses them, reporting to the dashboard completes the
+    # performance sections of the report
+    dashboardSteps = DashboardReporter.getStepsInformation(fwjr)
+    fwjrInfo = getFWJRInformation(fwjr)
+    fwjrInfo["dashboardSteps"] = dashboardSteps
+    return fwjrInfo
+
+
+def completePreparedFWJR(fwjrInfo, taskName, campaign, prepID, maxUploadedInputFiles):
+    """
+    _completePreparedFWJR_
+
+    Set the task name, campaign and PrepID of a job report prepared with
+    prepareFWJR and strip its input files if there are too many of them,
+    as done with setTaskName, setCampaign, setPrepID and stripInputFiles
+    for a report.
+    """
+    jsonFWJR = fwjrInfo["json"]
+    jsonFWJR["task"] = taskName
+    jsonFWJR["Campaign"] = campaign
+    jsonFWJR["PrepID"] = prepID
+    for jsonStep in jsonFWJR["steps"].values():
+        for jsonFiles in jsonStep["output"].values():
+            for jsonFile in jsonFiles:
+                jsonFile["prep_id"] = prepID
+
+    if len(fwjrInfo["inputFiles"]) > maxUploadedInputFiles:
+        for jsonStep in jsonFWJR["steps"].values():
+            for inputSource in jsonStep["input"]:
+                jsonStep["input"][inputSource] = []
+        fwjrInfo["inputFiles"] = []
+    return
+
+
 class ChangeState(WMObject, WMConnectionBase):
     """
     Propagate the state of a job through the JSM.
@@ -220,6 +323,7 @@ class ChangeState(WMObject, WMConnectionBase):
 
         timestamp = int(time.time())
         couchRecordsToUpdate = []
+        stateTransitions = {}
 
         for job in jobs:
             couchDocID = job.get("couch_record", None)
@@ -284,18 +388,12 @@ class ChangeState(WMObject, WMConnectionBase):
                                              "couchid": jobDocument["_id"]})
                 self.jobsdatabase.queue(jobDocument, callback=discardConflictingDocument)
             else:
-                # We send a PUT request to the stateTransition update handler.
-                # Couch expects the parameters to be passed as arguments to in
-                # the URI while the Requests class will only encode arguments
-                # this way for GET requests.  Changing the Requests class to
-                # encode PUT arguments as couch expects broke a bunch of code so
-                # we'll just do our own encoding here.
-                updateUri = "/" + self.jobsdatabase.name + "/_design/JobDump/_update/stateTransition/" + couchDocID
-                updateUri += "?oldstate=%s&newstate=%s&location=%s&timestamp=%s" % (oldstate,
-                                                                                    newstate,
-                                                                                    jobLocation,
-                                                                                    timestamp)
-                self.jobsdatabase.makeRequest(uri=updateUri, type="PUT", decode=False)
+                # The transitions of the existing documents are written in bulk
+                # once all the jobs are processed, see recordStateTransitions
+                stateTransitions.setdefault(couchDocID, []).append({"oldstate": oldstate,
+                                                                    "newstate": newstate,
+                                                                    "location": jobLocation,
+                                                                    "timestamp": timestamp})
 
             # updating the status of the summary doc only when it is explicitely requested
             # doc is already in couch
@@ -325,17 +423,26 @@ class ChangeState(WMObject, WMConnectionBase):
                                                                  getDataFromSpecFile(
                                                                      self.getWorkflowSpecDAO.execute(job['task'])[
                                                                          job['task']]['spec']))
-                job['fwjr'].setCampaign(cachedByWorkflow.get('Campaign', ''))
-                job['fwjr'].setPrepID(cachedByWorkflow.get(job['task'], ''))
-                # If there are too many input files, strip them out
-                # of the FWJR, as they should already
-                # be in the database
-                # This is not critical
-                try:
-                    if len(job['fwjr'].getAllInputFiles()) > self.maxUploadedInputFiles:
-                        job['fwjr'].stripInputFiles()
-                except Exception as ex:
-                    logging.error("Error while trying to strip input files from FWJR.  Ignoring. : %s", str(ex))
+                if isinstance(job['fwjr'], dict):
+                    # prepared beforehand, see prepareFWJR
+                    fwjrInfo = job['fwjr']
+                    completePreparedFWJR(fwjrInfo, job["task"], cachedByWorkflow.get('Campaign', ''),
+                                         cachedByWorkflow.get(job['task'], ''), self.maxUploadedInputFiles)
+                else:
+                    job['fwjr'].setCampaign(cachedByWorkflow.get('Campaign', ''))
+                    job['fwjr'].setPrepID(cachedByWorkflow.get(job['task'], ''))
+                    # If there are too many input files, strip them out
+                    # of the FWJR, as they should already
+                    # be in the database
+                    # This is not critical
+                    try:
+                        if len(job['fwjr'].getAllInputFiles()) > self.maxUploadedInputFiles:
+                            job['fwjr'].stripInputFiles()
+                    except Exception as ex:
+                        logging.error("Error while trying to strip input files from FWJR.  Ignoring. : %s", str(ex))
+                    # complete fwjr document
+                    job["fwjr"].setTaskName(job["task"])
+                    fwjrInfo = getFWJRInformation(job['fwjr'])
 
                 if newstate == "retrydone":
                     jobState = "jobfailed"
@@ -344,10 +451,8 @@ class ChangeState(WMObject, WMConnectionBase):
 
                 # there is race condition updating couch record location and job is completed.
                 # for the fast fail job, it could miss the location update
-                job["location"] = job["fwjr"].getSiteName() or job.get("location", "Unknown")
-                # complete fwjr document
-                job["fwjr"].setTaskName(job["task"])
-                jsonFWJR = job["fwjr"].__to_json__(None)
+                job["location"] = fwjrInfo["siteName"] or job.get("location", "Unknown")
+                jsonFWJR = fwjrInfo["json"]
 
                 # Don't archive cleanup job report
                 if job["jobType"] == "Cleanup":
@@ -365,7 +470,7 @@ class ChangeState(WMObject, WMConnectionBase):
                                 "type": "fwjr"}
                 self.fwjrdatabase.queue(fwjrDocument, timestamp=True, callback=discardConflictingDocument)
 
-                updateSummaryDB(self.statsumdatabase, job)
+                updateSummaryDB(self.statsumdatabase, fwjrDocument)
 
                 # TODO: can add config switch to swich on and off
                 # if self.config.JobSateMachine.propagateSuccessJobs or (job["retry_count"] > 0) or (newstate != 'success'):
@@ -385,27 +490,9 @@ class ChangeState(WMObject, WMConnectionBase):
                                     [source["runs"] for source in fwjrDocument["fwjr"]['steps'][step]["input"]["source"]
                                      if "runs" in source])
 
-                    outputs = []
-                    outputDataset = None
-                    for singlestep in job["fwjr"].listSteps():
-                        for singlefile in job["fwjr"].getAllFilesFromStep(step=singlestep):
-                            if singlefile:
-                                outputs.append({'type': 'output' if CMSSTEP.match(singlestep) else singlefile.get('module_label', None),
-                                                'lfn': singlefile.get('lfn', None),
-                                                'location': list(singlefile.get('locations', set([]))) if len(
-                                                    singlefile.get('locations', set([]))) > 1
-                                                else singlefile['locations'].pop(),
-                                                'checksums': singlefile.get('checksums', {}),
-                                                'size': singlefile.get('size', None)})
-                                # it should have one output dataset for all the files
-                                outputDataset = singlefile.get('dataset', None) if not outputDataset else outputDataset
-                    inputFiles = []
-                    for inputFileStruct in job["fwjr"].getAllInputFiles():
-                        # check if inputFileSummary needs to be extended
-                        inputFileSummary = {}
-                        inputFileSummary["lfn"] = inputFileStruct["lfn"]
-                        inputFileSummary["input_type"] = inputFileStruct["input_type"]
-                        inputFiles.append(inputFileSummary)
+                    outputs = fwjrInfo["outputs"]
+                    outputDataset = fwjrInfo["outputDataset"]
+                    inputFiles = fwjrInfo["inputFiles"]
 
                     # Don't record intermediate jobfailed status in the jobsummary
                     # change to jobcooloff which will be overwritten by error handler anyway
@@ -423,10 +510,10 @@ class ChangeState(WMObject, WMConnectionBase):
                                   "jobtype": job["jobType"],
                                   "state": summarystate,
                                   "site": job.get("location", None),
-                                  "cms_location": job["fwjr"].getSiteName(),
-                                  "exitcode": job["fwjr"].getExitCode(),
-                                  "eos_log_url": job["fwjr"].getLogURL(),
-                                  "worker_node_info": job["fwjr"].getWorkerNodeInfo(),
+                                  "cms_location": fwjrInfo["siteName"],
+                                  "exitcode": fwjrInfo["exitCode"],
+                                  "eos_log_url": fwjrInfo["logURL"],
+                                  "worker_node_info": fwjrInfo["workerNodeInfo"],
                                   "errors": errmsgs,
                                   "lumis": inputs,
                                   "outputdataset": outputDataset,
@@ -455,6 +542,8 @@ class ChangeState(WMObject, WMConnectionBase):
                             pass
                     self.jsumdatabase.queue(jobSummary, timestamp=True)
 
+        self.recordStateTransitions(stateTransitions)
+
         if len(couchRecordsToUpdate) > 0:
             self.setCouchDAO.execute(bulkList=couchRecordsToUpdate,
                                      conn=self.getDBConn(),
@@ -465,6 +554,28 @@ class ChangeState(WMObject, WMConnectionBase):
         self.jsumdatabase.commit()
         return
 
+    def recordStateTransitions(self, stateTransitions):
+        """
+        _recordStateTransitions_
+
+        Append state transitions to the job documents already in couch,
+        stateTransitions is a dictionary of couch document ids to the list of
+        transitions to add. The documents are loaded and written back in bulk
+        instead of calling the stateTransition update handler once per job,
+        conflicting documents are loaded again and retried.
+        """
+        if len(stateTransitions) == 0:
+            return
+
+        def updateFunc(docID, doc):
+            return addStateTransitions(docID, doc, stateTransitions[docID])
+
+        failedIDs = self.jobsdatabase.updateBulkDocumentsWithFunction(list(stateTransitions), updateFunc)
+        if failedIDs:
+            logging.error("Couldn't record the state transition of %d jobs in couch: %s",
+                          len(failedIDs), failedIDs)
+        return
+
     def persist(self, jobs, newstate, oldstate):
         """
         _persist_
@@ -108,10 +108,15 @@ class XMLFormat(RESTFormat):
     stream contains strings with newlines, the output will have arbitrary
     line structure. On the other hand, as the output is well-formed XML,
     virtually all SAX processors can read the stream incrementally even if
-    the client isn't able to fully preserve chunked HTTP transfer encoding."""
+    the client isn't able to fully preserve chunked HTTP transfer encoding.
 
-    def __init__(self, label):
+    If `chunk_size` is non-zero, the rendered objects are coalesced into
+    chunks of at least `chunk_size` bytes instead of one chunk per object,
+    which saves per-chunk overhead for streams of many small objects."""
+
+    def __init__(self, label, chunk_size=0):
         self.label = label
+        self.chunk_size = chunk_size
 
     @staticmethod
     def format_obj(obj):
@@ -146,17 +151,29 @@ class XMLFormat(RESTFormat):
             etag.update(preamble)
             yield preamble
 
+            pending = []
+            npending = 0
             try:
                 for obj in stream:
                     chunk = XMLFormat.format_obj(obj)
-                    etag.update(chunk)
-                    yield chunk
+                    pending.append(chunk)
+                    npending += len(chunk)
+                    if npending >= self.chunk_size:
+                        chunk = "".join(pending)
+                        pending = []
+                        npending = 0
+                        etag.update(chunk)
+                        yield chunk
             except GeneratorExit:
                 etag.invalidate()
                 trailer = None
                 raise
             finally:
                 if trailer:
+                    if pending:
+                        chunk = "".join(pending)
+                        etag.update(chunk)
+                        yield chunk
                     etag.update(trailer)
                     yield trailer
 
@@ -223,7 +240,14 @@ class JSONFormat(RESTFormat):
     final trailer line consisting of "``]}``". Each line is generated as a
     HTTP transfer chunk. This format is fixed so readers can be constructed
     to read and parse the stream incrementally one line at a time,
-    facilitating maximum throughput processing of the response."""
+    facilitating maximum throughput processing of the response.
+
+    If `chunk_size` is non-zero, the object lines are coalesced into chunks
+    of at least `chunk_size` bytes instead of one chunk per object. The
+    output is the same, each chunk just contains several complete lines."""
+
+    def __init__(self, chunk_size=0):
+        self.chunk_size = chunk_size
 
     def stream_chunked(self, stream, etag, preamble, trailer):
         """Generator for actually producing the output."""
@@ -234,12 +258,20 @@ class JSONFormat(RESTFormat):
                 etag.update(preamble)
                 yield preamble
 
+            pending = []
+            npending = 0
             try:
                 for obj in stream:
                     chunk = comma + json.dumps(obj) + "\n"
-                    etag.update(chunk)
-                    yield chunk
                     comma = ","
+                    pending.append(chunk)
+                    npending += len(chunk)
+                    if npending >= self.chunk_size:
+                        chunk = "".join(pending)
+                        pending = []
+                        npending = 0
+                        etag.update(chunk)
+                        yield chunk
             except GeneratorExit:
                 etag.invalidate()
                 trailer = None
@@ -250,6 +282,10 @@ class JSONFormat(RESTFormat):
                 raise
             finally:
                 if trailer:
+                    if pending:
+                        chunk = "".join(pending)
+                        etag.update(chunk)
+                        yield chunk
                     etag.update(trailer)
                     yield trailer
 
@@ -532,6 +568,26 @@ def _etag_tail(head, tail, etag):
     if etagval:
         cherrypy.response.headers["ETag"] = etagval
 
+def cached_reply(body, etagval, encoding):
+    """Reply with a complete response `body` taken from a response cache.
+    Restores the Content-Encoding header `encoding`, if any, sets the ETag
+    header to `etagval` and matches it against any If-Match / If-None-Match
+    request headers like `stream_maybe_etag()` does for buffered responses."""
+
+    req = cherrypy.request
+    res = cherrypy.response
+    if encoding:
+        vary_by('Accept-Encoding')
+        res.headers['Content-Encoding'] = encoding
+
+    match = [str(x) for x in (req.headers.elements('If-Match') or [])]
+    nomatch = [str(x) for x in (req.headers.elements('If-None-Match') or [])]
+    res.headers['ETag'] = etagval
+    _etag_match(res.status or 200, etagval, match, nomatch)
+
+    res.headers['Content-Length'] = len(body)
+    return body
+
 def stream_maybe_etag(size_limit, etag, reply):
     """Maybe generate ETag header for the response, and handle If-Match
     and If-None-Match request headers. Consumes the reply until at most
@@ -0,0 +1,75 @@
+"""In-memory cache of complete REST responses.
+
+Used by :class:`~.MiniRESTApi` for API methods which opt in with the
+``cache_ttl`` keyword argument to :func:`~.restcall`. The responses are
+stored as they are sent out, i.e. after formatting and compression,
+together with their ETag, so repeated identical GET requests, including
+conditional requests with If-None-Match, are answered without calling the
+API method again."""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+#: A cached response: the response body, its ETag and Content-Encoding
+#: header values, and the time after which the entry is stale.
+CachedResponse = namedtuple("CachedResponse", ["body", "etag", "encoding", "expires"])
+
+
+class ResponseCache(object):
+    """LRU cache of REST responses with per-entry expire time.
+
+    The total size of the cached response bodies is kept under `max_size`
+    bytes by evicting the least recently used entries; responses larger
+    than `max_size` are not cached at all. Keys are arbitrary hashable
+    values, normally built from the API name, output format, request
+    encoding and the validated API arguments."""
+
+    def __init__(self, max_size=64 * 1024 * 1024):
+        self.max_size = max_size
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the :class:`CachedResponse` for `key`, or None if there
+        is no such entry or it has expired."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and entry.expires > time.time():
+                self._entries[key] = entry
+                self.hits += 1
+                return entry
+            if entry is not None:
+                self.size -= len(entry.body)
+            self.misses += 1
+            return None
+
+    def put(self, key, body, etag, encoding, ttl):
+        """Cache the response `body` with `etag` and `encoding` headers for
+        `ttl` seconds. Returns True if the response was cached."""
+        if ttl <= 0 or len(body) > self.max_size:
+            return False
+
+        entry = CachedResponse(body, etag, encoding, time.time() + ttl)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old.body)
+            self._entries[key] = entry
+            self.size += len(body)
+            while self.size > self.max_size:
+                _, old = self._entries.popitem(last=False)
+                self.size -= len(old.body)
+        return True
+
+    def clear(self):
+        """Drop all the cached responses."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
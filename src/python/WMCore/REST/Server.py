@@ -14,6 +14,7 @@ from cherrypy.lib import cpstats
 
 from WMCore.REST.Error import *
 from WMCore.REST.Format import *
+from WMCore.REST.ResponseCache import ResponseCache
 from WMCore.REST.Validation import validate_no_more_input
 
 try:
@@ -617,6 +618,25 @@ class MiniRESTApi:
        The API can override this value with ``compression_chunk`` keyword
        argument to :func:`restcall`.
 
+    .. attribute:: format_chunk
+
+       Integer, the minimum size in bytes of the output chunks generated by
+       the default JSON and XML formatters, which coalesce the rendering of
+       consecutive objects up to this size instead of generating one chunk
+       per object. Zero gives one chunk per object. The default is 64kB, it
+       can be changed with the ``format_chunk`` configuration parameter.
+
+    .. attribute:: response_cache
+
+       The :class:`~.ResponseCache` holding complete responses of the API
+       methods which opt in to response caching with ``cache_ttl`` keyword
+       argument to :func:`restcall`. Only responses which fit into the ETag
+       buffer are cached, keyed by the request URL, API, format, accepted
+       encodings and validated arguments. Use it only for methods whose
+       response doesn't depend on the caller identity. The cache is limited
+       to 64 MB by default, which can be changed with the
+       ``response_cache_size`` configuration parameter.
+
     .. attribute:: default_expires
 
        Number, default expire time for GET / HEAD responses in seconds. The
@@ -645,8 +665,10 @@ class MiniRESTApi:
         self.compression_level = 9
         self.compression_chunk = 64 * 1024
         self.compression = ['deflate']
-        self.formats = [('application/json', JSONFormat()),
-                        ('application/xml', XMLFormat(self.app.appname))]
+        self.format_chunk = getattr(config, 'format_chunk', 64 * 1024)
+        self.formats = [('application/json', JSONFormat(self.format_chunk)),
+                        ('application/xml', XMLFormat(self.app.appname, self.format_chunk))]
+        self.response_cache = ResponseCache(getattr(config, 'response_cache_size', 64 * 1024 * 1024))
         self.methods = {}
         self.default_expires = 3600
         self.default_expires_opts = []
@@ -800,8 +822,17 @@ class MiniRESTApi:
             v(apiobj, request.method, api, param, safe)
         validate_no_more_input(param)
 
-        # Invoke the method.
-        obj = apiobj['call'](*safe.args, **safe.kwargs)
+        # Look for the response in the cache if the API allows it, otherwise
+        # invoke the method.
+        cache_ttl = apiobj.get('cache_ttl', 0)
+        cachekey = cached = obj = None
+        if cache_ttl > 0 and (request.method == 'GET' or request.method == 'HEAD'):
+            cachekey = (request.script_name + request.path_info, api, format,
+                        request.headers.get('Accept-Encoding', ''),
+                        repr(safe.args), repr(sorted(safe.kwargs.items())))
+            cached = self.response_cache.get(cachekey)
+        if not cached:
+            obj = apiobj['call'](*safe.args, **safe.kwargs)
 
         # Add Vary: Accept header.
         vary_by('Accept')
@@ -831,12 +862,36 @@ class MiniRESTApi:
         # Format the response.
         response.headers['X-REST-Status'] = 100
         response.headers['Content-Type'] = format
+        if cached:
+            return cached_reply(cached.body, cached.etag, cached.encoding)
+
         etagger = apiobj.get('etagger', None) or SHA1ETag()
         reply = stream_compress(fmthandler(obj, etagger),
                                 apiobj.get('compression', self.compression),
                                 apiobj.get('compression_level', self.compression_level),
                                 apiobj.get('compression_chunk', self.compression_chunk))
-        return stream_maybe_etag(apiobj.get('etag_limit', self.etag_limit), etagger, reply)
+        etag_limit = apiobj.get('etag_limit', self.etag_limit)
+        if cachekey:
+            return self._cache_reply(cachekey, cache_ttl, etag_limit, etagger, reply)
+        return stream_maybe_etag(etag_limit, etagger, reply)
+
+    def _cache_reply(self, cachekey, cache_ttl, etag_limit, etagger, reply):
+        """Reply like :func:`~.stream_maybe_etag` and put the response in the
+        response cache if it was fully buffered and has a valid ETag, also
+        when it's answered with "304 Not Modified"."""
+        chunks = []
+        try:
+            result = stream_maybe_etag(etag_limit, etagger, _record_chunks(reply, chunks, etag_limit))
+        except HTTPRedirect:
+            if etagger.value():
+                self.response_cache.put(cachekey, "".join(chunks), etagger.value(),
+                                        response.headers.get('Content-Encoding', None), cache_ttl)
+            raise
+
+        if isinstance(result, str) and etagger.value():
+            self.response_cache.put(cachekey, result, etagger.value(),
+                                    response.headers.get('Content-Encoding', None), cache_ttl)
+        return result
 
     def _precall(self, param):
         """Point for derived classes to hook into prior to peeking at URL.
@@ -2356,6 +2411,7 @@ def restcall(func=None, args=None, generate="result", **kwargs):
     compression         "Accept-Encoding" methods, empty disables compression.
     compression_level   ZLIB compression level for output (0 .. 9).
     compression_chunk   Approximate amount of output to compress at once.
+    cache_ttl           Seconds to serve responses from the response cache.
     =================== ======================================================
 
     :returns: The original function suitably enriched with attributes if
@@ -2379,6 +2435,19 @@ def restcall(func=None, args=None, generate="result", **kwargs):
     return (func and apply_restcall_opts(func)) or apply_restcall_opts
 
 
+def _record_chunks(reply, chunks, limit):
+    """Generator passing through `reply` chunks, and appending them to the
+    `chunks` list as long as the total size doesn't exceed `limit`."""
+    size = 0
+    for chunk in reply:
+        size += len(chunk)
+        if size <= limit:
+            chunks.append(chunk)
+        elif chunks:
+            del chunks[:]
+        yield chunk
+
+
 def rows(cursor):
     """Utility function to convert a sequence `cursor` to a generator."""
     for row in cursor:
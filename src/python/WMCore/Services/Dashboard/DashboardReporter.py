@@ -143,7 +143,8 @@ class DashboardReporter(WMObject):
         """
         _handleSteps_
 
-        Handle the post-processing step information
+        Handle the post-processing step information, the job fwjr can be a
+        report or the information prepared by ChangeState.prepareFWJR
         """
         if not isinstance(jobs, list):
             jobs = [jobs]
@@ -153,42 +154,16 @@ class DashboardReporter(WMObject):
             if job['fwjr'] is None:
                 return
 
-            steps = job['fwjr'].listSteps()
-            for stepName in steps:
-                step = job['fwjr'].retrieveStep(stepName)
-                if not hasattr(step, 'counter'):
-                    continue
-
-                counter = step.counter
-
-                package = {}
-                package.update(self.getPerformanceInformation(step))
-                package.update(self.getEventInformation(stepName, job['fwjr']))
-
-                # Input files should just be appended onto inputFiles instead of given a step #
-                # per https://hypernews.cern.ch/HyperNews/CMS/get/comp-monitoring/326.html
-                inputFilePackage = self.getInputFilesInformation(step)
-                if inputFilePackage:
-                    if 'inputFiles' in package:
-                        package['inputFiles'] += ';' +  inputFilePackage['inputFiles']
-                    else:
-                        package.update(self.getInputFilesInformation(step))
-
-                trimmedPackage = {}
-                for key in package:
-                    if key in ['inputFiles', 'Basename', 'inputBlocks']:
-                        trimmedPackage[key] = package[key]
-                    elif package[key] is not None:
-                        trimmedPackage['%d_%s' % (counter, key)] = package[key]
-                package = trimmedPackage
-
-                if not package:
-                    continue
+            if isinstance(job['fwjr'], dict):
+                stepPackages = job['fwjr']['dashboardSteps']
+            else:
+                stepPackages = self.getStepsInformation(job['fwjr'])
 
+            for stepPackage in stepPackages:
+                package = dict(stepPackage)
                 jobid = '%s_%i' % (job['name'], job['retry_count'])
                 package['jobId'] = unicodeToStr(jobid)
                 package['taskId'] = unicodeToStr(self.taskPrefix + job['workflow'])
-                package['%d_stepName' % counter] = stepName
 
                 logging.debug("Sending step info: %s" % str(package))
                 jobParams.append(package)
@@ -198,7 +173,53 @@ class DashboardReporter(WMObject):
 
         return
 
-    def getEventInformation(self, stepName, fwjr):
+    @staticmethod
+    def getStepsInformation(fwjr):
+        """
+        _getStepsInformation_
+
+        Build the step information packages of a job report, without the
+        job and task ids
+        """
+        stepPackages = []
+        for stepName in fwjr.listSteps():
+            step = fwjr.retrieveStep(stepName)
+            if not hasattr(step, 'counter'):
+                continue
+
+            counter = step.counter
+
+            package = {}
+            package.update(DashboardReporter.getPerformanceInformation(step))
+            package.update(DashboardReporter.getEventInformation(stepName, fwjr))
+
+            # Input files should just be appended onto inputFiles instead of given a step #
+            # per https://hypernews.cern.ch/HyperNews/CMS/get/comp-monitoring/326.html
+            inputFilePackage = DashboardReporter.getInputFilesInformation(step)
+            if inputFilePackage:
+                if 'inputFiles' in package:
+                    package['inputFiles'] += ';' +  inputFilePackage['inputFiles']
+                else:
+                    package.update(inputFilePackage)
+
+            trimmedPackage = {}
+            for key in package:
+                if key in ['inputFiles', 'Basename', 'inputBlocks']:
+                    trimmedPackage[key] = package[key]
+                elif package[key] is not None:
+                    trimmedPackage['%d_%s' % (counter, key)] = package[key]
+            package = trimmedPackage
+
+            if not package:
+                continue
+
+            package['%d_stepName' % counter] = stepName
+            stepPackages.append(package)
+
+        return stepPackages
+
+    @staticmethod
+    def getEventInformation(stepName, fwjr):
         """
         _getEventInformation_
 
@@ -253,7 +274,8 @@ class DashboardReporter(WMObject):
         else:
             return {}
 
-    def getPerformanceInformation(self, step):
+    @staticmethod
+    def getPerformanceInformation(step):
         """
         _getPerformanceInformation_
 
@@ -320,7 +342,8 @@ class DashboardReporter(WMObject):
 
         return package
 
-    def getInputFilesInformation(self, step):
+    @staticmethod
+    def getInputFilesInformation(step):
         """
         Determines the input files and parent input files and
         if they were read correctly, skipped, or read through fallback
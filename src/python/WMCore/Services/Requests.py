@@ -19,6 +19,7 @@ import socket
 import stat
 import sys
 import tempfile
+import time
 import traceback
 import urllib
 import types
@@ -77,7 +78,9 @@ class Requests(dict):
         self.pycurl = idict.get('pycurl', None)
         self.capath = idict.get('capath', None)
         if self.pycurl:
-            self.reqmgr = RequestHandler()
+            # curl handles are reused per host, from a dedicated pool if it's configured
+            poolConfig = dict((key, idict[key]) for key in ('pool_size', 'pool_idle_timeout') if key in idict)
+            self.reqmgr = RequestHandler(poolConfig)
 
         # set up defaults
         self.setdefault("accept_type", 'text/html')
@@ -165,6 +168,16 @@ class Requests(dict):
         """
         ckey, cert = self.getKeyCert()
         capath = self.getCAPath()
+        headers = self._pycurlHeaders(incoming_headers, contentType)
+        url = self['host'] + uri
+        response, data = self.reqmgr.request(url, params, headers, verb=verb,
+                                             ckey=ckey, cert=cert, capath=capath, decode=decoder)
+        return data, response.status, response.reason, response.fromcache
+
+    def _pycurlHeaders(self, incoming_headers, contentType=None):
+        """
+        Build the headers of a pycurl request
+        """
         if not contentType:
             contentType = self['content_type']
         headers = {"Content-type": contentType,
@@ -174,10 +187,63 @@ class Requests(dict):
             headers[key] = self.additionalHeaders[key]
         # And now overwrite any headers that have been passed into the call:
         headers.update(incoming_headers)
-        url = self['host'] + uri
-        response, data = self.reqmgr.request(url, params, headers, verb=verb,
-                                             ckey=ckey, cert=cert, capath=capath, decode=decoder)
-        return data, response.status, response.reason, response.fromcache
+        return headers
+
+    def makeMultiRequest(self, uris, data=None, verb='GET', incoming_headers=None,
+                         decoder=True, contentType=None, numConn=10, retries=0, timeout=None):
+        """
+        Make several requests to the host concurrently, keeping at most numConn
+        of them in flight (with pycurl, otherwise they are made one after the other
+        and timeout is not used).
+        uris is a list of uri or (uri, data) pairs, data being the request data of
+        plain uris. Yields, as the requests complete, dictionaries with the uri,
+        params, data, status, reason, error, attempts and latency keys: errors are
+        reported in the dictionary instead of being raised. Requests failing with
+        a connection error or a 5xx status are retried up to retries times.
+        """
+        data = data or {}
+        incoming_headers = incoming_headers or {}
+        requests = []
+        for item in uris:
+            if isinstance(item, basestring):
+                requests.append((item, data))
+            else:
+                requests.append((item[0], item[1]))
+
+        if self.pycurl:
+            ckey, cert = self.getKeyCert()
+            headers = self._pycurlHeaders(incoming_headers, contentType)
+            rows = self.reqmgr.multiget([(self['host'] + uri, params) for uri, params in requests],
+                                        headers, verb=verb, ckey=ckey, cert=cert,
+                                        capath=self.getCAPath(), decode=decoder,
+                                        num_conn=numConn, retries=retries, timeout=timeout)
+            for row in rows:
+                yield {'uri': row['url'][len(self['host']):], 'params': row['params'],
+                       'data': row['data'], 'status': row['status'], 'reason': row['reason'],
+                       'error': row['error'], 'attempts': row['attempts'], 'latency': row['latency']}
+            return
+
+        for uri, params in requests:
+            attempts = 0
+            while True:
+                attempts += 1
+                start = time.time()
+                row = {'uri': uri, 'params': params, 'data': None, 'status': None,
+                       'reason': '', 'error': None, 'attempts': attempts}
+                try:
+                    row['data'], row['status'], row['reason'], _ = \
+                        self.makeRequest_httplib(uri, params, verb, dict(incoming_headers),
+                                                 True, decoder, contentType)
+                except (HTTPException, socket.error) as ex:
+                    row['status'] = getattr(ex, 'status', None)
+                    row['reason'] = getattr(ex, 'reason', '')
+                    row['data'] = getattr(ex, 'result', None)
+                    row['error'] = str(ex) or repr(ex)
+                row['latency'] = time.time() - start
+                if row['error'] is None or attempts > retries or (row['status'] or 500) < 500:
+                    break
+                self['logger'].debug("Retrying %s after error: %s", uri, row['error'])
+            yield row
 
     def makeRequest_httplib(self, uri=None, data={}, verb='GET',
                             incoming_headers={}, encoder=True, decoder=True, contentType=None):
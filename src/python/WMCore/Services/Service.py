@@ -46,13 +46,24 @@ httplib2 cache  |   yes    |   yes    |    no    |     no     |
 service cache   |    no    |   yes    |   yes    |     no     |
 ----------------+----------+----------+----------+------------+
 result          |  cached  |  cached  |  cached  | not cached |
+
+The service cache itself has two tiers: the cache files are kept in an in
+memory LRU (bounded by memcachesize bytes, validated against the cache file
+mtime) and the cache directory can be bounded to diskcachesize bytes, evicting
+the oldest cache files. With staleduration (hours) set, expired cache files are
+served for that long while they are refreshed in a background thread.
+Hits, misses and fetch times are counted in Service.cacheStats.
 """
 
 import datetime
+import io
 import json
 import logging
 import os
+import re
+import threading
 import time
+from collections import OrderedDict
 from cStringIO import StringIO
 from httplib import HTTPException
 
@@ -104,6 +115,96 @@ def _makeHash(inputdata):
     return json_hash.__hash__()
 
 
+# cache files are named <hash>_<verb>_<cachefile>, see Service.cacheFileName
+CACHEFILE_RE = re.compile(r'^-?\d+_(GET|POST|PUT|DELETE)_')
+
+
+def pruneCacheDir(cachepath, maxBytes):
+    """
+    Remove the oldest cache files of a Service cache directory until their
+    total size is within maxBytes. Returns the number of removed files.
+    """
+    cacheFiles = []
+    totalSize = 0
+    for name in os.listdir(cachepath):
+        if not CACHEFILE_RE.match(name):
+            continue
+        path = os.path.join(cachepath, name)
+        try:
+            fileStat = os.stat(path)
+        except OSError:
+            continue
+        cacheFiles.append((fileStat.st_mtime, fileStat.st_size, path))
+        totalSize += fileStat.st_size
+
+    removed = 0
+    for _, size, path in sorted(cacheFiles):
+        if totalSize <= maxBytes:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            # removed by someone else in the meantime
+            pass
+        totalSize -= size
+    return removed
+
+
+class MemoryCache(object):
+    """
+    Thread safe LRU of cache file contents, bounded by their total size in
+    bytes. Each entry keeps the mtime of the cache file it was read from.
+    """
+
+    def __init__(self, maxBytes):
+        self.maxBytes = maxBytes
+        self.size = 0
+        self._entries = OrderedDict()  # key -> (content, mtime), least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return the (content, mtime) entry for key, or None
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._entries[key] = entry
+            return entry
+
+    def set(self, key, content, mtime):
+        """
+        Store content, evicting the least recently used entries to stay within maxBytes
+        """
+        with self._lock:
+            self._remove(key)
+            if len(content) > self.maxBytes:
+                return
+            self._entries[key] = (content, mtime)
+            self.size += len(content)
+            while self.size > self.maxBytes:
+                _, (oldContent, _) = self._entries.popitem(last=False)
+                self.size -= len(oldContent)
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
 class Service(dict):
     def __init__(self, cfg_dict=None):
         super(Service, self).__init__()
@@ -131,9 +232,22 @@ class Service(dict):
         # Set a timeout for the socket
         self.setdefault("timeout", 300)
 
+        # bytes of cache files kept in memory, 0 to disable the memory tier
+        self.setdefault("memcachesize", 10 * 1024 * 1024)
+        # bytes of cache files kept on disk, None for no limit
+        self.setdefault("diskcachesize", None)
+        # hours an expired cache file is served while it's refreshed in the background
+        self.setdefault("staleduration", 0)
+
         # then update with the incoming dict
         self.update(cfg_dict)
 
+        self.memoryCache = MemoryCache(self['memcachesize'])
+        self.cacheStats = {'memoryHits': 0, 'diskHits': 0, 'staleHits': 0, 'misses': 0,
+                           'fetches': 0, 'fetchErrors': 0, 'fetchTime': 0.0}
+        self._refreshing = set()
+        self._cacheLock = threading.Lock()
+
         self['service_name'] = self.__class__.__name__  # used for cache naming
 
         # Get the request class, to instantiate later
@@ -144,6 +258,9 @@ class Service(dict):
             requests = JSONRequests
         else:
             requests = Requests
+        # kept to give background refresh threads their own Requests
+        self._requestsClass = requests
+        self._requestsConfig = cfg_dict
         # Instantiate a Request
         try:
             self["requests"] = requests(cfg_dict['endpoint'], cfg_dict)
@@ -201,10 +318,13 @@ class Service(dict):
 
         cachefile = self.cacheFileName(cachefile, verb, inputdata)
 
-        if cache_expired(cachefile, self["cacheduration"]):
-            self.getData(cachefile, url, inputdata, incoming_headers, encoder, decoder, verb, contentType)
-        else:
-            self['logger'].debug('Data is from the Service cache')
+        if not isfile(cachefile):
+            cached = self._cachedData(cachefile, openfile,
+                                      (url, inputdata, incoming_headers, encoder, decoder, verb, contentType))
+            if cached is not None:
+                return cached
+            self._countCache('misses')
+        self.getData(cachefile, url, inputdata, incoming_headers, encoder, decoder, verb, contentType)
 
         # cachefile may be filename or file object
         if openfile and not isfile(cachefile):
@@ -212,6 +332,101 @@ class Service(dict):
         else:
             return cachefile
 
+    def _countCache(self, counter, value=1):
+        with self._cacheLock:
+            self.cacheStats[counter] += value
+
+    def _cachedData(self, cachefile, openfile, refreshArgs):
+        """
+        Look a cache file up, first in memory then on disk. Returns None if it
+        must be fetched, otherwise the cache file name (openfile=False) or a
+        file-like object. Expired cache files are still returned within
+        staleduration hours, and refreshed in a background thread.
+        """
+        try:
+            mtime = os.path.getmtime(cachefile)
+        except OSError:
+            return None
+
+        age = time.time() - mtime
+        duration = (self["cacheduration"] or 0) * 3600
+        if age <= duration:
+            stale = False
+        elif age <= duration + (self["staleduration"] or 0) * 3600:
+            stale = True
+            self._refreshInBackground(cachefile, refreshArgs)
+        else:
+            return None
+
+        if not openfile:
+            self._countCache('staleHits' if stale else 'diskHits')
+            return cachefile
+        if not self['memcachesize']:
+            self._countCache('staleHits' if stale else 'diskHits')
+            return open(cachefile, 'r')
+
+        entry = self.memoryCache.get(cachefile)
+        if entry is not None and entry[1] == mtime:
+            self._countCache('staleHits' if stale else 'memoryHits')
+            content = entry[0]
+        else:
+            self._countCache('staleHits' if stale else 'diskHits')
+            with open(cachefile, 'r') as fd:
+                content = fd.read()
+            self.memoryCache.set(cachefile, content, mtime)
+        self['logger'].debug('Data is from the Service cache')
+        return io.BytesIO(content)
+
+    def _refreshInBackground(self, cachefile, refreshArgs):
+        """
+        Start a thread refreshing the cache file, unless one is already running
+        """
+        with self._cacheLock:
+            if cachefile in self._refreshing:
+                return
+            self._refreshing.add(cachefile)
+        self['logger'].debug("Serving stale %s while it's refreshed", cachefile)
+        thread = threading.Thread(target=self._backgroundRefresh, args=(cachefile,) + tuple(refreshArgs))
+        thread.daemon = True
+        thread.start()
+
+    def _backgroundRefresh(self, cachefile, *args):
+        try:
+            # the shared Requests instance (and its connection) is not thread safe
+            requests = self._requestsClass(self._requestsConfig['endpoint'], self._requestsConfig)
+            requests['logger'] = self['logger']
+            self.getData(cachefile, *args, requests=requests)
+        except Exception as ex:
+            self['logger'].warning("Background refresh of %s failed: %s", cachefile, str(ex))
+        finally:
+            with self._cacheLock:
+                self._refreshing.discard(cachefile)
+
+    def _writeCache(self, cachefile, content):
+        """
+        Atomically replace the cache file, then update the memory tier and
+        keep the cache directory within diskcachesize
+        """
+        tmpfile = os.path.join(os.path.dirname(cachefile), '.%s.%s.%s' % (os.path.basename(cachefile),
+                                                                          os.getpid(), threading.current_thread().ident))
+        with open(tmpfile, 'w') as f:
+            f.write(content)
+        os.rename(tmpfile, cachefile)
+        if self['memcachesize']:
+            self.memoryCache.set(cachefile, content, os.path.getmtime(cachefile))
+        if self['diskcachesize']:
+            pruneCacheDir(self['cachepath'], self['diskcachesize'])
+
+    def getCacheStats(self):
+        """
+        Return a copy of the cache counters, including the memory tier usage
+        """
+        with self._cacheLock:
+            stats = dict(self.cacheStats)
+        stats['memoryEntries'] = len(self.memoryCache)
+        stats['memoryBytes'] = self.memoryCache.size
+        return stats
+
     def forceRefresh(self, cachefile, url='', inputdata=None, openfile=True,
                      encoder=True, decoder=True, verb='GET',
                      contentType=None, incoming_headers=None):
@@ -247,6 +462,7 @@ class Service(dict):
         verb = self._verbCheck(verb)
         os.system("/bin/rm -f %s/*" % self['requests']['req_cache_path'])
         cachefile = self.cacheFileName(cachefile, verb, inputdata)
+        self.memoryCache.remove(cachefile)
         try:
             if not isfile(cachefile):
                 os.remove(cachefile)
@@ -255,14 +471,16 @@ class Service(dict):
 
     def getData(self, cachefile, url, inputdata=None, incoming_headers=None,
                 encoder=True, decoder=True,
-                verb='GET', contentType=None, force_refresh=False):
+                verb='GET', contentType=None, force_refresh=False, requests=None):
         """
         Takes the already generated *full* path to cachefile and the url of the
         resource. Don't need to call self.cacheFileName(cachefile, verb, inputdata)
         here.
 
-        If cachefile is StringIO append to that
+        If cachefile is StringIO append to that. The request is made with the
+        requests instance if given, otherwise with self["requests"].
         """
+        requests = requests or self["requests"]
         inputdata = inputdata or {}
         incoming_headers = incoming_headers or {}
         verb = self._verbCheck(verb)
@@ -273,13 +491,21 @@ class Service(dict):
                 inputdata = self["inputdata"]
             self['logger'].debug('getData: \n\turl: %s\n\tdata: %s' % \
                                  (url, inputdata))
-            data, dummyStatus, dummyReason, from_cache = self["requests"].makeRequest(uri=url,
-                                                                                      verb=verb,
-                                                                                      data=inputdata,
-                                                                                      incoming_headers=incoming_headers,
-                                                                                      encoder=encoder,
-                                                                                      decoder=decoder,
-                                                                                      contentType=contentType)
+            startTime = time.time()
+            try:
+                data, dummyStatus, dummyReason, from_cache = requests.makeRequest(uri=url,
+                                                                                  verb=verb,
+                                                                                  data=inputdata,
+                                                                                  incoming_headers=incoming_headers,
+                                                                                  encoder=encoder,
+                                                                                  decoder=decoder,
+                                                                                  contentType=contentType)
+            except Exception:
+                self._countCache('fetchErrors')
+                raise
+            finally:
+                self._countCache('fetches')
+                self._countCache('fetchTime', time.time() - startTime)
             if from_cache:
                 # If it's coming from the cache we don't need to write it to the
                 # second cache, or do we?
@@ -291,11 +517,10 @@ class Service(dict):
                     cachefile.write(str(data))
                     cachefile.seek(0, 0)  # return to beginning of file
                 else:
-                    with open(cachefile, 'w') as f:
-                        if isinstance(data, dict) or isinstance(data, list):
-                            f.write(json.dumps(data))
-                        else:
-                            f.write(str(data))
+                    if isinstance(data, dict) or isinstance(data, list):
+                        self._writeCache(cachefile, json.dumps(data))
+                    else:
+                        self._writeCache(cachefile, str(data))
 
 
         except (IOError, HttpLib2Error, HTTPException) as he:
@@ -306,7 +531,7 @@ class Service(dict):
             #
             if force_refresh or isfile(cachefile) or not os.path.exists(cachefile):
                 msg = 'The cachefile %s does not exist and the service at %s'
-                msg = msg % (cachefile, self["requests"]['host'] + url)
+                msg = msg % (cachefile, requests['host'] + url)
                 if hasattr(he, 'status') and hasattr(he, 'reason'):
                     msg += ' is unavailable - it returned %s because %s' % (he.status,
                                                                             he.reason)
@@ -347,6 +572,20 @@ class Service(dict):
                     self['logger'].warning(msg)
                     raise he
 
+    def getMultiData(self, urls, inputdata=None, verb='GET', incoming_headers=None,
+                     decoder=True, contentType=None, numConn=10, retries=0, timeout=None):
+        """
+        Fetch several resources of the service concurrently, bypassing the
+        Service cache. urls is a list of url or (url, inputdata) pairs.
+        Results are yielded as they complete, see Requests.makeMultiRequest
+        """
+        verb = self._verbCheck(verb)
+        urls = list(urls)
+        inputdata = inputdata or self["inputdata"]
+        self['logger'].debug('getMultiData: %s requests, %s in flight', len(urls), numConn)
+        return self["requests"].makeMultiRequest(urls, inputdata, verb, incoming_headers,
+                                                 decoder, contentType, numConn, retries, timeout)
+
     def _verbCheck(self, verb='GET'):
         if verb.upper() in self.supportVerbList:
             return verb.upper()
@@ -277,6 +277,41 @@ class WMStatsReader(object):
 
         return self.getRequestByStatus(ACTIVE_STATUS, jobInfoFlag)
 
+    def getRequestDBUpdateSeq(self):
+        """
+        returns the current update sequence of the request db, to get the
+        changes of the active data from that point with getActiveDataChanges
+        """
+        return self.reqDB.couchDB.info()["update_seq"]
+
+    def getActiveDataChanges(self, since):
+        """
+        Get the active requests whose request documents changed since the
+        request db update sequence `since`.
+        returns a tuple with the last update sequence, a dict of the changed
+        active requests with their job info like getActiveData and the list of
+        changed requests which are not active anymore.
+        """
+        changes = self.reqDB.couchDB.changes(since=since)
+        changed = set()
+        removed = set()
+        for row in changes["results"]:
+            if row["id"].startswith("_design/"):
+                continue
+            if row.get("deleted", False):
+                removed.add(row["id"])
+            else:
+                changed.add(row["id"])
+
+        requestInfo = {}
+        if changed:
+            for requestName, doc in self.reqDB.getRequestByNames(list(changed), True).items():
+                if doc and doc.get("RequestStatus") in ACTIVE_STATUS:
+                    requestInfo[requestName] = doc
+            self._updateRequestInfoWithJobInfo(requestInfo)
+        removed.update(changed - set(requestInfo))
+        return changes["last_seq"], requestInfo, list(removed)
+
     def getT0ActiveData(self, jobInfoFlag=False):
 
         return self.getRequestByStatus(T0_ACTIVE_STATUS, jobInfoFlag)
@@ -35,10 +35,17 @@ urls = [url1, url2, url3]
 data = getdata(urls, ckey, cert, cookie=cookie)
 for row in data:
     print(row)
+
+# RequestHandler reuses curl handles (and therefore their open, keep-alive
+# connections) per host through a CurlHandlePool. By default all the
+# handlers share a process wide pool, a dedicated one can be requested with
+# the pool_size/pool_idle_timeout configuration parameters
+mgr = RequestHandler({'pool_size': 4, 'pool_idle_timeout': 60})
 """
 from __future__ import print_function
 
 import cStringIO as StringIO
+import collections
 import httplib
 import json
 import logging
@@ -46,7 +53,14 @@ import os
 import re
 import subprocess
 import sys
+import threading
+import time
 import urllib
+try:
+    from urlparse import urlparse
+except ImportError:
+    # PY3
+    from urllib.parse import urlparse
 
 # python3
 if sys.version.startswith('3.'):
@@ -87,10 +101,112 @@ class ResponseHeader(object):
             try:
                 key, val = row.split(':', 1)
                 self.header[key.strip()] = val.strip()
-            except:
+            except ValueError:
                 pass
 
 
+class CurlHandlePool(object):
+    """
+    Thread safe pool of reusable curl handles, kept per host (scheme://netloc).
+    libcurl keeps the connections of a handle open, so reusing it for
+    the same host saves the TCP and SSL handshakes of the next request.
+    Handles idle for longer than idleTimeout seconds are closed.
+    A forked process starts with an empty pool: the idle handles it inherits
+    are dropped without closing them, their connections are the parent's ones.
+    """
+
+    def __init__(self, size=10, idleTimeout=300):
+        super(CurlHandlePool, self).__init__()
+        self.size = size
+        self.idleTimeout = idleTimeout
+        self.created = 0
+        self.reused = 0
+        self._idle = {}  # host -> list of (curl, time it was released)
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._inherited = []  # handles of the parent process, never closed
+
+    @staticmethod
+    def hostKey(url):
+        "Return the pool key for given url"
+        parts = urlparse(url)
+        return "%s://%s" % (parts.scheme, parts.netloc)
+
+    def getHandle(self, url):
+        "Return an idle curl handle for the url host or a new one"
+        key = self.hostKey(url)
+        self._checkProcess()
+        with self._lock:
+            self._evict(time.time())
+            handles = self._idle.get(key)
+            if handles:
+                self.reused += 1
+                return handles.pop()[0]
+            self.created += 1
+        return pycurl.Curl()
+
+    def releaseHandle(self, url, curl):
+        "Give a handle back to the pool, closing it if the host has enough idle ones"
+        curl.reset()
+        key = self.hostKey(url)
+        self._checkProcess()
+        with self._lock:
+            handles = self._idle.setdefault(key, [])
+            if len(handles) < self.size:
+                handles.append((curl, time.time()))
+                return
+        curl.close()
+
+    @staticmethod
+    def discard(curl):
+        "Close a handle which can not be reused, e.g. after a failed transfer"
+        curl.close()
+
+    def _checkProcess(self):
+        "Drop the idle handles inherited from the parent process after a fork"
+        pid = os.getpid()
+        if pid == self._pid:
+            return
+        # the lock may have been held by another thread of the parent
+        self._lock = threading.Lock()
+        with self._lock:
+            for handles in self._idle.values():
+                # closing them could shut down connections the parent still uses
+                self._inherited.extend(curl for curl, _ in handles)
+            self._idle = {}
+            self._pid = pid
+
+    def _evict(self, now):
+        "Close the handles idle for more than idleTimeout, the lock must be held"
+        for key in list(self._idle):
+            handles = self._idle[key]
+            while handles and now - handles[0][1] > self.idleTimeout:
+                handles.pop(0)[0].close()
+            if not handles:
+                del self._idle[key]
+
+    def numIdle(self, url=None):
+        "Number of idle handles, for a given url host or in total"
+        self._checkProcess()
+        with self._lock:
+            if url is not None:
+                return len(self._idle.get(self.hostKey(url), []))
+            return sum(len(handles) for handles in self._idle.values())
+
+    def clear(self):
+        "Close all the idle handles"
+        self._checkProcess()
+        with self._lock:
+            for handles in self._idle.values():
+                for curl, _ in handles:
+                    curl.close()
+            self._idle.clear()
+
+
+# curl handle pool shared by all the RequestHandler objects without a dedicated one
+_handlePool = CurlHandlePool()
+
+
 class RequestHandler(object):
     """
     RequestHandler provides APIs to fetch single/multiple
@@ -106,6 +222,12 @@ class RequestHandler(object):
         self.connecttimeout = config.get('connecttimeout', 30)
         self.followlocation = config.get('followlocation', 1)
         self.maxredirs = config.get('maxredirs', 5)
+        self.keepalive = config.get('keepalive', 1)
+        if 'pool_size' in config or 'pool_idle_timeout' in config:
+            self.pool = CurlHandlePool(config.get('pool_size', 10),
+                                       config.get('pool_idle_timeout', 300))
+        else:
+            self.pool = _handlePool
         self.logger = logger if logger else logging.getLogger()
 
     def encode_params(self, params, verb, doseq):
@@ -143,6 +265,8 @@ class RequestHandler(object):
         curl.setopt(pycurl.CONNECTTIMEOUT, self.connecttimeout)
         curl.setopt(pycurl.FOLLOWLOCATION, self.followlocation)
         curl.setopt(pycurl.MAXREDIRS, self.maxredirs)
+        if self.keepalive and hasattr(pycurl, 'TCP_KEEPALIVE'):
+            curl.setopt(pycurl.TCP_KEEPALIVE, 1)
         if cookie and url in cookie:
             curl.setopt(pycurl.COOKIEFILE, cookie[url])
             curl.setopt(pycurl.COOKIEJAR, cookie[url])
@@ -229,10 +353,16 @@ class RequestHandler(object):
                 verbose=0, ckey=None, cert=None, capath=None,
                 doseq=True, decode=False, cainfo=None, cookie=None):
         """Fetch data for given set of parameters"""
-        curl = pycurl.Curl()
-        bbuf, hbuf = self.set_opts(curl, url, params, headers,
-                                   ckey, cert, capath, verbose, verb, doseq, cainfo, cookie)
-        curl.perform()
+        curl = self.pool.getHandle(url)
+        try:
+            bbuf, hbuf = self.set_opts(curl, url, params, headers,
+                                       ckey, cert, capath, verbose, verb, doseq, cainfo, cookie)
+            curl.perform()
+        except Exception:
+            # the handle may be left in a bad state, don't reuse it
+            self.pool.discard(curl)
+            raise
+        self.pool.releaseHandle(url, curl)
         if verbose:
             print(verb, url, params, headers)
         header = self.parse_header(hbuf.getvalue())
@@ -276,43 +406,116 @@ class RequestHandler(object):
         return header
 
     def multirequest(self, url, parray, headers=None,
-                     ckey=None, cert=None, verbose=None, cookie=None):
-        """Fetch data for given set of parameters"""
+                     ckey=None, cert=None, verbose=None, cookie=None, num_conn=10):
+        """Fetch data for given set of parameters, num_conn requests at a time"""
+        rows = self.multiget([(url, params) for params in parray], headers,
+                             ckey=ckey, cert=cert, verbose=verbose, cookie=cookie,
+                             num_conn=num_conn)
+        for row in rows:
+            if row['error']:
+                raise pycurl.error(row['code'], row['error'])
+            params = row['params']
+            data = json.loads(row['data'])
+            if isinstance(data, dict):
+                data.update(params)
+                yield data
+            if isinstance(data, list):
+                for item in data:
+                    if isinstance(item, dict):
+                        item.update(params)
+                        yield item
+                    else:
+                        err = 'Unsupported data format: data=%s, type=%s' \
+                              % (item, type(item))
+                        raise Exception(err)
+
+    def multiget(self, requests, headers=None, verb='GET',
+                 ckey=None, cert=None, capath=None, verbose=None, doseq=True,
+                 decode=False, cainfo=None, cookie=None,
+                 num_conn=10, retries=0, timeout=None):
+        """
+        Fetch a list of requests concurrently via CurlMulti, keeping at most
+        num_conn transfers in flight. Each request is either an url or an
+        (url, params) pair. Results are yielded as soon as the transfers
+        complete, as dictionaries with the url, params, status, reason,
+        headers, data, error, code, attempts and latency (seconds spent in
+        the last attempt) keys. Transfers failing with a curl error or a
+        5xx status are retried up to retries times, timeout overrides the
+        handler timeout for each transfer.
+        """
+        queue = collections.deque()
+        for req in requests:
+            if isinstance(req, basestring):
+                queue.append((req, None, 0))
+            else:
+                queue.append((req[0], req[1], 0))
+
         multi = pycurl.CurlMulti()
-        for params in parray:
-            curl = pycurl.Curl()
-            bbuf, hbuf = \
-                self.set_opts(curl, url, params, headers, ckey, cert, verbose, cookie=cookie)
-            multi.add_handle(curl)
-            while True:
-                ret, num_handles = multi.perform()
-                if ret != pycurl.E_CALL_MULTI_PERFORM:
-                    break
-            while num_handles:
-                ret = multi.select(1.0)
-                if ret == -1:
-                    continue
+        active = {}  # id(curl) -> (curl, url, params, attempts, bbuf, hbuf, start time)
+        try:
+            while queue or active:
+                while queue and len(active) < num_conn:
+                    url, params, attempts = queue.popleft()
+                    curl = self.pool.getHandle(url)
+                    try:
+                        bbuf, hbuf = self.set_opts(curl, url, params, headers, ckey, cert, capath,
+                                                   verbose, verb, doseq, cainfo, cookie)
+                        if timeout:
+                            curl.setopt(pycurl.TIMEOUT, timeout)
+                        multi.add_handle(curl)
+                    except Exception:
+                        self.pool.releaseHandle(url, curl)
+                        raise
+                    active[id(curl)] = (curl, url, params, attempts + 1, bbuf, hbuf, time.time())
+
                 while True:
-                    ret, num_handles = multi.perform()
+                    ret, _ = multi.perform()
                     if ret != pycurl.E_CALL_MULTI_PERFORM:
                         break
-            dummyNumq, response, dummyErr = multi.info_read()
-            for dummyCobj in response:
-                data = json.loads(bbuf.getvalue())
-                if isinstance(data, dict):
-                    data.update(params)
-                    yield data
-                if isinstance(data, list):
-                    for item in data:
-                        if isinstance(item, dict):
-                            item.update(params)
-                            yield item
+
+                finished = []
+                while True:
+                    num_q, ok_list, err_list = multi.info_read()
+                    finished.extend((curl, None, None) for curl in ok_list)
+                    finished.extend(err_list)
+                    if num_q == 0:
+                        break
+
+                for curl, errno, errmsg in finished:
+                    multi.remove_handle(curl)
+                    _, url, params, attempts, bbuf, hbuf, start = active.pop(id(curl))
+                    row = {'url': url, 'params': params, 'status': None, 'reason': '',
+                           'headers': {}, 'data': None, 'error': None, 'code': None,
+                           'attempts': attempts, 'latency': time.time() - start}
+                    if errmsg is not None:
+                        self.pool.discard(curl)
+                        row.update({'error': errmsg, 'code': errno})
+                    else:
+                        self.pool.releaseHandle(url, curl)
+                        header = self.parse_header(hbuf.getvalue())
+                        row.update({'status': header.status, 'reason': header.reason,
+                                    'headers': header.header})
+                        if header.status >= 300:
+                            row['data'] = bbuf.getvalue()
+                            row.update({'error': header.reason, 'code': header.status})
+                        elif verb == 'HEAD':
+                            row['data'] = ''
                         else:
-                            err = 'Unsupported data format: data=%s, type=%s' \
-                                  % (item, type(item))
-                            raise Exception(err)
-                bbuf.flush()
-                hbuf.flush()
+                            row['data'] = self.parse_body(bbuf.getvalue(), decode)
+                    if attempts <= retries and (errmsg is not None or row['status'] >= 500):
+                        self.logger.debug("Retrying %s after error: %s", url, row['error'])
+                        queue.append((url, params, attempts))
+                        continue
+                    yield row
+
+                if active:
+                    multi.select(1.0)
+        finally:
+            # generator closed or failed, drop the transfers still in flight
+            for curl, _, _, _, _, _, _ in active.values():
+                multi.remove_handle(curl)
+                self.pool.discard(curl)
+            multi.close()
 
 
 HTTP_PAT = re.compile( \
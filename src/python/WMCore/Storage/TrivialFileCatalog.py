@@ -27,6 +27,7 @@ Usage: Given a TFC constact string: trivialcatalog_file:/path?protocol=proto
 
 import os
 import re
+from collections import OrderedDict
 
 try:
     from urlparse import urlsplit
@@ -48,11 +49,16 @@ class TrivialFileCatalog(dict):
     File Catalog
     """
 
+    # maximum number of lookup results kept by each catalog
+    cacheSize = 10000
+
     def __init__(self):
         dict.__init__(self)
         self['lfn-to-pfn'] = []
         self['pfn-to-lfn'] = []
         self.preferredProtocol = None  # attribute for preferred protocol
+        self._rules = None
+        self._matchCache = OrderedDict()
 
     def addMapping(self, protocol, match, result,
                    chain=None, mapping_type='lfn-to-pfn'):
@@ -69,38 +75,69 @@ class TrivialFileCatalog(dict):
         entry.setdefault("result", result)
         entry.setdefault("chain", chain)
         self[mapping_type].append(entry)
+        self._rules = None
+        self._matchCache.clear()
 
-    def _doMatch(self, protocol, path, style, caller):
+    def _getRules(self, style, protocol):
         """
-        Generalised way of building up the mappings.
-        caller is the method from there this method was called, it's used
-        for resolving chained rules
+        _getRules_
+
+        Rules of a mapping style for a protocol, in catalog order. The rules
+        are grouped by style and protocol the first time they're needed.
+        """
+        if self._rules is None:
+            rules = {}
+            for mappingStyle in ['lfn-to-pfn', 'pfn-to-lfn']:
+                for mapping in self[mappingStyle]:
+                    regexp = mapping['path-match-expr']
+                    # chained rules match anywhere in the path returned by the chain
+                    matcher = regexp.match if mapping['chain'] is None else regexp.search
+                    rules.setdefault((mappingStyle, mapping['protocol']), []).append(
+                        (matcher, mapping['result'], mapping['chain']))
+            self._rules = rules
+        return self._rules.get((style, protocol), [])
+
+    def _doMatch(self, protocol, path, style):
+        """
+        Generalised way of building up the mappings. Chained rules are
+        resolved with the rules of their chain protocol first. Results are
+        kept in a bounded LRU cache.
 
         Return None if no match
 
         """
-        for mapping in self[style]:
-            if mapping['protocol'] != protocol:
-                continue
-            if mapping['path-match-expr'].match(path) or mapping["chain"] != None:
-                if mapping["chain"] != None:
-                    oldpath = path
-                    path = caller(mapping["chain"], path)
-                    if not path:
-                        continue
-                splitList = []
-                if len(mapping['path-match-expr'].split(path, 1)) > 1:
-                    for split in range(len(mapping['path-match-expr'].split(path, 1))):
-                        s = mapping['path-match-expr'].split(path, 1)[split]
-                        if s:
-                            splitList.append(s)
-                else:
-                    path = oldpath
+        key = (style, protocol, path)
+        try:
+            result = self._matchCache.pop(key)
+        except KeyError:
+            result = self._resolve(protocol, path, style)
+            if len(self._matchCache) >= self.cacheSize:
+                self._matchCache.popitem(last=False)
+        self._matchCache[key] = result
+        return result
+
+    def _resolve(self, protocol, path, style):
+        """
+        _resolve_
+
+        Apply the first matching rule of the protocol to the path,
+        evaluating every rule expression once.
+        """
+        for matcher, result, chain in self._getRules(style, protocol):
+            rulePath = path
+            if chain is not None:
+                rulePath = self._doMatch(chain, path, style)
+                if not rulePath:
                     continue
-                result = mapping['result']
-                for split in range(len(splitList)):
-                    result = result.replace("$" + str(split + 1), splitList[split])
-                return result
+            match = matcher(rulePath)
+            if match is None:
+                continue
+            # same pieces as path-match-expr.split(rulePath, 1) without the empty ones
+            splitList = [rulePath[:match.start()]] + list(match.groups()) + [rulePath[match.end():]]
+            splitList = [split for split in splitList if split]
+            for split in range(len(splitList)):
+                result = result.replace("$" + str(split + 1), splitList[split])
+            return result
 
         return None
 
@@ -114,7 +151,21 @@ class TrivialFileCatalog(dict):
         Return None if no match
 
         """
-        result = self._doMatch(protocol, lfn, "lfn-to-pfn", self.matchLFN)
+        result = self._doMatch(protocol, lfn, "lfn-to-pfn")
+        return result
+
+    def matchLFNs(self, protocol, lfns):
+        """
+        _matchLFNs_
+
+        Match many LFNs for the same protocol, return a dictionary
+        of {lfn: pfn} with None as the pfn of the LFNs that don't match
+
+        """
+        result = {}
+        for lfn in lfns:
+            if lfn not in result:
+                result[lfn] = self._doMatch(protocol, lfn, "lfn-to-pfn")
         return result
 
     def matchPFN(self, protocol, pfn):
@@ -127,7 +178,7 @@ class TrivialFileCatalog(dict):
         Return None if no match
 
         """
-        result = self._doMatch(protocol, pfn, "pfn-to-lfn", self.matchPFN)
+        result = self._doMatch(protocol, pfn, "pfn-to-lfn")
         return result
 
     def getXML(self):
@@ -100,39 +100,7 @@ class File(WMBSBase, WMFile):
         level indicates the level of ancestors. default value is 2
         (grand parents). level should be bigger than >= 1
         """
-        existingTransaction = self.beginTransaction()
-
-        def _getAncestorIDs(ids, level):
-            action = self.daofactory(classname="Files.GetParentIDsByID")
-            parentIDs = sorted(action.execute(ids, conn=self.getDBConn(), transaction=self.existingTransaction()))
-
-            if level == 1 or len(parentIDs) == 0:
-                return parentIDs
-            else:
-                return _getAncestorIDs(parentIDs, level - 1)
-
-        if self["id"] < 0:
-            self.load()
-
-        idList = _getAncestorIDs(self["id"], level)
-
-        if type == "id":
-            results = idList
-        elif type == "lfn":
-            results = []
-            for fileID in idList:
-                anceFile = File(id=fileID)
-                anceFile.load()
-                results.append(anceFile["lfn"])
-        elif type == "file":
-            results = []
-            for fileID in idList:
-                anceFile = File(id=fileID)
-                anceFile.load()
-                results.append(anceFile)
-
-        self.commitTransaction(existingTransaction)
-        return results
+        return self._getRelatives(level, type, ancestors=True)
 
     def getDescendants(self, level=2, type="id"):
         """
@@ -140,40 +108,74 @@ class File(WMBSBase, WMFile):
         level indicates the level of ancestors. default value is 2
         (grand parents). level should be bigger than >= 1
         """
-        existingTransaction = self.beginTransaction()
+        return self._getRelatives(level, type, ancestors=False)
 
-        def _getDescendantIDs(ids, level):
-            action = self.daofactory(classname="Files.GetChildIDsByID")
-            childIDs = sorted(action.execute(ids, conn=self.getDBConn(), transaction=self.existingTransaction()))
+    def _getRelatives(self, level, type, ancestors):
+        """
+        _getRelatives_
 
-            if level == 1 or len(childIDs) == 0:
-                return childIDs
-            else:
-                return _getDescendantIDs(childIDs, level - 1)
+        Ancestors or descendants of the file at the given level, as ids,
+        lfns or loaded files.
+        """
+        existingTransaction = self.beginTransaction()
 
         if self["id"] < 0:
             self.load()
 
-        idList = _getDescendantIDs(self["id"], level)
+        lineage = self.getLineage(self["id"], level=level, ancestors=ancestors)
+        idList = lineageLevel(lineage, [self["id"]], level)
 
         if type == "id":
             results = idList
-        elif type == "lfn":
-            results = []
-            for fileID in idList:
-                descFile = File(id=fileID)
-                descFile.load()
-                results.append(descFile['lfn'])
-        elif type == "file":
-            results = []
-            for fileID in idList:
-                descFile = File(id=fileID)
-                descFile.load()
-                results.append(descFile)
+        else:
+            files = self.loadFilesByID(idList)
+            if type == "lfn":
+                results = [files[fileID]["lfn"] for fileID in idList]
+            elif type == "file":
+                results = [files[fileID] for fileID in idList]
 
         self.commitTransaction(existingTransaction)
         return results
 
+    def getLineage(self, fileIDs, level=2, ancestors=True):
+        """
+        _getLineage_
+
+        Ancestors (or descendants) of all the given files up to level
+        generations, as an adjacency dictionary of {fileid: set(ids)} with
+        the parents (or children) of every file found along the way.
+        """
+        action = self.daofactory(classname="Files.GetLineage")
+        return action.execute(fileIDs=fileIDs, level=level, ancestors=ancestors,
+                              conn=self.getDBConn(),
+                              transaction=self.existingTransaction())
+
+    def loadFilesByID(self, fileIDs):
+        """
+        _loadFilesByID_
+
+        Load the details and checksums of many files in bulk. Returns a
+        dictionary of {fileid: File}.
+        """
+        if not fileIDs:
+            return {}
+
+        action = self.daofactory(classname="Files.GetByID")
+        fileInfo = action.execute(list(fileIDs), conn=self.getDBConn(),
+                                  transaction=self.existingTransaction())
+        action = self.daofactory(classname="Files.GetBulkChecksum")
+        checksums = action.execute(fileIDs=list(fileIDs), conn=self.getDBConn(),
+                                   transaction=self.existingTransaction())
+
+        files = {}
+        for fileID, info in fileInfo.items():
+            loadedFile = File(id=fileID)
+            loadedFile.update(info)
+            if fileID in checksums:
+                loadedFile["checksums"] = checksums[fileID]
+            files[fileID] = loadedFile
+        return files
+
     def load(self):
         """
         _load_
@@ -620,3 +622,21 @@ def addFilesToWMBSInBulk(filesetId, workflowName, files, isDBS=True,
                              transaction=transaction)
 
     return len(lfnsToCreate)
+
+
+def lineageLevel(lineage, fileIDs, level):
+    """
+    _lineageLevel_
+
+    Sorted ids of the files exactly level generations away from the given
+    files in an adjacency dictionary as returned by File.getLineage.
+    """
+    relatives = set(fileIDs)
+    for _ in range(level):
+        nextGeneration = set()
+        for fileID in relatives:
+            nextGeneration.update(lineage.get(fileID, ()))
+        relatives = nextGeneration
+        if not relatives:
+            break
+    return sorted(relatives)
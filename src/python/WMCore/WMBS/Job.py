@@ -264,20 +264,20 @@ class Job(WMBSBase, WMJob):
         assocAction = self.daofactory(classname='Jobs.AddWorkUnits')
 
         files = WMJob.getFiles(self)
-        jobMask = self['mask']
+        jobMask = self['mask'].compile()
 
         workflow = self.getWorkflow()
         wfid = workflow['taskid']
 
         lumisInJob = 0
         for wmfile in files:
-            fileMask = jobMask.filterRunLumisByMask(runs=wmfile['runs'])
+            fileMask = jobMask.filterRuns(runs=wmfile['runs'])
             for runObj in fileMask:
                 lumisInJob += len(runObj.lumis)
 
         for wmfile in files:
             fileid = wmfile['id']
-            fileMask = jobMask.filterRunLumisByMask(runs=wmfile['runs'])
+            fileMask = jobMask.filterRuns(runs=wmfile['runs'])
             for runObj in fileMask:
                 run = runObj.run
                 lumis = runObj.lumis
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+"""
+_JobArchive_
+
+Single file archive of the pickled jobs of a job collection.
+
+Instead of a job.pkl file in every job cache directory, the JobCreator
+writes all the jobs of a job collection (the jobs of a job group, in chunks
+of 1000, sharing a JobCollection_<group>_<n> directory) in one archive file
+in the collection directory, an indexed container (see Utils.IndexedContainer):
+
+  WMJOBS <version> <index length>\\n
+  <JSON index: {job id: [offset, length]}>
+  <pickled jobs>
+
+Readers memory map the archive and only unpickle the jobs they ask for.
+JobLoader also reads the job.pkl files written by older versions.
+"""
+
+import mmap
+import os
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from Utils.IndexedContainer import readHeader, writeContainer
+from WMCore.WMException import WMException
+
+MAGIC = "WMJOBS"
+FORMAT_VERSION = 1
+ARCHIVE_NAME = "jobs.archive"
+JOB_PICKLE_NAME = "job.pkl"
+
+
+class JobArchiveException(WMException):
+    """
+    _JobArchiveException_
+
+    Malformed or unsupported job archive
+    """
+    pass
+
+
+def archivePath(cacheDir):
+    """
+    _archivePath_
+
+    Path of the archive holding the job with the given cache directory
+    """
+    return os.path.join(os.path.dirname(os.path.normpath(cacheDir)), ARCHIVE_NAME)
+
+
+def writeJobArchive(filename, jobs):
+    """
+    _writeJobArchive_
+
+    Write the jobs to the archive, keyed by their id. The jobs already in
+    an existing archive are kept unless they're rewritten. The archive is
+    replaced atomically.
+    """
+    blobs = {}
+    if os.path.exists(filename):
+        with JobArchive(filename) as archive:
+            for jobID in archive.jobIDs():
+                blobs[jobID] = archive.getRaw(jobID)
+    for job in jobs:
+        blobs[job['id']] = pickle.dumps(job, pickle.HIGHEST_PROTOCOL)
+
+    index = {}
+    offset = 0
+    for jobID in sorted(blobs):
+        index[str(jobID)] = [offset, len(blobs[jobID])]
+        offset += len(blobs[jobID])
+
+    writeContainer(filename, MAGIC, FORMAT_VERSION, index, [blobs[jobID] for jobID in sorted(blobs)])
+    return
+
+
+class JobArchive(object):
+    """
+    _JobArchive_
+
+    Read only, memory mapped access to the jobs of an archive
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        with open(filename, 'rb') as handle:
+            self._data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            _, index, self._dataStart = readHeader(self._data, MAGIC, FORMAT_VERSION)
+        except ValueError as ex:
+            self.close()
+            raise JobArchiveException("%s in %s" % (str(ex), filename))
+
+        self._index = dict((int(jobID), value) for jobID, value in index.items())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __contains__(self, jobID):
+        return jobID in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def jobIDs(self):
+        """
+        _jobIDs_
+
+        Sorted ids of the jobs in the archive
+        """
+        return sorted(self._index)
+
+    def getRaw(self, jobID):
+        """
+        _getRaw_
+
+        Pickled job
+        """
+        offset, length = self._index[jobID]
+        start = self._dataStart + offset
+        return self._data[start:start + length]
+
+    def getJob(self, jobID):
+        """
+        _getJob_
+
+        Unpickle a job, raises KeyError if it's not in the archive
+        """
+        return pickle.loads(self.getRaw(jobID))
+
+    def close(self):
+        """
+        _close_
+
+        Release the memory map
+        """
+        if self._data is not None:
+            self._data.close()
+            self._data = None
+
+
+class JobLoader(object):
+    """
+    _JobLoader_
+
+    Load jobs by cache directory and id, from the job archives or from the
+    job.pkl file of older jobs. The last maxOpen archives are kept open.
+    """
+
+    def __init__(self, maxOpen=20):
+        self.maxOpen = maxOpen
+        self._archives = {}
+        self._openOrder = []
+
+    def _getArchive(self, cacheDir):
+        filename = archivePath(cacheDir)
+        if filename in self._archives:
+            return self._archives[filename]
+
+        archive = None
+        if os.path.isfile(filename):
+            archive = JobArchive(filename)
+        self._archives[filename] = archive
+        self._openOrder.append(filename)
+        if len(self._openOrder) > self.maxOpen:
+            oldArchive = self._archives.pop(self._openOrder.pop(0))
+            if oldArchive is not None:
+                oldArchive.close()
+        return archive
+
+    def exists(self, cacheDir, jobID):
+        """
+        _exists_
+
+        Whether the job can be loaded
+        """
+        archive = self._getArchive(cacheDir)
+        if archive is not None and jobID in archive:
+            return True
+        return os.path.isfile(os.path.join(cacheDir, JOB_PICKLE_NAME))
+
+    def load(self, cacheDir, jobID):
+        """
+        _load_
+
+        Load the job from its archive or its job.pkl file
+        """
+        archive = self._getArchive(cacheDir)
+        if archive is not None and jobID in archive:
+            return archive.getJob(jobID)
+        with open(os.path.join(cacheDir, JOB_PICKLE_NAME), 'rb') as handle:
+            return pickle.load(handle)
+
+    def close(self):
+        """
+        _close_
+
+        Close all the open archives
+        """
+        for archive in self._archives.values():
+            if archive is not None:
+                archive.close()
+        self._archives = {}
+        self._openOrder = []
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""
+_GetBulkChecksum_
+
+MySQL implementation of Files.GetBulkChecksum
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+
+class GetBulkChecksum(DBFormatter):
+    """
+    Load the checksums of many files in one go, keyed by file id.
+    Files without checksums are not in the result.
+    """
+    sql = """SELECT fcs.fileid AS id, cst.type AS cktype, fcs.cksum AS cksum
+               FROM wmbs_file_checksums fcs
+               INNER JOIN wmbs_checksum_type cst ON fcs.typeid = cst.id
+               WHERE fcs.fileid IN (:id)
+    """
+
+    def format(self, result):
+        "Return a dictionary of {fileid: {cktype: cksum}}"
+
+        finalResult = {}
+        for row in self.iterRows(result):
+            finalResult.setdefault(row.id, {})[row.cktype] = row.cksum
+
+        return finalResult
+
+    def execute(self, fileIDs=None, conn=None, transaction=False):
+        result = self.dbi.processBulkSelect(self.sql, 'id', fileIDs,
+                                            conn=conn, transaction=transaction)
+        return self.format(result)
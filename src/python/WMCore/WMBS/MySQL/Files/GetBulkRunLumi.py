@@ -16,34 +16,25 @@ class GetBulkRunLumi(DBFormatter):
     """
     sql = """SELECT flr.run AS run, flr.lumi AS lumi, flr.fileid AS id
                FROM wmbs_file_runlumi_map flr
-               WHERE flr.fileid = :id
+               WHERE flr.fileid IN (:id)
     """
 
     def getBinds(self, files=None):
-        binds = []
         files = self.dbi.makelist(files)
-        for f in files:
-            binds.append({'id': f['id']})
-        return binds
+        return [f['id'] for f in files]
 
-    def format(self, result):
+    def format(self, rows):
         "Return a list of Run/Lumi Set"
 
         finalResult = {}
-        res = self.formatDict(result)
-
-        for entry in res:
-            fileid = entry['id']
-            run = entry['run']
-            finalResult.setdefault(fileid, {})
-            finalResult[fileid].setdefault(run, [])
-            finalResult[fileid][run].append(entry['lumi'])
+        for row in rows:
+            finalResult.setdefault(row.id, {}).setdefault(row.run, []).append(row.lumi)
 
         return finalResult
 
     def execute(self, files=None, conn=None, transaction=False):
-        binds = self.getBinds(files)
+        fileIDs = self.getBinds(files)
 
-        result = self.dbi.processData(self.sql, binds,
-                                      conn=conn, transaction=transaction)
-        return self.format(result)
+        rows = self.iterQuery(self.sql, {'id': fileIDs}, bindName='id',
+                              conn=conn, transaction=transaction)
+        return self.format(rows)
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""
+_GetLineage_
+
+MySQL implementation of Files.GetLineage
+
+Return the ancestors (or descendants) of many files up to a given number
+of generations as an adjacency dictionary {fileid: set(parent/child ids)}.
+It makes one bulk query per generation, not per file.
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+
+class GetLineage(DBFormatter):
+    parentSQL = """SELECT child AS id, parent AS relative FROM wmbs_file_parent
+                     WHERE child IN (:id)"""
+
+    childSQL = """SELECT parent AS id, child AS relative FROM wmbs_file_parent
+                    WHERE parent IN (:id)"""
+
+    def format(self, result):
+        lineage = {}
+        for row in self.iterRows(result):
+            lineage.setdefault(int(row.id), set()).add(int(row.relative))
+        return lineage
+
+    def execute(self, fileIDs=None, level=1, ancestors=True,
+                conn=None, transaction=False):
+        sql = self.parentSQL if ancestors else self.childSQL
+
+        lineage = {}
+        fileIDs = set(self.dbi.makelist(fileIDs))
+        while fileIDs and level > 0:
+            result = self.dbi.processBulkSelect(sql, 'id', list(fileIDs),
+                                                conn=conn, transaction=transaction)
+            generation = self.format(result)
+            lineage.update(generation)
+
+            fileIDs = set()
+            for relatives in generation.values():
+                fileIDs.update(relatives)
+            fileIDs.difference_update(lineage)
+            level -= 1
+
+        return lineage
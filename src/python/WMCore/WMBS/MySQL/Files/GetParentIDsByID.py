@@ -13,14 +13,10 @@ Return a list of ids which are parents for a file with a given id(s).
 from WMCore.Database.DBFormatter import DBFormatter
 
 class GetParentIDsByID(DBFormatter):
-    sql = """select distinct parent from wmbs_file_parent where child = :child"""
+    sql = """select distinct parent from wmbs_file_parent where child IN (:child)"""
 
     def getBinds(self, ids=None):
-        binds = []
-        childIDs = self.dbi.makelist(ids)
-        for id in childIDs:
-            binds.append({'child': id})
-        return binds
+        return self.dbi.makelist(ids)
 
     def format(self, result):
         out = set()
@@ -35,7 +31,7 @@ class GetParentIDsByID(DBFormatter):
         return list(out)
 
     def execute(self, ids=None, conn = None, transaction = False):
-        binds = self.getBinds(ids)
-        result = self.dbi.processData(self.sql, binds,
+        childIDs = self.getBinds(ids)
+        result = self.dbi.processBulkSelect(self.sql, 'child', childIDs,
                          conn = conn, transaction = transaction)
         return self.format(result)
@@ -16,14 +16,10 @@ class GetParentInfo(DBFormatter):
              FROM wmbs_file_details wfp
              INNER JOIN wmbs_file_parent wfpa ON wfpa.parent = wfp.id
              INNER JOIN wmbs_file_details wfd ON wfd.id = wfpa.child
-             WHERE wfd.lfn = :child_lfn
+             WHERE wfd.lfn IN (:child_lfn)
     """
 
     def execute(self, childLFNs, conn=None, transaction=False):
-        bindVars = []
-        for childLFN in childLFNs:
-            bindVars.append({"child_lfn": childLFN})
-
-        result = self.dbi.processData(self.sql, bindVars,
-                         conn=conn, transaction=transaction)
+        result = self.dbi.processBulkSelect(self.sql, "child_lfn", childLFNs,
+                                            conn=conn, transaction=transaction)
         return self.formatDict(result)
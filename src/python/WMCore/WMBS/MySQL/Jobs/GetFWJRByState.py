@@ -20,21 +20,19 @@ class GetFWJRByState(DBFormatter):
     sql = """SELECT id, fwjr_path FROM wmbs_job WHERE state =
                (SELECT id FROM wmbs_job_state WHERE name = :state)"""
 
-    def format(self, results):
+    def format(self, rows):
         """
         _format_
 
         """
-        results = DBFormatter.format(self, results)
-
         jobs = []
-        for result in results:
-            jobs.append({"id": result[0], "fwjr_path": result[1]})
+        for row in rows:
+            jobs.append({"id": row.id, "fwjr_path": row.fwjr_path})
 
         return jobs
 
     def execute(self, state, conn = None, transaction = False):
-        result = self.dbi.processData(self.sql, {"state": state}, conn = conn,
-                                      transaction = transaction)
+        rows = self.iterQuery(self.sql, {"state": state}, conn = conn,
+                              transaction = transaction)
 
-        return self.format(result)
+        return self.format(rows)
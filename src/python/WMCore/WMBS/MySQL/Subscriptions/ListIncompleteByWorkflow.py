@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+"""
+_ListIncompleteByWorkflow_
+
+MySQL implementation of Subscription.ListIncompleteByWorkflow
+"""
+
+from WMCore.Database.DBFormatter import DBFormatter
+
+class ListIncompleteByWorkflow(DBFormatter):
+    """
+    Same subscriptions as ListIncomplete, grouped by their workflow
+    """
+    sql = """SELECT DISTINCT wmbs_sub_files_available.subscription AS id,
+                             wmbs_subscription.workflow AS workflow
+               FROM wmbs_sub_files_available
+               INNER JOIN wmbs_subscription ON
+                 wmbs_subscription.id = wmbs_sub_files_available.subscription"""
+
+    def format(self, result):
+        results = DBFormatter.format(self, result)
+
+        subIDs = {}
+        for row in results:
+            subIDs.setdefault(row[1], []).append(row[0])
+
+        return subIDs
+
+    def execute(self, conn = None, transaction = False):
+        result = self.dbi.processData(self.sql, conn = conn, transaction = transaction)
+        return self.format(result)
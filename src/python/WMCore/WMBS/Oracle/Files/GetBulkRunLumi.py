@@ -10,4 +10,4 @@ from WMCore.WMBS.MySQL.Files.GetBulkRunLumi import GetBulkRunLumi as MySQLGetBul
 class GetBulkRunLumi(MySQLGetBulkRunLumi):
     sql = """SELECT flr.run AS run, flr.lumi AS lumi, flr.fileid AS id
                FROM wmbs_file_runlumi_map flr
-               WHERE flr.fileid = :id"""
+               WHERE flr.fileid IN (:id)"""
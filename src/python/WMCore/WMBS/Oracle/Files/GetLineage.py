@@ -0,0 +1,31 @@
+#!/usr/bin/env python
+"""
+_GetLineage_
+
+Oracle implementation of Files.GetLineage
+
+The whole lineage is walked in a single hierarchical query.
+"""
+
+from WMCore.WMBS.MySQL.Files.GetLineage import GetLineage as MySQLGetLineage
+
+
+class GetLineage(MySQLGetLineage):
+    parentSQL = """SELECT DISTINCT child AS id, parent AS relative FROM wmbs_file_parent
+                     START WITH child IN (:id)
+                     CONNECT BY NOCYCLE PRIOR parent = child AND LEVEL <= :maxlevel"""
+
+    childSQL = """SELECT DISTINCT parent AS id, child AS relative FROM wmbs_file_parent
+                    START WITH parent IN (:id)
+                    CONNECT BY NOCYCLE PRIOR child = parent AND LEVEL <= :maxlevel"""
+
+    def execute(self, fileIDs=None, level=1, ancestors=True,
+                conn=None, transaction=False):
+        fileIDs = self.dbi.makelist(fileIDs)
+        if not fileIDs or level < 1:
+            return {}
+
+        sql = self.parentSQL if ancestors else self.childSQL
+        result = self.dbi.processBulkSelect(sql, 'id', fileIDs, binds={'maxlevel': level},
+                                            conn=conn, transaction=transaction)
+        return self.format(result)
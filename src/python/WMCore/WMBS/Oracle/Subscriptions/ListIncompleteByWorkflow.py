@@ -0,0 +1,11 @@
+#!/usr/bin/env python
+"""
+_ListIncompleteByWorkflow_
+
+Oracle implementation of Subscription.ListIncompleteByWorkflow
+"""
+
+from WMCore.WMBS.MySQL.Subscriptions.ListIncompleteByWorkflow import ListIncompleteByWorkflow as ListIncompleteByWorkflowMySQL
+
+class ListIncompleteByWorkflow(ListIncompleteByWorkflowMySQL):
+    pass
@@ -14,6 +14,7 @@ import logging
 from collections import Counter
 
 from WMCore.DataStructs.Fileset import Fileset as WMFileset
+from WMCore.DataStructs.Run import Run
 from WMCore.DataStructs.Subscription import Subscription as WMSubscription
 from WMCore.Services.UUIDLib import makeUUID
 from WMCore.WMBS.File import File
@@ -170,12 +171,14 @@ class Subscription(WMBSBase, WMSubscription):
         self.commitTransaction(existingTransaction)
         return result
 
-    def filesOfStatus(self, status, loadChecksums=True, doingJobSplitting=False):
+    def filesOfStatus(self, status, loadChecksums=True, doingJobSplitting=False,
+                      loadRunLumi=False):
         """
         _filesOfStatus_
 
         Return a Set of File objects that have the given status with respect
-        to this subscription.
+        to this subscription. File details, checksums and run/lumis (if
+        loadRunLumi is True) are loaded for all the files at once.
         """
         existingTransaction = self.beginTransaction()
 
@@ -184,22 +187,39 @@ class Subscription(WMBSBase, WMSubscription):
         action = self.daofactory(classname="Subscriptions.Get%sFiles" % status)
         fileList = action.execute(self["id"], conn=self.getDBConn(),
                                   transaction=self.existingTransaction())
+        fileIDs = [x["file"] for x in fileList]
 
         if doingJobSplitting:
             fileInfoAct = self.daofactory(classname="Files.GetForJobSplittingByID")
         else:
             fileInfoAct = self.daofactory(classname="Files.GetByID")
 
-        fileInfoDict = fileInfoAct.execute(file=[x["file"] for x in fileList],
+        fileInfoDict = fileInfoAct.execute(file=fileIDs,
                                            conn=self.getDBConn(),
                                            transaction=self.existingTransaction())
 
+        checksumDict = {}
+        if loadChecksums and fileIDs:
+            checksumAct = self.daofactory(classname="Files.GetBulkChecksum")
+            checksumDict = checksumAct.execute(fileIDs=fileIDs,
+                                               conn=self.getDBConn(),
+                                               transaction=self.existingTransaction())
+
+        runLumiDict = {}
+        if loadRunLumi and fileIDs:
+            runLumiAct = self.daofactory(classname="Files.GetBulkRunLumi")
+            runLumiDict = runLumiAct.execute(files=[{'id': x} for x in fileIDs],
+                                             conn=self.getDBConn(),
+                                             transaction=self.existingTransaction())
+
         # Run through all files
         for f in fileList:
             fl = File(id=f['file'])
-            if loadChecksums:
-                fl.loadChecksum()
+            if f['file'] in checksumDict:
+                fl['checksums'] = checksumDict[f['file']]
             fl.update(fileInfoDict[f['file']])
+            for run, lumis in runLumiDict.get(f['file'], {}).items():
+                fl.addRun(Run(run, *lumis))
             if 'locations' in f.keys():
                 fl.setLocation(f['locations'], immediateSave=False)
             files.add(fl)
@@ -609,9 +629,10 @@ class Subscription(WMBSBase, WMSubscription):
         for job in jobList:
             job['id'] = result[job['name']]
             fileDict[job['id']] = []
+            jobMask = job['mask'].compile()
             for f in job['input_files']:
                 fileDict[job['id']].append(f['id'])
-                fileMask = job['mask'].filterRunLumisByMask(runs=f['runs'])
+                fileMask = jobMask.filterRuns(runs=f['runs'])
                 for runObj in fileMask:
                     run = runObj.run
                     lumis = runObj.lumis
@@ -46,7 +46,7 @@ class WMConnectionBase:
                                      logger = self.logger,
                                      dbinterface = self.dbi)
 
-        if "transaction" not in dir(myThread):
+        if not hasattr(myThread, "transaction"):
             myThread.transaction = Transaction(self.dbi)
 
         return
@@ -64,7 +64,7 @@ class WMConnectionBase:
         """
         myThread = threading.currentThread()
 
-        if "transaction" not in dir(myThread):
+        if not hasattr(myThread, "transaction"):
             return None
 
         return myThread.transaction.conn
@@ -77,7 +77,7 @@ class WMConnectionBase:
         """
         myThread = threading.currentThread()
 
-        if "transaction" not in dir(myThread):
+        if not hasattr(myThread, "transaction"):
             myThread.transaction = Transaction(self.dbi)
             return False
 
@@ -95,7 +95,7 @@ class WMConnectionBase:
         """
         myThread = threading.currentThread()
 
-        if "transaction" not in dir(myThread):
+        if not hasattr(myThread, "transaction"):
             return False
         elif myThread.transaction.transaction != None:
             return True
@@ -6,7 +6,6 @@ Create a CMSSW PSet suitable for running a WMAgent job.
 """
 from __future__ import print_function
 
-import json
 import logging
 import os
 import pickle
@@ -20,6 +19,7 @@ from PSetTweaks.WMTweak import applyTweak, makeJobTweak, makeOutputTweak, makeTa
 from WMCore.Storage.SiteLocalConfig import loadSiteLocalConfig
 from WMCore.Storage.TrivialFileCatalog import TrivialFileCatalog
 from WMCore.WMRuntime.ScriptInterface import ScriptInterface
+from WMCore.WMRuntime.Tools.PileupConfig import PileupConfig
 from WMCore.WMRuntime.Tools.Scram import isCMSSWSupported
 
 
@@ -383,8 +383,19 @@ class SetupCMSSWPset(ScriptInterface):
         PhEDExNodeName = siteConfig.localStageOut["phedex-node"]
         self.logger.info("Running on site '%s', local PNN: '%s'", siteConfig.siteName, PhEDExNodeName)
 
-        pileupDict = self._getPileupConfigFromJson()
+        # only the index of the configuration is loaded here, the file
+        # lists of the blocks are read as they get added to the modules
+        with self._openPileupConfig() as pileupConfig:
+            self._handlePileupConfig(pileupConfig, PhEDExNodeName)
 
+        return
+
+    def _handlePileupConfig(self, pileupConfig, PhEDExNodeName):
+        """
+        _handlePileupConfig_
+
+        Add the pileup files to the mixing modules.
+        """
         # 2011-02-03 according to the most recent version of instructions, we do
         # want to differentiate between "MixingModule" and "DataMixingModule"
         mixModules, dataMixModules = self._getPileupMixingModules()
@@ -400,12 +411,12 @@ class SetupCMSSWPset(ScriptInterface):
 
         # if the user in the configuration specifies different pileup types
         # than "data" or "mc", the following call will not modify anything
-        self._processPileupMixingModules(pileupDict, PhEDExNodeName, dataMixModules, "data")
-        self._processPileupMixingModules(pileupDict, PhEDExNodeName, mixModules, "mc")
+        self._processPileupMixingModules(pileupConfig, PhEDExNodeName, dataMixModules, "data")
+        self._processPileupMixingModules(pileupConfig, PhEDExNodeName, mixModules, "mc")
 
         return
 
-    def _processPileupMixingModules(self, pileupDict, PhEDExNodeName,
+    def _processPileupMixingModules(self, pileupConfig, PhEDExNodeName,
                                     modules, requestedPileupType):
         """
         Iterates over all modules and over all pileup configuration types.
@@ -421,7 +432,8 @@ class SetupCMSSWPset(ScriptInterface):
         particular PNN. However, all files belonging into a block will be
         present when reported by DBS.
 
-        The structure of the pileupDict: PileupFetcher._queryDbsAndGetPileupConfig
+        pileupConfig is a WMCore.WMRuntime.Tools.PileupConfig.PileupConfig,
+        only the file lists of the blocks used are read from it.
 
         2011-02-03:
         According to the current implementation of helper testing module
@@ -445,13 +457,13 @@ class SetupCMSSWPset(ScriptInterface):
                     eventsAvailable = 0
                     useAAA = True if getattr(self.jobBag, 'trustPUSitelists', False) else False
                     self.logger.info("Pileup set to read data remotely: %s", useAAA)
-                    for blockName in sorted(pileupDict[pileupType].keys()):
-                        blockDict = pileupDict[pileupType][blockName]
-                        if PhEDExNodeName in blockDict["PhEDExNodeNames"] or useAAA:
-                            eventsAvailable += int(blockDict.get('NumberOfEvents', 0))
-                            for fileLFN in blockDict["FileList"]:
-                                # vstring does not support unicode
-                                inputTypeAttrib.fileNames.append(str(fileLFN['logical_file_name']))
+                    blockNames = pileupConfig.blockNames(pileupType, None if useAAA else PhEDExNodeName)
+                    for blockName in blockNames:
+                        blockDict = pileupConfig.blockInfo(pileupType, blockName)
+                        eventsAvailable += int(blockDict.get('NumberOfEvents', 0))
+                        for fileLFN in pileupConfig.blockFiles(pileupType, blockName):
+                            # vstring does not support unicode
+                            inputTypeAttrib.fileNames.append(str(fileLFN))
                     if requestedPileupType == 'data':
                         if getattr(self.jobBag, 'skipPileupEvents', None) is not None:
                             # For deterministic pileup, we want to shuffle the list the
@@ -488,12 +500,12 @@ class SetupCMSSWPset(ScriptInterface):
                 dataMixModules.append(value)
         return mixModules, dataMixModules
 
-    def _getPileupConfigFromJson(self):
+    def _openPileupConfig(self):
         """
-        There has been stored pileup configuration stored in a JSON file
+        There has been stored pileup configuration stored in a file
         as a result of DBS querrying when running PileupFetcher,
-        this method loads this configuration from sandbox and returns it
-        as dictionary.
+        this method opens this configuration from sandbox and returns
+        a PileupConfig reader for it.
 
         The PileupFetcher was called by WorkQueue which creates job's sandbox
         and sandbox gets migrated to the worker node.
@@ -503,12 +515,10 @@ class SetupCMSSWPset(ScriptInterface):
         jsonPileupConfig = os.path.join(workingDir, "pileupconf.json")
         self.logger.info("Pileup JSON configuration file: '%s'", jsonPileupConfig)
         try:
-            with open(jsonPileupConfig) as jdata:
-                pileupDict = json.load(jdata)
+            return PileupConfig(jsonPileupConfig)
         except IOError:
             m = "Could not read pileup JSON configuration file: '%s'" % jsonPileupConfig
             raise RuntimeError(m)
-        return pileupDict
 
     def handleProducersNumberOfEvents(self):
         """
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+"""
+_PileupConfig_
+
+Compact, indexed format of the pileup configuration (pileupconf.json)
+written by the PileupFetcher and read on the worker node by SetupCMSSWPset,
+an indexed container (see Utils.IndexedContainer):
+
+  WMPILEUP <version> <index length>\\n
+  <JSON index>
+  <JSON file list of every block>
+
+The index holds, for every pileup type, the number of events, PNNs and
+the position of the file list of every block, together with the blocks
+available at every PNN. The file lists are sorted and prefix compressed:
+every LFN is stored as [length of the prefix shared with the previous LFN,
+rest of the LFN]. Readers only load the index and the file lists of the
+blocks they ask for.
+
+Configuration files written in the former format, a single JSON document
+{"pileupType": {"BlockA": {"FileList": [{"logical_file_name": lfn}, ...],
+"NumberOfEvents": N, "PhEDExNodeNames": [pnn, ...]}, ...}}, can be read
+through the same interface.
+"""
+
+import json
+
+from Utils.IndexedContainer import readHeader, writeContainer
+
+MAGIC = "WMPILEUP"
+FORMAT_VERSION = 1
+
+
+def compressLFNs(lfns):
+    """
+    _compressLFNs_
+
+    Sort the LFNs and prefix compress them
+    """
+    result = []
+    previous = ""
+    for lfn in sorted(lfns):
+        prefix = 0
+        maxPrefix = min(len(lfn), len(previous))
+        while prefix < maxPrefix and lfn[prefix] == previous[prefix]:
+            prefix += 1
+        result.append([prefix, lfn[prefix:]])
+        previous = lfn
+    return result
+
+
+def expandLFNs(entries):
+    """
+    _expandLFNs_
+
+    Generator over the LFNs of a prefix compressed list
+    """
+    previous = ""
+    for prefix, rest in entries:
+        previous = previous[:prefix] + rest
+        yield previous
+
+
+def writePileupConfig(filename, pileupDict):
+    """
+    _writePileupConfig_
+
+    Write the pileup configuration, in the structure returned by
+    PileupFetcher._queryDbsAndGetPileupConfig, in the compact format.
+    The file is replaced atomically.
+    """
+    index = {}
+    blobs = []
+    offset = 0
+    for pileupType in sorted(pileupDict):
+        blocks = {}
+        pnns = {}
+        for blockName in sorted(pileupDict[pileupType]):
+            blockDict = pileupDict[pileupType][blockName]
+            lfns = [fileInfo['logical_file_name'] for fileInfo in blockDict['FileList']]
+            blob = json.dumps(compressLFNs(lfns), separators=(',', ':')).encode("utf-8")
+            blocks[blockName] = {'offset': offset, 'length': len(blob),
+                                 'NumberOfEvents': blockDict.get('NumberOfEvents', 0),
+                                 'PhEDExNodeNames': sorted(blockDict['PhEDExNodeNames'])}
+            for pnn in blockDict['PhEDExNodeNames']:
+                pnns.setdefault(pnn, []).append(blockName)
+            blobs.append(blob)
+            offset += len(blob)
+        index[pileupType] = {'blocks': blocks, 'pnns': pnns}
+
+    writeContainer(filename, MAGIC, FORMAT_VERSION, index, blobs)
+    return
+
+
+class PileupConfig(object):
+    """
+    _PileupConfig_
+
+    Read access to a pileup configuration file, in the compact or in
+    the former JSON format
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._handle = open(filename, 'rb')
+        self._legacy = None
+
+        if self._handle.read(len(MAGIC)) != MAGIC.encode("ascii"):
+            # former format, the whole document has to be loaded
+            self._handle.seek(0)
+            self._legacy = json.loads(self._handle.read().decode("utf-8"))
+            self.close()
+            return
+
+        self._handle.seek(0)
+        try:
+            _, self._index, self._dataStart = readHeader(self._handle, MAGIC, FORMAT_VERSION)
+        except ValueError as ex:
+            self.close()
+            raise RuntimeError("%s in %s" % (str(ex), filename))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def pileupTypes(self):
+        """
+        _pileupTypes_
+
+        Pileup types in the configuration
+        """
+        if self._legacy is not None:
+            return list(self._legacy)
+        return list(self._index)
+
+    def blockNames(self, pileupType, pnn=None):
+        """
+        _blockNames_
+
+        Sorted names of the blocks of a pileup type, only the ones
+        available at the given PNN if pnn is not None
+        """
+        if self._legacy is not None:
+            blocks = self._legacy.get(pileupType, {})
+            return sorted(blockName for blockName, blockDict in blocks.items()
+                          if pnn is None or pnn in blockDict['PhEDExNodeNames'])
+
+        typeIndex = self._index.get(pileupType, {'blocks': {}, 'pnns': {}})
+        if pnn is None:
+            return sorted(typeIndex['blocks'])
+        return sorted(typeIndex['pnns'].get(pnn, []))
+
+    def blockInfo(self, pileupType, blockName):
+        """
+        _blockInfo_
+
+        Number of events and PNNs of a block
+        """
+        if self._legacy is not None:
+            blockDict = self._legacy[pileupType][blockName]
+        else:
+            blockDict = self._index[pileupType]['blocks'][blockName]
+        return {'NumberOfEvents': blockDict.get('NumberOfEvents', 0),
+                'PhEDExNodeNames': blockDict['PhEDExNodeNames']}
+
+    def blockFiles(self, pileupType, blockName):
+        """
+        _blockFiles_
+
+        Generator over the LFNs of a block, only the file list
+        of this block is read from the configuration file
+        """
+        if self._legacy is not None:
+            for fileInfo in self._legacy[pileupType][blockName]['FileList']:
+                yield fileInfo['logical_file_name']
+            return
+
+        blockIndex = self._index[pileupType]['blocks'][blockName]
+        self._handle.seek(self._dataStart + blockIndex['offset'])
+        entries = json.loads(self._handle.read(blockIndex['length']).decode("utf-8"))
+        for lfn in expandLFNs(entries):
+            yield lfn
+
+    def getPileupDict(self, pnn=None):
+        """
+        _getPileupDict_
+
+        Configuration in the structure returned by
+        PileupFetcher._queryDbsAndGetPileupConfig, with only the
+        blocks available at the given PNN if pnn is not None
+        """
+        pileupDict = {}
+        for pileupType in self.pileupTypes():
+            pileupDict[pileupType] = {}
+            for blockName in self.blockNames(pileupType, pnn):
+                blockDict = self.blockInfo(pileupType, blockName)
+                blockDict['FileList'] = [{'logical_file_name': lfn} for lfn in
+                                         self.blockFiles(pileupType, blockName)]
+                pileupDict[pileupType][blockName] = blockDict
+        return pileupDict
+
+    def close(self):
+        """
+        _close_
+
+        Close the configuration file
+        """
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
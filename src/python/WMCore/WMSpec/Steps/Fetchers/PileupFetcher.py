@@ -10,11 +10,11 @@ import os
 import shutil
 import time
 import logging
-from json import JSONEncoder
 
 import WMCore.WMSpec.WMStep as WMStep
 from WMCore.Services.DBS.DBSReader import DBSReader
 from WMCore.Services.PhEDEx.PhEDEx import PhEDEx
+from WMCore.WMRuntime.Tools.PileupConfig import writePileupConfig
 from WMCore.WMSpec.Steps.Fetchers.FetcherInterface import FetcherInterface
 
 
@@ -100,15 +100,14 @@ class PileupFetcher(FetcherInterface):
 
         return fileName
 
-    def _writeFile(self, filePath, jsonPU):
+    def _writeFile(self, filePath, configDict):
 
         directory = filePath.rsplit('/', 1)[0]
 
         if not os.path.exists(directory):
             os.mkdir(directory)
         try:
-            with open(filePath, 'w') as f:
-                f.write(jsonPU)
+            writePileupConfig(filePath, configDict)
         except IOError:
             m = "Could not save pileup JSON configuration file: '%s'" % filePath
             raise RuntimeError(m)
@@ -155,17 +154,18 @@ class PileupFetcher(FetcherInterface):
         else:
             return False
 
-    def _saveFile(self, stepHelper, jsonPU):
+    def _saveFile(self, stepHelper, configDict):
 
         cacheFile = self._getCacheFilePath(stepHelper)
-        self._writeFile(cacheFile, jsonPU)
+        self._writeFile(cacheFile, configDict)
         fileName = self._getStepFilePath(stepHelper)
         self._copyFile(cacheFile, fileName)
 
     def _createPileupConfigFile(self, helper):
         """
-        Stores pileup JSON configuration file in the working
-        directory / sandbox.
+        Stores pileup configuration file in the working
+        directory / sandbox, in the compact format of
+        WMCore.WMRuntime.Tools.PileupConfig.
 
         """
         if self._isCacheValid(helper):
@@ -173,7 +173,6 @@ class PileupFetcher(FetcherInterface):
             # just return
             return
 
-        encoder = JSONEncoder()
         # this should have been set in CMSSWStepHelper along with
         # the pileup configuration
         url = helper.data.dbsUrl
@@ -181,9 +180,8 @@ class PileupFetcher(FetcherInterface):
 
         configDict = self._queryDbsAndGetPileupConfig(helper, dbsReader)
 
-        # create JSON and save into a file
-        jsonPU = encoder.encode(configDict)
-        self._saveFile(helper, jsonPU)
+        # save the indexed configuration into a file
+        self._saveFile(helper, configDict)
 
     def __call__(self, wmTask):
         """
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+"""
+_WMWorkloadCache_
+
+Process wide cache of the workload specs loaded from local files.
+
+The agent components load the same spec files again and again (for every
+subscription, every polling cycle); the cache keeps the last maxEntries
+unpickled workloads, keyed by path and validated against the file mtime and
+size, so a spec is only unpickled again when it's rewritten on disk.
+
+The cached workloads are shared: the helpers returned by getWorkload must be
+treated as read-only, ask for a copy to get a workload that can be modified.
+"""
+
+from __future__ import division
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+
+from WMCore.WMSpec.WMWorkload import WMWorkload, WMWorkloadHelper
+
+
+class WMWorkloadCache(object):
+    """
+    _WMWorkloadCache_
+
+    LRU cache of WMWorkload objects loaded from local spec files
+    """
+
+    def __init__(self, maxEntries=50):
+        self.maxEntries = maxEntries
+        self._entries = OrderedDict()  # path -> (mtime, size, WMWorkload), least recently used first
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidated': 0, 'evicted': 0}
+
+    def getWorkload(self, specPath, copy=False):
+        """
+        _getWorkload_
+
+        Return a WMWorkloadHelper for the spec file, loading it only if it's
+        not in the cache or if the file changed since it was loaded.
+        Specs not in a local file (e.g. in couch) are not cached.
+        If copy is set, the helper has its own copy of the workload.
+        """
+        if specPath.startswith('file:'):
+            specPath = specPath[len('file:'):]
+        try:
+            fileStat = os.stat(specPath)
+        except (OSError, TypeError):
+            return self._loadWorkload(specPath)
+        mtime, size = fileStat.st_mtime, fileStat.st_size
+
+        with self._lock:
+            entry = self._entries.get(specPath)
+            if entry is not None:
+                if entry[0] == mtime and entry[1] == size:
+                    self._entries.pop(specPath)
+                    self._entries[specPath] = entry
+                    self.stats['hits'] += 1
+                    return self._helper(entry[2], copy)
+                del self._entries[specPath]
+                self.stats['invalidated'] += 1
+            self.stats['misses'] += 1
+
+        # unpickle outside of the lock, other threads can still get their hits
+        helper = self._loadWorkload(specPath)
+        with self._lock:
+            self._entries.pop(specPath, None)
+            self._entries[specPath] = (mtime, size, helper.data)
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+                self.stats['evicted'] += 1
+        return self._helper(helper.data, copy)
+
+    def _loadWorkload(self, specPath):
+        helper = WMWorkloadHelper(WMWorkload("workload"))
+        helper.load(specPath)
+        return helper
+
+    def _helper(self, workload, copyWorkload):
+        if copyWorkload:
+            workload = copy.deepcopy(workload)
+        return WMWorkloadHelper(workload)
+
+    def remove(self, specPath):
+        """
+        _remove_
+
+        Drop a spec from the cache
+        """
+        with self._lock:
+            self._entries.pop(specPath, None)
+
+    def clear(self):
+        """
+        _clear_
+
+        Drop all the cached specs and reset the stats
+        """
+        with self._lock:
+            self._entries.clear()
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def getStats(self):
+        """
+        _getStats_
+
+        Return the cache counters and the number of cached specs
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hitRatio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+_workloadCache = WMWorkloadCache()
+
+
+def getWorkload(specPath, copy=False):
+    """
+    _getWorkload_
+
+    Load a spec through the process wide cache, see WMWorkloadCache.getWorkload
+    """
+    return _workloadCache.getWorkload(specPath, copy=copy)
+
+
+def getWorkloadCache():
+    """
+    _getWorkloadCache_
+
+    Return the process wide WMWorkloadCache instance
+    """
+    return _workloadCache
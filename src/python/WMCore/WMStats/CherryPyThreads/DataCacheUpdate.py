@@ -11,25 +11,39 @@ class DataCacheUpdate(CherryPyPeriodicTask):
 
     def __init__(self, rest, config):
 
+        # request db update sequence of the last full or incremental update
+        self.lastUpdateSeq = None
         super(DataCacheUpdate, self).__init__(config)
 
     def setConcurrentTasks(self, config):
         """
         sets the list of functions which
         """
-        self.concurrentTasks = [{'func': self.gatherActiveDataStats, 'duration': 300}]
+        duration = getattr(config, 'dataCacheUpdateDuration', 60)
+        self.concurrentTasks = [{'func': self.gatherActiveDataStats, 'duration': duration}]
 
     def gatherActiveDataStats(self, config):
         """
-        gather active data statistics
+        gather active data statistics: reload all the active data when the
+        cache expires, in between only the requests changed since the last
+        update according to the request db changes feed.
         """
         try:
-            if DataCache.islatestJobDataExpired():
-                wmstatsDB = WMStatsReader(config.wmstats_url, reqdbURL=config.reqmgrdb_url,
-                                          reqdbCouchApp="ReqMgr")
+            wmstatsDB = WMStatsReader(config.wmstats_url, reqdbURL=config.reqmgrdb_url,
+                                      reqdbCouchApp="ReqMgr")
+            if DataCache.islatestJobDataExpired() or self.lastUpdateSeq is None:
+                # get the sequence first, changes made during the reload are applied again later
+                updateSeq = wmstatsDB.getRequestDBUpdateSeq()
                 jobData = wmstatsDB.getActiveData(jobInfoFlag = True)
                 DataCache.setlatestJobData(jobData)
+                self.lastUpdateSeq = updateSeq
                 self.logger.info("DataCache is updated: %s", len(jobData))
+            else:
+                updateSeq, changedData, removed = wmstatsDB.getActiveDataChanges(self.lastUpdateSeq)
+                DataCache.updateRequests(changedData, removed)
+                self.lastUpdateSeq = updateSeq
+                self.logger.info("DataCache is updated incrementally: %s changed, %s removed",
+                                 len(changedData), len(removed))
         except Exception as ex:
             self.logger.error(str(ex))
         return
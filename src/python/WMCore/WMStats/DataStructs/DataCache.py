@@ -1,12 +1,20 @@
 import time
 from WMCore.ReqMgr.DataStructs.Request import RequestInfo, protectedLFNs
 
+# request properties with a secondary index, to get the requests matching a filter without
+# checking every request
+INDEXED_KEYS = ["RequestStatus", "RequestType", "Campaign", "Team", "Teams", "PrepID",
+                "Requestor", "Group", "SubRequestType", "CMSSWVersion", "ScramArch"]
+
+
 class DataCache(object):
     # TODO: need to change to  store in  db instead of storing in the memory
     # When mulitple server run for load balancing it could have different result
     # from each server.
     _duration = 300  # 5 minitues
     _lastedActiveDataFromAgent = {}
+    # RequestInfo objects and secondary indexes of the data above, built when it's first queried
+    _index = {}
 
     @staticmethod
     def getDuration():
@@ -28,6 +36,96 @@ class DataCache(object):
         DataCache._lastedActiveDataFromAgent["time"] = int(time.time())
         DataCache._lastedActiveDataFromAgent["data"] = jobData
 
+    @staticmethod
+    def updateRequests(changedData, removedRequests=None):
+        """
+        Update the cached data incrementally between full reloads: add or replace the
+        requests in changedData, a dict of request name to request data, and remove the
+        requests in removedRequests. The data is not modified in place, so that queries
+        in progress keep going over a consistent copy, and the expire time is unchanged.
+        """
+        if not DataCache._lastedActiveDataFromAgent:
+            return
+        newData = dict(DataCache._lastedActiveDataFromAgent["data"])
+        for requestName in removedRequests or []:
+            newData.pop(requestName, None)
+        newData.update(changedData)
+        DataCache._lastedActiveDataFromAgent["data"] = newData
+
+    @staticmethod
+    def _getIndex():
+        """
+        Return the RequestInfo objects and the secondary indexes of the cached data,
+        building them if the data changed since they were built. RequestInfo objects
+        of requests which didn't change are reused.
+        """
+        reqData = DataCache.getlatestJobData()
+        index = DataCache._index
+        if index.get("data") is reqData:
+            return index
+
+        oldInfo = index.get("info", {})
+        reqInfos = {}
+        keyIndex = dict((key, {}) for key in INDEXED_KEYS)
+        # requests with values which can't be indexed, always checked
+        unindexed = dict((key, set()) for key in INDEXED_KEYS)
+        for requestName, reqDict in reqData.iteritems():
+            reqInfo = oldInfo.get(requestName)
+            if reqInfo is None or reqInfo.data is not reqDict:
+                reqInfo = RequestInfo(reqDict)
+            reqInfos[requestName] = reqInfo
+            for key in INDEXED_KEYS:
+                try:
+                    reqValue = reqInfo.get(key)
+                except TypeError:
+                    # i.e. list values in Task/Step level
+                    unindexed[key].add(requestName)
+                    continue
+                if reqValue is None:
+                    continue
+                if not isinstance(reqValue, list):
+                    reqValue = [reqValue]
+                for value in reqValue:
+                    try:
+                        keyIndex[key].setdefault(value, set()).add(requestName)
+                    except TypeError:
+                        unindexed[key].add(requestName)
+
+        index = {"data": reqData, "info": reqInfos, "keys": keyIndex, "unindexed": unindexed}
+        DataCache._index = index
+        return index
+
+    @staticmethod
+    def _getCandidates(index, filterDict):
+        """
+        Return the names of the requests which can match filterDict according to the
+        secondary indexes, all the requests if none of the filter keys is indexed.
+        The candidates still need to be checked with RequestInfo.andFilterCheck.
+        """
+        candidates = None
+        for key, value in filterDict.iteritems():
+            if key not in index["keys"] or isinstance(value, dict):
+                continue
+            # same value conversion as in RequestInfo.andFilterCheck
+            if value in ["false", "False", "FALSE"]:
+                value = False
+            elif value in ["true", "True", "TRUE"]:
+                value = True
+            if not isinstance(value, list):
+                value = [value]
+
+            matched = set(index["unindexed"][key])
+            try:
+                for item in value:
+                    matched.update(index["keys"][key].get(item, ()))
+            except TypeError:
+                continue
+            candidates = matched if candidates is None else candidates & matched
+
+        if candidates is None:
+            return index["info"].keys()
+        return candidates
+
     @staticmethod
     def islatestJobDataExpired():
         if not DataCache._lastedActiveDataFromAgent:
@@ -39,10 +137,10 @@ class DataCache(object):
 
     @staticmethod
     def filterData(filterDict, maskList):
-        reqData = DataCache.getlatestJobData()
+        index = DataCache._getIndex()
 
-        for _, reqInfo in reqData.iteritems():
-            reqData = RequestInfo(reqInfo)
+        for requestName in DataCache._getCandidates(index, filterDict):
+            reqData = index["info"][requestName]
             if reqData.andFilterCheck(filterDict):
                 for prop in maskList:
                     result = reqData.get(prop, [])
@@ -55,7 +153,7 @@ class DataCache(object):
 
     @staticmethod
     def filterDataByRequest(filterDict, maskList=None):
-        reqData = DataCache.getlatestJobData()
+        index = DataCache._getIndex()
 
         if maskList is not None:
             if isinstance(maskList, basestring):
@@ -63,12 +161,12 @@ class DataCache(object):
             if "RequestName" not in maskList:
                 maskList.append("RequestName")
 
-        for _, reqDict in reqData.iteritems():
-            reqInfo = RequestInfo(reqDict)
+        for requestName in DataCache._getCandidates(index, filterDict):
+            reqInfo = index["info"][requestName]
             if reqInfo.andFilterCheck(filterDict):
 
                 if maskList is None:
-                    yield reqDict
+                    yield reqInfo.data
                 else:
                     resultItem = {}
                     for prop in maskList:
@@ -36,7 +36,7 @@ class RestApiHub(RESTApi):
         cherrypy.log("WMStats entire configuration:\n%s" % Configuration.getInstance())
         cherrypy.log("WMStats REST hub configuration subset:\n%s" % config)
         # only allows json format for return value
-        self.formats = [('application/json', JSONFormat())]
+        self.formats = [('application/json', JSONFormat(self.format_chunk))]
         self._add({"info": ServerInfo(app, self, config, mount),
                    "teams": TeamInfo(app, self, config, mount),
                    "request": RequestInfo(app, self, config, mount),
@@ -30,7 +30,7 @@ class T0RestApiHub(RESTApi):
         cherrypy.log("T0WMStats entire configuration:\n%s" % Configuration.getInstance())
         cherrypy.log("T0WMStats REST hub configuration subset:\n%s" % config)
         # only allows json format for return value
-        self.formats =  [('application/json', JSONFormat())]
+        self.formats = [('application/json', JSONFormat(self.format_chunk))]
         self._add({"info": ServerInfo(app, self, config, mount),
                    "requestcache": ActiveRequestJobInfo(app, self, config, mount),
                    "jobdetail": JobDetailInfo(app, self, config, mount, t0flag=True),
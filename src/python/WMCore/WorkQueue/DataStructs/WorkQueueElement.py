@@ -267,3 +267,29 @@ class WorkQueueElement(dict):
                     return False
 
         return True
+
+    def sitesPassingRestrictions(self, sites):
+        """
+        _sitesPassingRestrictions_
+
+        Given a collection of site names, returns the set of those which pass
+        the site and data restrictions, same as checking each one of them with
+        passesSiteRestriction.
+        """
+        # Site list restrictions
+        passing = set(sites).intersection(self['SiteWhitelist']).difference(self['SiteBlacklist'])
+
+        # input data restrictions (TrustSitelists flag)
+        if self['NoInputUpdate'] is False:
+            for locations in self['Inputs'].values():
+                passing.intersection_update(locations)
+            if self['ParentFlag']:
+                for locations in self['ParentData'].values():
+                    passing.intersection_update(locations)
+
+        # pileup data restrictions (TrustPUSitelists flag)
+        if self['NoPileupUpdate'] is False:
+            for locations in self['PileupData'].values():
+                passing.intersection_update(locations)
+
+        return passing
@@ -5,6 +5,7 @@ WorkQueueBackend
 Interface to WorkQueue persistent storage
 """
 
+import bisect
 import json
 import random
 import time
@@ -33,6 +34,58 @@ def formatReply(answer, *items):
     return result, errors
 
 
+class SiteJobCounts(object):
+    """
+    Number of jobs by site and priority, answering how many jobs of at least
+    a given priority run at a site from cumulative sums over the priorities.
+    The siteJobCounts dictionary-of-dictionaries given is updated in place.
+    """
+
+    def __init__(self, siteJobCounts):
+        self.siteJobCounts = siteJobCounts
+        # site -> (ascending priorities, number of jobs with at least that priority)
+        self._cumulative = {}
+
+    def _getCumulative(self, site):
+        if site not in self._cumulative:
+            counts = self.siteJobCounts.get(site, {})
+            prios = sorted(counts)
+            sums = [0] * len(prios)
+            total = 0
+            for idx in range(len(prios) - 1, -1, -1):
+                total += counts[prios[idx]]
+                sums[idx] = total
+            self._cumulative[site] = (prios, sums)
+        return self._cumulative[site]
+
+    def jobsAtOrAbove(self, site, prio):
+        """
+        Number of jobs at the site with a priority greater or equal to prio
+        """
+        prios, sums = self._getCumulative(site)
+        idx = bisect.bisect_left(prios, prio)
+        return sums[idx] if idx < len(prios) else 0
+
+    def addJobs(self, site, prio, jobs):
+        """
+        Add jobs of the given priority to the site
+        """
+        counts = self.siteJobCounts.setdefault(site, {})
+        counts[prio] = counts.get(prio, 0) + jobs
+        if site not in self._cumulative:
+            return
+        prios, sums = self._cumulative[site]
+        idx = bisect.bisect_left(prios, prio)
+        if idx < len(prios) and prios[idx] == prio:
+            # only the sums for this and the lower priorities change
+            for lower in range(idx + 1):
+                sums[lower] += jobs
+        else:
+            # new priority, rebuild it when needed
+            del self._cumulative[site]
+        return
+
+
 class WorkQueueBackend(object):
     """
     Represents persistent storage for WorkQueue
@@ -384,36 +437,38 @@ class WorkQueueBackend(object):
         sortedElements.sort(key=lambda element: element['CreationTime'])
         sortedElements.sort(key=lambda x: x['Priority'], reverse=True)
 
+        # Elements come in decreasing priority order and the job counts only increase,
+        # so a site without free slots for an element has no free slots for the next ones.
+        jobCounts = SiteJobCounts(siteJobCounts)
+        openSites = set(thresholds)
         for element in sortedElements:
             if numElems <= 0:
                 self.logger.info("Reached the maximum number of elements to be pulled: %d", len(elements))
                 break
 
+            if not openSites:
+                self.logger.info("No free resources left at any site, stop looking for work")
+                break
+
             if not possibleSites(element):
                 self.logger.info("No possible sites for %s with doc id %s", element['RequestName'], element.id)
                 continue
 
             prio = element['Priority']
-            possibleSite = None
-            sites = thresholds.keys()
-            random.shuffle(sites)
-            for site in sites:
-                if element.passesSiteRestriction(site):
-                    # Count the number of jobs currently running of greater priority
-                    curJobCount = sum([x[1] if x[0] >= prio else 0 for x in siteJobCounts.get(site, {}).items()])
-                    self.logger.debug("Job Count: %s, site: %s thresholds: %s" % (curJobCount, site, thresholds[site]))
-                    if curJobCount < thresholds[site]:
-                        possibleSite = site
-                        break
-
-            if possibleSite:
+            freeSites = []
+            for site in element.sitesPassingRestrictions(openSites):
+                # Count the number of jobs currently running of greater priority
+                if jobCounts.jobsAtOrAbove(site, prio) < thresholds[site]:
+                    freeSites.append(site)
+                else:
+                    openSites.discard(site)
+
+            if freeSites:
+                possibleSite = random.choice(freeSites)
                 numElems -= 1
                 self.logger.debug("Possible site exists %s" % str(possibleSite))
                 elements.append(element)
-                if possibleSite not in siteJobCounts:
-                    siteJobCounts[possibleSite] = {}
-                siteJobCounts[possibleSite][prio] = siteJobCounts[possibleSite].setdefault(prio, 0) + \
-                                                    element['Jobs'] * element.get('blowupFactor', 1.0)
+                jobCounts.addJobs(possibleSite, prio, element['Jobs'] * element.get('blowupFactor', 1.0))
             else:
                 self.logger.debug("No available resources for %s with doc id %s", element['RequestName'], element.id)
 
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+_IndexedContainer_t_
+
+Unit tests for the indexed container file helpers
+"""
+from __future__ import division
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+
+from Utils.IndexedContainer import encodeHeader, readHeader, replaceFile, writeContainer
+
+
+class IndexedContainerTest(unittest.TestCase):
+    """
+    _IndexedContainerTest_
+
+    Write and read back indexed containers
+    """
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir, ignore_errors=True)
+
+    def testWriteRead(self):
+        """
+        _testWriteRead_
+
+        The index and the blobs are read back from a file or from memory
+        """
+        filename = os.path.join(self.testDir, "container")
+        index = {"a": [0, 3], "b": [3, 2]}
+        writeContainer(filename, "WMTEST", 2, index, [b"abc", b"de"])
+        self.assertEqual(os.listdir(self.testDir), ["container"])
+
+        with open(filename, "rb") as handle:
+            version, readIndex, dataStart = readHeader(handle, "WMTEST", 2)
+            self.assertEqual((version, readIndex), (2, index))
+            handle.seek(dataStart + 3)
+            self.assertEqual(handle.read(2), b"de")
+
+        content = encodeHeader("WMTEST", 1, index) + b"abcde"
+        version, readIndex, dataStart = readHeader(io.BytesIO(content), "WMTEST", 2)
+        self.assertEqual((version, readIndex, content[dataStart:]), (1, index, b"abcde"))
+        return
+
+    def testBadHeader(self):
+        """
+        _testBadHeader_
+
+        Malformed headers, other containers and newer versions are refused
+        """
+        content = encodeHeader("WMTEST", 3, {})
+        self.assertRaises(ValueError, readHeader, io.BytesIO(content), "WMTEST", 2)
+        self.assertRaises(ValueError, readHeader, io.BytesIO(content), "WMOTHER", 3)
+        self.assertRaises(ValueError, readHeader, io.BytesIO(b"WMTEST garbage\n{}"), "WMTEST", 3)
+        self.assertRaises(ValueError, readHeader, io.BytesIO(b""), "WMTEST", 3)
+        return
+
+    def testReplaceFile(self):
+        """
+        _testReplaceFile_
+
+        The file is replaced as a whole, without leaving temporary files
+        """
+        filename = os.path.join(self.testDir, "file")
+        replaceFile(filename, [b"first"])
+        replaceFile(filename, (chunk for chunk in [b"sec", b"ond"]))
+        with open(filename, "rb") as handle:
+            self.assertEqual(handle.read(), b"second")
+        self.assertEqual(os.listdir(self.testDir), ["file"])
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
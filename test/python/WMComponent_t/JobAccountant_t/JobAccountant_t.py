@@ -7,6 +7,7 @@ Unit tests for the WMAgent JobAccountant component.
 from __future__ import print_function
 
 import copy
+import multiprocessing
 import os.path
 import threading
 import time
@@ -17,7 +18,7 @@ from nose.plugins.attrib import attr
 import WMCore.WMBase
 from WMComponent.DBS3Buffer.DBSBufferDataset import DBSBufferDataset
 from WMComponent.DBS3Buffer.DBSBufferFile import DBSBufferFile
-from WMComponent.JobAccountant.AccountantWorker import AccountantWorker
+from WMComponent.JobAccountant.AccountantWorker import AccountantWorker, loadJobReport, prepareJobWorker
 from WMComponent.JobAccountant.JobAccountantPoller import JobAccountantPoller
 from WMCore.ACDC.DataCollectionService import DataCollectionService
 from WMCore.DAOFactory import DAOFactory
@@ -1312,6 +1313,76 @@ class JobAccountantTest(EmulatedUnitTestCase):
 
         return
 
+    @attr('performance', 'integration')
+    def testMultiProcessLoadTest(self):
+        """
+        _testMultiProcessLoadTest_
+
+        Run the load test loading the job reports in two processes, in
+        slices smaller than the number of jobs.
+        """
+        self.setupDBForLoadTest()
+
+        config = self.createConfig()
+        config.JobAccountant.accountantProcesses = 2
+        config.JobAccountant.accountantWorkSize = 30
+        accountant = JobAccountantPoller(config)
+        accountant.setup()
+
+        startTime = time.time()
+        accountant.algorithm()
+        endTime = time.time()
+        print("  Performance: %s fwjrs/sec" % (100 / (endTime - startTime)))
+        self.assertEqual(len(accountant.pool), 2)
+
+        for (jobID, fwjrPath) in self.jobs:
+            jobReport = Report()
+            jobReport.unpersist(fwjrPath)
+
+            self.verifyFileMetaData(jobID, jobReport.getAllFilesFromStep("cmsRun1"))
+            self.verifyJobSuccess(jobID)
+            self.verifyDBSBufferContents("Processing",
+                                         ["/some/lfn/for/job/%s" % jobID],
+                                         jobReport.getAllFilesFromStep("cmsRun1"))
+
+        accountant.close()
+        self.assertEqual(accountant.pool, [])
+        return
+
+    def testPrepareJobWorker(self):
+        """
+        _testPrepareJobWorker_
+
+        Jobs prepared in an accountant process come back with everything
+        the accountant and the state change need from their report, but
+        without the report itself.
+        """
+        jobReport = Report()
+        jobReport.unpersist(os.path.join(WMCore.WMBase.getTestBase(),
+                                         "WMComponent_t/JobAccountant_t/fwjrs/LoadTest00.pkl"))
+        fwjrPath = os.path.join(self.testDir, "Report.0.pkl")
+        jobReport.save(fwjrPath)
+
+        workInput = multiprocessing.Queue()
+        results = multiprocessing.Queue()
+        workInput.put({'id': 1, 'fwjr_path': fwjrPath})
+        workInput.put('STOP')
+        prepareJobWorker(workInput, results)
+        preparedJob = results.get(timeout=30)
+
+        self.assertEqual(sorted(preparedJob.keys()),
+                         ['allFiles', 'fwjr', 'fwjr_path', 'id', 'logArchFiles', 'skippedFiles',
+                          'steps', 'taskName', 'taskSuccessful'])
+        self.assertEqual([fwjrFile['lfn'] for fwjrFile in preparedJob['allFiles']],
+                         [fwjrFile['lfn'] for fwjrFile in jobReport.getAllFiles()])
+        self.assertEqual(preparedJob['steps'], jobReport.listSteps())
+        self.assertEqual(preparedJob['taskName'], jobReport.getTaskName())
+
+        self.assertTrue(isinstance(preparedJob['fwjr'], dict))
+        self.assertEqual(preparedJob['fwjr']['json'], loadJobReport(fwjrPath).__to_json__(None))
+        self.assertEqual(len(preparedJob['fwjr']['inputFiles']), len(jobReport.getAllInputFiles()))
+        return
+
     def testDBRollback(self):
         """
         _testDBRollback_
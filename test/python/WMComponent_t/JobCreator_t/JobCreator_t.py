@@ -8,7 +8,6 @@ from __future__ import print_function
 
 import cProfile
 import os
-import pickle
 import pstats
 import random
 import threading
@@ -26,6 +25,7 @@ from WMCore.ResourceControl.ResourceControl import ResourceControl
 from WMCore.Services.UUIDLib import makeUUID
 from WMCore.WMBS.File import File
 from WMCore.WMBS.Fileset import Fileset
+from WMCore.WMBS.JobArchive import JobArchive, JobLoader
 from WMCore.WMBS.Subscription import Subscription
 from WMCore.WMBS.Workflow import Workflow
 from WMCore.WMSpec.Makers.TaskMaker import TaskMaker
@@ -278,12 +278,13 @@ class JobCreatorTest(EmulatedUnitTestCase):
         self.assertTrue('job_1' in listOfDirs)
         self.assertTrue('job_2' in listOfDirs)
         self.assertTrue('job_3' in listOfDirs)
-        jobDir = os.listdir(groupDirectory)[0]
-        jobFile = os.path.join(groupDirectory, jobDir, 'job.pkl')
-        self.assertTrue(os.path.isfile(jobFile))
-        f = open(jobFile, 'r')
-        job = pickle.load(f)
-        f.close()
+        # The jobs are in the archive of the job collection
+        self.assertTrue('jobs.archive' in os.listdir(groupDirectory))
+        with JobArchive(os.path.join(groupDirectory, 'jobs.archive')) as archive:
+            jobIDs = archive.jobIDs()
+            self.assertEqual(len(jobIDs), len(os.listdir(groupDirectory)) - 1)
+            job = archive.getJob(jobIDs[0])
+        self.assertTrue(JobLoader().exists(job['cache_dir'], job['id']))
 
         self.assertEqual(job.baggage.PresetSeeder.generator.initialSeed, 1001)
         self.assertEqual(job.baggage.PresetSeeder.evtgenproducer.initialSeed, 1001)
@@ -294,6 +295,55 @@ class JobCreatorTest(EmulatedUnitTestCase):
 
         return
 
+    def testMultiProcess(self):
+        """
+        _testMultiProcess_
+
+        Create the jobs of two workflows in worker processes, the job
+        numbering of each workflow has to be sequential.
+        """
+        myThread = threading.currentThread()
+
+        config = self.getConfig()
+        config.JobCreator.creatorProcesses = 2
+
+        nSubs = 3
+        nFiles = 10
+        workloadName = 'TestWorkload'
+
+        self.createWorkload(workloadName=workloadName)
+        workloadPath = os.path.join(self.testDir, 'workloadTest', 'TestWorkload', 'WMSandbox', 'WMWorkload.pkl')
+
+        names = [makeUUID(), makeUUID()]
+        for name in names:
+            self.createJobCollection(name=name, nSubs=nSubs, nFiles=nFiles, workflowURL=workloadPath)
+
+        testJobCreator = JobCreatorPoller(config=config)
+        testJobCreator.algorithm()
+        self.assertEqual(len(testJobCreator.pool), 2)
+        testJobCreator.close()
+        self.assertEqual(testJobCreator.pool, [])
+
+        getJobsAction = self.daoFactory(classname="Jobs.GetAllJobs")
+        result = getJobsAction.execute(state='Created', jobType="Processing")
+        self.assertEqual(len(result), 2 * nSubs * nFiles)
+
+        result = myThread.dbi.processData('SELECT * FROM wmbs_sub_files_acquired')[0].fetchall()
+        self.assertEqual(len(result), 2 * nSubs * nFiles)
+
+        counters = dict((name, []) for name in names)
+        testDirectory = os.path.join(self.testDir, 'jobCacheDir', 'TestWorkload', 'ReReco')
+        for dirPath, _, fileNames in os.walk(testDirectory):
+            if 'jobs.archive' in fileNames:
+                with JobArchive(os.path.join(dirPath, 'jobs.archive')) as archive:
+                    for jobID in archive.jobIDs():
+                        job = archive.getJob(jobID)
+                        counters[job['workflow']].append(job['counter'])
+        for name in names:
+            self.assertEqual(sorted(counters[name]), list(range(1, nSubs * nFiles + 1)))
+
+        return
+
     @attr('performance', 'integration')
     def testProfilePoller(self):
         """
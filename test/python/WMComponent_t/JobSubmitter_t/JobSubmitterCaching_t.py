@@ -186,6 +186,7 @@ class JobSubmitterCachingTest(EmulatedUnitTestCase):
         self.assertEqual(len(mySubmitterPoller.jobDataCache), 20,
                          "Error: The job cache should contain 20 jobs.  Contains: %i" % len(
                              mySubmitterPoller.jobDataCache))
+        self.assertEqual(self.indexedJobs(mySubmitterPoller), set(mySubmitterPoller.jobDataCache))
 
         killWorkflow("wf001", jobCouchConfig=config)
         mySubmitterPoller.refreshCache()
@@ -194,6 +195,7 @@ class JobSubmitterCachingTest(EmulatedUnitTestCase):
         self.assertEqual(len(mySubmitterPoller.jobDataCache), 10,
                          "Error: The job cache should contain 10 jobs. Contains: %i" % len(
                              mySubmitterPoller.jobDataCache))
+        self.assertEqual(self.indexedJobs(mySubmitterPoller), set(mySubmitterPoller.jobDataCache))
 
         killWorkflow("wf002", jobCouchConfig=config)
         mySubmitterPoller.refreshCache()
@@ -201,8 +203,21 @@ class JobSubmitterCachingTest(EmulatedUnitTestCase):
         # Verify that the workflow is gone from the cache
         self.assertEqual(len(mySubmitterPoller.jobDataCache), 0,
                          "Error: The job cache should be empty.  Contains: %i" % len(mySubmitterPoller.jobDataCache))
+        self.assertEqual(mySubmitterPoller.jobsBySiteType, {})
         return
 
+    def indexedJobs(self, submitterPoller):
+        """
+        _indexedJobs_
+
+        Ids of the jobs in the site/task type index of the poller
+        """
+        jobIDs = set()
+        for jobsByPrio in submitterPoller.jobsBySiteType.values():
+            for prioJobIDs in jobsByPrio.values():
+                jobIDs.update(prioJobIDs)
+        return jobIDs
+
 
 if __name__ == "__main__":
     unittest.main()
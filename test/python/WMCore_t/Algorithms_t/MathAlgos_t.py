@@ -7,6 +7,7 @@ Test class for basic Math Algorithms
 
 
 import unittest
+from array import array
 
 from WMCore.Algorithms import MathAlgos
 
@@ -160,6 +161,37 @@ class MathAlgoTest(unittest.TestCase):
         self.assertEqual(result, [{'a': 102, 'b': 200, 'name': 'One'},
                                   {'a': 101, 'b': 199, 'name': 'Two'},
                                   {'a': 100, 'b': 198, 'name': 'Three'}])
+
+        # ties keep the list order, missing keys count as 0.0
+        l.append({'a': 103, 'name': 'Five'})
+        result = MathAlgos.getLargestValues(dictList = l, key = 'a', n = 2)
+        self.assertEqual([x['name'] for x in result], ['Four', 'Five'])
+        result = MathAlgos.getLargestValues(dictList = l, key = 'b', n = 10)
+        self.assertEqual([x['name'] for x in result], ['One', 'Two', 'Three', 'Four', 'Five'])
+        return
+
+    def testHistogramBinEdges(self):
+        """
+        _testHistogramBinEdges_
+
+        Values on the edge shared by two bins are counted in both of them,
+        the input doesn't need to be sorted and can be an array.
+        """
+        numList = array('d', [4, 1, 3, 2, 2, 5])
+        result = MathAlgos.createHistogram(numList = numList, nBins = 2, limit = 10)
+        self.assertEqual(len(result), 2)
+        self.assertEqual((result[0]['lowerEdge'], result[0]['upperEdge']), (1.0, 3.0))
+        self.assertEqual((result[1]['lowerEdge'], result[1]['upperEdge']), (3.0, 5.0))
+        self.assertEqual(result[0]['nEvents'], 4)
+        self.assertEqual(result[1]['nEvents'], 3)
+        self.assertEqual(result[0]['average'], 2.0)
+        self.assertEqual(result[1]['average'], 4.0)
+
+        # empty bins keep the default values
+        numList = [1, 1, 1, 10]
+        result = MathAlgos.createHistogram(numList = numList, nBins = 3, limit = 10)
+        self.assertEqual([x['nEvents'] for x in result], [3, 0, 1])
+        self.assertEqual(result[1]['average'], 0.0)
         return
 
 
@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""
+_DAOFactory_t_
+
+Unit tests for the DAOFactory class registry
+"""
+
+import threading
+import unittest
+
+from WMCore.DAOFactory import DAOFactory, getDAOStats, clearDAORegistry
+from WMQuality.TestInit import TestInit
+
+
+class DAOFactoryTest(unittest.TestCase):
+    def setUp(self):
+        self.testInit = TestInit(__file__)
+        self.testInit.setLogging()
+        self.testInit.setDatabaseConnection()
+        clearDAORegistry()
+        return
+
+    def tearDown(self):
+        clearDAORegistry()
+        self.testInit.clearDatabase()
+        return
+
+    def testClassRegistry(self):
+        """
+        _testClassRegistry_
+
+        DAO classes are resolved once and shared by all the factories,
+        instances are counted per class.
+        """
+        myThread = threading.currentThread()
+        daoFactory = DAOFactory(package="WMCore.WMBS", logger=myThread.logger,
+                                dbinterface=myThread.dbi)
+        otherFactory = DAOFactory(package="WMCore.WMBS", logger=myThread.logger,
+                                  dbinterface=myThread.dbi)
+
+        loadTime = daoFactory.preload(["Jobs.GetFWJRByState", "Files.GetBulkRunLumi"])
+        self.assertTrue(loadTime >= 0)
+
+        action1 = daoFactory(classname="Jobs.GetFWJRByState")
+        action2 = otherFactory(classname="Jobs.GetFWJRByState")
+        self.assertTrue(type(action1) is type(action2))
+        self.assertEqual(action1.__class__.__name__, "GetFWJRByState")
+
+        dialect = daoFactory.getDialect()
+        self.assertTrue(dialect in ("MySQL", "Oracle"))
+
+        stats = getDAOStats()
+        self.assertEqual(len(stats), 2)
+        self.assertEqual(stats["WMCore.WMBS.%s.Jobs.GetFWJRByState" % dialect]["instances"], 2)
+        self.assertEqual(stats["WMCore.WMBS.%s.Files.GetBulkRunLumi" % dialect]["instances"], 0)
+        self.assertTrue(stats["WMCore.WMBS.%s.Files.GetBulkRunLumi" % dialect]["imported"] >= 0)
+
+        self.assertRaises(ImportError, daoFactory, classname="Jobs.ThisDAODoesNotExist")
+        return
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+_LumiIntervals_t_
+
+Unittest for the WMCore.DataStructs.LumiIntervals classes
+
+"""
+
+import unittest
+
+from WMCore.DataStructs.LumiIntervals import LumiIntervals, RunIntervals, MAX_LUMI
+
+
+class RunIntervalsTest(unittest.TestCase):
+    """
+    _RunIntervalsTest_
+
+    """
+
+    def testConstruction(self):
+        """
+        Ranges and lumis get sorted and coalesced
+        """
+        intervals = RunIntervals.fromRanges([[10, 20], [1, 5], [6, 8], [15, 25], [30, 30]])
+        self.assertEqual(intervals.getRanges(), [[1, 8], [10, 25], [30, 30]])
+        self.assertEqual(intervals.numLumis(), 8 + 16 + 1)
+
+        intervals = RunIntervals.fromLumis([5, 3, 4, 9, 1, 4])
+        self.assertEqual(intervals.getRanges(), [[1, 1], [3, 5], [9, 9]])
+
+        intervals = RunIntervals.fromRanges([[5, 0]])
+        self.assertEqual(intervals.getRanges(), [[5, MAX_LUMI]])
+        intervals = RunIntervals.fromRanges([[0, 0]])
+        self.assertEqual(intervals.getRanges(), [[0, 0]])
+        self.assertTrue(0 in intervals)
+        self.assertFalse(1 in intervals)
+        self.assertEqual(len(RunIntervals.fromRanges([])), 0)
+
+    def testContains(self):
+        """
+        Binary search membership
+        """
+        intervals = RunIntervals.fromRanges([[1, 5], [10, 20]])
+        for lumi in [1, 3, 5, 10, 20]:
+            self.assertTrue(lumi in intervals)
+        for lumi in [0, 6, 9, 21, 100]:
+            self.assertFalse(lumi in intervals)
+        self.assertEqual(intervals.filterLumis([21, 4, 7, 12]), [4, 12])
+
+    def testSetAlgebra(self):
+        """
+        union, intersection and difference
+        """
+        aInt = RunIntervals.fromRanges([[1, 10], [20, 30], [40, 50]])
+        bInt = RunIntervals.fromRanges([[5, 22], [25, 26], [51, 60]])
+
+        self.assertEqual(aInt.union(bInt).getRanges(), [[1, 30], [40, 60]])
+        self.assertEqual(aInt.intersection(bInt).getRanges(), [[5, 10], [20, 22], [25, 26]])
+        self.assertEqual(aInt.difference(bInt).getRanges(), [[1, 4], [23, 24], [27, 30], [40, 50]])
+        self.assertEqual(bInt.difference(aInt).getRanges(), [[11, 19], [51, 60]])
+        self.assertEqual(len(aInt.difference(aInt)), 0)
+
+
+class LumiIntervalsTest(unittest.TestCase):
+    """
+    _LumiIntervalsTest_
+
+    """
+
+    def testOperations(self):
+        """
+        Run by run set algebra, in the LumiList compact format
+        """
+        aList = LumiIntervals({'1': [[1, 10], [20, 30]], '2': [[1, 5]], '3': [[1, 100]]})
+        bList = LumiIntervals({'1': [[5, 25]], '2': [[1, 5]], '4': [[7, 8]]})
+
+        self.assertEqual((aList | bList).getCompactList(),
+                         {'1': [[1, 30]], '2': [[1, 5]], '3': [[1, 100]], '4': [[7, 8]]})
+        self.assertEqual((aList + bList), (aList | bList))
+        self.assertEqual((aList & bList).getCompactList(),
+                         {'1': [[5, 10], [20, 25]], '2': [[1, 5]]})
+        self.assertEqual((aList - bList).getCompactList(),
+                         {'1': [[1, 4], [26, 30]], '3': [[1, 100]]})
+        self.assertEqual(len(aList - aList), 0)
+        self.assertEqual(aList.numLumis(), 10 + 11 + 5 + 100)
+
+    def testContainsAndFilter(self):
+        """
+        contains and filterLumis follow the LumiList input formats
+        """
+        lumis = LumiIntervals({'1': [[1, 10], [20, 30]], '5': [[3, 0]]})
+
+        self.assertTrue(lumis.contains(1))
+        self.assertTrue(lumis.contains('5'))
+        self.assertFalse(lumis.contains(2))
+        self.assertTrue(lumis.contains(1, 25))
+        self.assertTrue((1, 10) in lumis)
+        self.assertFalse((1, 15) in lumis)
+        self.assertTrue((5, 1000) in lumis)
+        self.assertFalse((5, 2) in lumis)
+        self.assertRaises(RuntimeError, lumis.contains, [1])
+
+        # run numbers from JSON decoded masks are unicode, big ones long
+        self.assertTrue(lumis.contains(u'5'))
+        self.assertFalse(lumis.contains(u'12345'))
+        self.assertTrue(lumis.contains(long(1)))
+        self.assertFalse(lumis.contains(long(12345)))
+        self.assertTrue((long(1), long(10)) in lumis)
+        self.assertTrue(lumis.contains(u'1', 25))
+
+        self.assertEqual(lumis.filterLumis([(1, 5), (1, 15), (2, 1), (5, 4), (1, 30)]),
+                         [(1, 5), (5, 4), (1, 30)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,7 +13,7 @@ Unittest for the WMCore.DataStructs.Mask class
 
 import unittest
 
-from WMCore.DataStructs.Mask import Mask
+from WMCore.DataStructs.Mask import Mask, CompiledMask
 from WMCore.DataStructs.Run import Run
 
 
@@ -185,6 +185,46 @@ class MaskTest(unittest.TestCase):
         self.assertEqual(run.run, 1)
         self.assertEqual(run.lumis, [3, 4, 7, 8, 9])
 
+    def testCompiledMask(self):
+        """
+        Test lookups and filtering with a compiled mask
+        """
+        mask = Mask()
+        mask.addRunWithLumiRanges(run=1, lumiList=[[20, 30], [1, 9], [5, 12]])
+        mask.addRunAndLumis(run=2, lumis=[4, 4])
+        compiled = mask.compile()
+
+        for lumi in range(0, 40):
+            self.assertEqual(compiled.runLumiInMask(1, lumi), mask.runLumiInMask(1, lumi))
+        self.assertTrue(compiled.runInMask(2))
+        self.assertFalse(compiled.runInMask(3))
+        self.assertTrue(compiled.runLumiInMask(2, 4))
+        self.assertFalse(compiled.runLumiInMask(3, 4))
+        self.assertEqual(compiled.filterLumis(1, [40, 12, 13, 1]), [12, 1])
+        self.assertEqual(compiled.filterLumis(3, [1, 2]), [])
+
+        run = compiled.filterRun(Run(1, *[(9, 90), (15, 150), (25, 250)]))
+        self.assertEqual(run.run, 1)
+        self.assertDictEqual(run.eventsPerLumi, {9: 90, 25: 250})
+        self.assertIsNone(compiled.filterRun(Run(1, 15, 16)))
+        self.assertIsNone(compiled.filterRun(Run(5, 1)))
+
+        runs = set([Run(1, 2, 3, 14), Run(2, 4, 5), Run(7, 1)])
+        self.assertEqual(compiled.filterRuns(runs), mask.filterRunLumisByMask(runs))
+        self.assertEqual(compiled.filterRuns(runs), set([Run(1, 2, 3), Run(2, 4)]))
+
+        # an empty mask accepts everything
+        compiled = CompiledMask({})
+        self.assertTrue(compiled.runInMask(10))
+        self.assertTrue(compiled.runLumiInMask(10, 10))
+        self.assertEqual(compiled.filterLumis(10, [3, 1]), [3, 1])
+        self.assertEqual(compiled.filterRuns(runs), runs)
+
+        # and a lumi mask dictionary with string runs works too
+        compiled = CompiledMask({'1': [[1, 3]]})
+        self.assertTrue(compiled.runLumiInMask(1, 2))
+        self.assertFalse(compiled.runLumiInMask(1, 4))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -6,6 +6,7 @@ Unittest for the WMCore.DataStructs.Run class
 
 """
 
+import pickle
 import unittest
 
 from WMCore.DataStructs.Run import Run
@@ -171,6 +172,51 @@ class RunTest(unittest.TestCase):
         s.add(run10)
         s.add(run11)
 
+    def testSortedColumns(self):
+        """
+        test that lumis are kept sorted, merged and looked up correctly
+
+        """
+        run1 = Run(1, [(5, 50), (1, 10), (3, None)])
+        self.assertEqual(run1.lumis, [1, 3, 5])
+        self.assertEqual(run1[1], 3)
+        self.assertEqual(run1[-1], 5)
+        self.assertEqual(run1[0:2], [1, 3])
+        self.assertTrue(3 in run1)
+        self.assertFalse(4 in run1)
+        self.assertEqual(run1.getEventsByLumi(5), 50)
+        self.assertIsNone(run1.getEventsByLumi(3))
+        self.assertIsNone(run1.getEventsByLumi(4))
+
+        run1 += Run(1, [(2, 20), (3, 30), (5, 5)])
+        self.assertDictEqual(run1.eventsPerLumi, {1: 10, 2: 20, 3: 30, 5: 55})
+
+        run1.appendLumi(4)
+        run1.appendLumi(5)
+        run1.appendLumi((1, 1))
+        self.assertDictEqual(run1.eventsPerLumi, {1: 11, 2: 20, 3: 30, 4: None, 5: 55})
+
+        del run1[0]
+        run1[0] = 10
+        self.assertEqual(run1.lumis, [3, 4, 5, 10])
+
+        run1.lumis = [7, (6, 60)]
+        self.assertDictEqual(run1.eventsPerLumi, {6: 60, 7: None})
+
+    def testPickle(self):
+        """
+        test pickling, including Runs pickled with the old dictionary format
+
+        """
+        run1 = Run(1, [(1, 10), (2, None)])
+        run2 = pickle.loads(pickle.dumps(run1))
+        self.assertEqual(run1, run2)
+        self.assertDictEqual(run2.eventsPerLumi, {1: 10, 2: None})
+
+        oldRun = Run.__new__(Run)
+        oldRun.__setstate__({"config": {}, "run": 2, "eventsPerLumi": {3: 30, 1: None}})
+        self.assertEqual(oldRun, Run(2, [(1, None), (3, 30)]))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -391,6 +391,33 @@ class CMSCouchTest(unittest.TestCase):
         for item in result:
             self.assertEqual(222, item['doc']['foo'])
 
+    def testUpdateBulkDocumentsWithFunction(self):
+        """
+        Test bulk updates of documents with an update function
+        """
+        self.db.queue(Document(id="1", inputDict={'counter': 1}))
+        self.db.queue(Document(id="2", inputDict={'counter': 2}))
+        self.db.commit()
+
+        def increment(docID, doc):
+            if doc is None:
+                doc = {'_id': docID, 'counter': 0}
+            doc['counter'] += 10
+            return doc
+
+        failed = self.db.updateBulkDocumentsWithFunction(["1", "2", "3"], increment, 2)
+        self.assertEqual(failed, [])
+        result = self.db.allDocs({"include_docs": True})['rows']
+        self.assertEqual([11, 12, 10], [item['doc']['counter'] for item in result])
+
+        # documents refused by the database are returned too
+        self.db.commitOne({'_id': '_design/validate',
+                           'validate_doc_update': "function(newDoc) {if (newDoc.counter > 20) "
+                                                  "{throw({forbidden: 'counter too large'});}}"})
+        failed = self.db.updateBulkDocumentsWithFunction(["1", "2", "3"], increment, 2)
+        self.assertEqual(failed, ["1", "2"])
+        self.assertEqual([11, 12, 20], [self.db.document(docID)['counter'] for docID in ["1", "2", "3"]])
+
     def testUpdateHandlerAndBulkUpdateProfile(self):
         """
         Test that update function support works
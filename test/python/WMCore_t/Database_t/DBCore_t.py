@@ -284,6 +284,39 @@ class DBCoreTest(unittest.TestCase):
 
         return
 
+    def testProcessBulkSelect(self):
+        """
+        _testProcessBulkSelect_
+
+        Verify that a select with thousands of values for a single bind is
+        batched into IN-lists and returns all the rows in one ResultSet.
+        """
+        binds = []
+        for i in range(2500):
+            binds.append({"one": i, "two": i % 7, "three": str(i * 3)})
+
+        insertSQL = "INSERT INTO test_tablea VALUES (:one, :two, :three)"
+        selectSQL = \
+          """SELECT column1, column2, column3 FROM test_tablea
+             WHERE column1 IN (:one) AND column2 = :two"""
+
+        myThread = threading.currentThread()
+        myThread.dbi.processData(insertSQL, binds = binds)
+
+        values = list(range(0, 2600, 2)) + [0, 2]
+        resultSets = myThread.dbi.processBulkSelect(selectSQL, "one", values,
+                                                    binds = {"two": 3})
+        self.assertEqual(len(resultSets), 1)
+
+        results = sorted(resultSets[0].fetchall())
+        expected = [(i, 3, str(i * 3)) for i in range(2500) if i % 2 == 0 and i % 7 == 3]
+        self.assertEqual([tuple(result) for result in results], expected)
+
+        resultSets = myThread.dbi.processBulkSelect(selectSQL, "one", [], binds = {"two": 3})
+        self.assertEqual(resultSets[0].fetchall(), [])
+
+        return
+
     def testInsertHugeNumber(self):
         """
         _testInsertHugeNumber_
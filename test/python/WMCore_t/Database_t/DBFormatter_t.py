@@ -91,6 +91,131 @@ insert into test (bind1, bind2) values (:bind1, :bind2) """
         output = dbformatter.formatOneDict(result)
         self.assertEqual(output, {'bind2': 'value2a', 'bind1': 'value1a'})
 
+    @attr("integration")
+    def testIterRows(self):
+        """
+        Test streaming rows out of result sets and result proxies
+        """
+        myThread = threading.currentThread()
+        dbformatter = DBFormatter(myThread.logger, myThread.dbi)
+        myThread.transaction.begin()
+
+        result = myThread.transaction.processData(myThread.select)
+        output = [(row.bind1, row.bind2) for row in dbformatter.iterRows(result)]
+        self.assertEqual(output, [('value1a', 'value2a'), ('value1b', 'value2b'), ('value1c', 'value2d')])
+
+        result = myThread.dbi.processData(myThread.select, conn=myThread.transaction.conn,
+                                          transaction=True, returnCursor=True)
+        output = list(dbformatter.iterRows(result, size=2))
+        self.assertEqual(len(output), 3)
+        self.assertEqual(output[2]._asdict(), {'bind1': 'value1c', 'bind2': 'value2d'})
+        self.assertTrue(all(proxy.closed for proxy in result))
+        # same columns, same row class
+        self.assertTrue(type(output[0]) is type(next(dbformatter.iterRows(
+            myThread.transaction.processData(myThread.select)))))
+
+
+class FakeResultProxy(object):
+    """
+    Result proxy handing out rows with fetchmany, keeping track of the calls
+    """
+
+    def __init__(self, keys, rows):
+        self.keys = keys
+        self.rows = list(rows)
+        self.closed = False
+        self.returns_rows = True
+        self.fetches = 0
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection(object):
+    """
+    Connection that records whether it was returned to the pool
+    """
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeDBInterface(object):
+    """
+    DBInterface returning FakeResultProxy objects, which requires returnCursor=True
+    """
+
+    def __init__(self, proxies):
+        self.proxies = proxies
+        self.connections = []
+        self.calls = []
+
+    def makelist(self, stuff):
+        return stuff if isinstance(stuff, list) else [stuff]
+
+    def connection(self):
+        self.connections.append(FakeConnection())
+        return self.connections[-1]
+
+    def processData(self, sqlstmt, binds={}, conn=None, transaction=False, returnCursor=False):
+        assert returnCursor and conn is not None
+        self.calls.append(("processData", binds))
+        return self.proxies
+
+    def processBulkSelect(self, sqlstmt, bindName, values, binds=None, conn=None,
+                          transaction=False, returnCursor=False):
+        assert returnCursor and conn is not None
+        self.calls.append(("processBulkSelect", bindName, values, binds))
+        return self.proxies
+
+
+class DBFormatterStreamTest(unittest.TestCase):
+    """
+    _DBFormatterStreamTest_
+
+    Check that iterQuery streams rows out of the cursor, without a database
+    """
+
+    def testIterQuery(self):
+        """
+        Rows are fetched as they are consumed and the connection is held until the end
+        """
+        proxies = [FakeResultProxy(["ID", "FWJR_PATH"], [(i, "/path/%d" % i) for i in range(5)]),
+                   FakeResultProxy(["ID", "FWJR_PATH"], [(5, "/path/5")])]
+        dbi = FakeDBInterface(proxies)
+        dbformatter = DBFormatter(None, dbi)
+
+        rows = dbformatter.iterQuery("SELECT id, fwjr_path FROM wmbs_job", {"state": 1}, size=2)
+        firstRow = next(rows)
+        self.assertEqual((firstRow.id, firstRow.fwjr_path), (0, "/path/0"))
+        self.assertEqual([proxy.fetches for proxy in proxies], [1, 0])
+        self.assertEqual(len(dbi.connections), 1)
+        self.assertFalse(dbi.connections[0].closed)
+
+        self.assertEqual([row.id for row in rows], [1, 2, 3, 4, 5])
+        self.assertTrue(all(proxy.closed for proxy in proxies))
+        self.assertTrue(dbi.connections[0].closed)
+        self.assertEqual(dbi.calls, [("processData", {"state": 1})])
+
+        # bulk select through the bind list, on the caller's connection
+        proxies = [FakeResultProxy(["RUN", "LUMI", "ID"], [(1, 2, 3)])]
+        dbi = FakeDBInterface(proxies)
+        dbformatter = DBFormatter(None, dbi)
+        conn = FakeConnection()
+        rows = list(dbformatter.iterQuery("SELECT ... IN (:id)", {"id": [3, 4]}, bindName="id", conn=conn))
+        self.assertEqual([tuple(row) for row in rows], [(1, 2, 3)])
+        self.assertEqual(dbi.calls, [("processBulkSelect", "id", [3, 4], {})])
+        self.assertEqual(dbi.connections, [])
+        self.assertFalse(conn.closed)
+
 
 if __name__ == "__main__":
     unittest.main()
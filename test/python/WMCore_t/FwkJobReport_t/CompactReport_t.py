@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+_CompactReport_t_
+
+Unit tests for the compact framework job report format.
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from WMCore.FwkJobReport.CompactReport import (CompactReportException, LazySection, convertPickledReport,
+                                               dumpReportData, isCompactReport, loadReportData)
+from WMCore.FwkJobReport.Report import Report
+from WMCore.WMBase import getTestBase
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+class CompactReportTest(unittest.TestCase):
+    """
+    _CompactReportTest_
+
+    Unit tests for the compact report format and its lazy loading.
+    """
+
+    def setUp(self):
+        """
+        _setUp_
+
+        Parse a CMSSW report and add a couple of steps to it.
+        """
+        self.testDir = tempfile.mkdtemp()
+        xmlPath = os.path.join(getTestBase(), "WMCore_t/FwkJobReport_t/CMSSWProcessingReport.xml")
+        self.report = Report("cmsRun1")
+        self.report.parse(xmlPath)
+        self.report.setTaskName("/TestWorkload/ReReco")
+        self.report.addStep("stageOut1")
+        self.report.addError("stageOut1", 60324, "StageOutError", "Failed to stage out")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir, ignore_errors=True)
+        return
+
+    def testRoundTrip(self):
+        """
+        _testRoundTrip_
+
+        Reports loaded eagerly or lazily are the same as the persisted one.
+        """
+        reportPath = os.path.join(self.testDir, "Report.pkl")
+        self.report.persist(reportPath)
+        with open(reportPath, "rb") as handle:
+            self.assertTrue(isCompactReport(handle.read()))
+
+        expected = self.report.data.dictionary_whole_tree_()
+        for lazy in (False, True):
+            newReport = Report()
+            newReport.unpersist(reportPath, lazy=lazy)
+            self.assertEqual(newReport.data.dictionary_whole_tree_(), expected)
+            self.assertEqual(newReport.listSteps(), ["cmsRun1", "stageOut1"])
+            self.assertEqual(newReport.getExitCode(), 60324)
+            self.assertEqual(len(newReport.getAllFiles()), len(self.report.getAllFiles()))
+
+        # pickled reports can still be loaded
+        self.report.persist(reportPath, compact=False)
+        newReport = Report()
+        newReport.unpersist(reportPath)
+        self.assertEqual(newReport.data.dictionary_whole_tree_(), expected)
+        return
+
+    def testLazyLoading(self):
+        """
+        _testLazyLoading_
+
+        Sections are decoded only when they're accessed.
+        """
+        data = loadReportData(dumpReportData(self.report.data), lazy=True)
+        self.assertTrue(isinstance(data, LazySection))
+        self.assertEqual(data.task, "/TestWorkload/ReReco")
+        self.assertFalse("cmsRun1" in data.__dict__)
+        self.assertTrue("cmsRun1" in data._internal_children)
+
+        errors = data.stageOut1.errors
+        self.assertEqual(errors.error0.exitCode, 60324)
+        self.assertTrue("stageOut1" in data.__dict__)
+        self.assertFalse("cmsRun1" in data.__dict__)
+        self.assertFalse("output" in data.stageOut1.__dict__)
+
+        # section_ must not replace a section still encoded
+        cmsRun1 = data.section_("cmsRun1")
+        self.assertTrue(hasattr(cmsRun1.output, "outputRECORECO"))
+        self.assertFalse(hasattr(data, "cmsRun2"))
+
+        del data.stageOut1
+        self.assertFalse(hasattr(data, "stageOut1"))
+
+        # pickling decodes everything
+        newData = pickle.loads(pickle.dumps(data))
+        self.assertFalse("_internal_lazy_nodes" in newData.__dict__)
+        self.assertEqual(newData.cmsRun1.dictionary_whole_tree_(),
+                         self.report.data.cmsRun1.dictionary_whole_tree_())
+        return
+
+    def testConvertPickledReport(self):
+        """
+        _testConvertPickledReport_
+
+        Convert a pickled report, in place or to a new file.
+        """
+        reportPath = os.path.join(self.testDir, "Report.pkl")
+        self.report.persist(reportPath, compact=False)
+
+        compactPath = convertPickledReport(reportPath, reportPath + ".compact")
+        with open(compactPath, "rb") as handle:
+            self.assertTrue(isCompactReport(handle.read()))
+        with open(reportPath, "rb") as handle:
+            self.assertFalse(isCompactReport(handle.read()))
+
+        self.assertEqual(convertPickledReport(reportPath), reportPath)
+        newReport = Report()
+        newReport.unpersist(reportPath)
+        self.assertEqual(newReport.data.dictionary_whole_tree_(), self.report.data.dictionary_whole_tree_())
+        # already converted, nothing to do
+        self.assertEqual(convertPickledReport(reportPath), reportPath)
+
+        # reports pickled before ConfigSection had the skipChecks flag
+        del self.report.data.__dict__["_internal_skipChecks"]
+        del self.report.data.cmsRun1.__dict__["_internal_skipChecks"]
+        self.report.persist(reportPath, compact=False)
+        convertPickledReport(reportPath)
+        newReport = Report()
+        newReport.unpersist(reportPath, lazy=True)
+        self.assertEqual(newReport.listSteps(), ["cmsRun1", "stageOut1"])
+        self.assertEqual(len(newReport.getAllFiles()), len(self.report.getAllFiles()))
+        return
+
+    def testBadHeader(self):
+        """
+        _testBadHeader_
+
+        Malformed and newer versions are refused.
+        """
+        content = dumpReportData(self.report.data)
+        self.assertRaises(CompactReportException, loadReportData, b"WMFWJR garbage\n{}")
+        self.assertRaises(CompactReportException, loadReportData, content.replace(b"WMFWJR 1", b"WMFWJR 9", 1))
+        return
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -257,6 +257,33 @@ class ReportTest(unittest.TestCase):
         self.assertEqual(myReport.getStepErrors("cmsRun1")['error0'].exitCode, 50115)
         return
 
+    def testTruncatedXMLParsing(self):
+        """
+        _testTruncatedXMLParsing_
+
+        A report truncated in the middle of the output files must not be
+        partially loaded, only the BadFWJRXML error is added.
+        """
+        with open(self.xmlPath) as xmlFile:
+            xmlContent = xmlFile.read()
+        truncatedPath = os.path.join(self.testDir, "TruncatedReport.xml")
+        with open(truncatedPath, "w") as xmlFile:
+            xmlFile.write(xmlContent[:xmlContent.index("</File>") + len("</File>")])
+
+        myReport = Report("cmsRun1")
+        from WMCore.FwkJobReport.Report import FwkJobReportException
+        self.assertRaises(FwkJobReportException, myReport.parse, truncatedPath)
+        self.assertEqual(myReport.getAllFiles(), [])
+        self.assertEqual(myReport.getAllInputFiles(), [])
+        self.assertEqual(myReport.listSteps(), ["cmsRun1"])
+        self.assertEqual(sorted(myReport.getStepErrors("cmsRun1")), ['error0', 'errorCount'])
+        self.assertEqual(myReport.getStepErrors("cmsRun1")['error0'].exitCode, 50115)
+
+        # the same report can still be filled from a good file
+        myReport.parse(self.xmlPath)
+        self.verifyRecoOutput(myReport)
+        return
+
     def testErrorReporting(self):
         """
         _testErrorReporting_
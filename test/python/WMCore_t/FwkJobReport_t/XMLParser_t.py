@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+"""
+_XMLParser_t_
+
+Unit tests and benchmark for the streaming XML job report parser.
+"""
+
+from __future__ import print_function, division
+
+import os
+import resource
+import shutil
+import tempfile
+import time
+import unittest
+
+from nose.plugins.attrib import attr
+
+from WMCore.FwkJobReport.Report import Report
+from WMCore.FwkJobReport.XMLParser import xmlToJobReport, xmlTreeToJobReport
+from WMCore.WMBase import getTestBase
+
+
+def writeSyntheticReport(filename, numInputFiles, numLumis):
+    """
+    _writeSyntheticReport_
+
+    Write a cmsRun report with numInputFiles input files and one output
+    file, each with numLumis lumi sections spread over a few runs.
+    """
+    lumis = "\n".join('   <LumiSection NEvents="10" ID="%d"/>' % lumi for lumi in range(1, numLumis + 1))
+    runs = "<Runs>\n%s\n</Runs>" % "\n".join('<Run ID="%d">\n%s\n</Run>' % (run, lumis)
+                                               for run in range(1, 4))
+    branches = "<Branches>\n%s\n</Branches>" % "\n".join("  <Branch>branch_%d__RECO.</Branch>" % i
+                                                         for i in range(100))
+    with open(filename, "w") as handle:
+        handle.write("<FrameworkJobReport>\n")
+        for i in range(numInputFiles):
+            handle.write("""<InputFile>
+<State  Value="closed"/>
+<LFN>/store/data/Run/RAW/v1/%(i)d.root</LFN>
+<PFN>root://some.site//store/data/Run/RAW/v1/%(i)d.root</PFN>
+<Catalog></Catalog>
+<ModuleLabel>source</ModuleLabel>
+<GUID>GUID-%(i)d</GUID>
+%(branches)s
+<InputType>primaryFiles</InputType>
+<InputSourceClass>PoolSource</InputSourceClass>
+<EventsRead>%(events)d</EventsRead>
+%(runs)s
+</InputFile>
+""" % {"i": i, "branches": branches, "events": 30 * numLumis, "runs": runs})
+        handle.write("""<File>
+<State  Value="closed"/>
+<LFN>/store/unmerged/output.root</LFN>
+<PFN>output.root</PFN>
+<Catalog></Catalog>
+<ModuleLabel>outputRECORECO</ModuleLabel>
+<GUID>GUID-output</GUID>
+%(branches)s
+<OutputModuleClass>PoolOutputModule</OutputModuleClass>
+<TotalEvents>%(events)d</TotalEvents>
+<BranchHash>hash</BranchHash>
+%(runs)s
+<Inputs>
+<Input>
+<LFN>/store/data/Run/RAW/v1/0.root</LFN>
+<PFN>root://some.site//store/data/Run/RAW/v1/0.root</PFN>
+</Input>
+</Inputs>
+</File>
+<ReadBranches>
+</ReadBranches>
+</FrameworkJobReport>
+""" % {"branches": branches, "events": 30 * numLumis * numInputFiles, "runs": runs})
+    return
+
+
+class XMLParserTest(unittest.TestCase):
+    """
+    _XMLParserTest_
+
+    Compare the streaming parser with the node tree one.
+    """
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.testData = os.path.join(getTestBase(), "WMCore_t/FwkJobReport_t")
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir, ignore_errors=True)
+        return
+
+    def parseReport(self, parser, xmlPath):
+        report = Report("cmsRun1")
+        parser(report, xmlPath)
+        return report
+
+    def measureParser(self, parser, xmlPath):
+        """
+        _measureParser_
+
+        Parse the report in a forked process, so the memory it takes can be
+        measured. Return the wall time and the peak memory increase in MB.
+        """
+        readFd, writeFd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            exitCode = 1
+            try:
+                os.close(readFd)
+                # maximum resident set size, in kB on linux
+                startRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                startTime = time.time()
+                self.parseReport(parser, xmlPath)
+                wallTime = time.time() - startTime
+                peakRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                os.write(writeFd, ("%f %d" % (wallTime, peakRSS - startRSS)).encode("ascii"))
+                exitCode = 0
+            finally:
+                os._exit(exitCode)
+
+        os.close(writeFd)
+        with os.fdopen(readFd) as handle:
+            result = handle.read()
+        self.assertEqual(os.waitpid(pid, 0)[1], 0, "Failed to parse %s" % xmlPath)
+        wallTime, peakRSS = result.split()
+        return float(wallTime), int(peakRSS) / 1024
+
+    def testSameReport(self):
+        """
+        _testSameReport_
+
+        Both parsers give the same report for all the cmsRun reports.
+        """
+        xmlFiles = [name for name in os.listdir(self.testData) if name.endswith(".xml")]
+        self.assertTrue(len(xmlFiles) > 0)
+        for xmlFile in xmlFiles:
+            xmlPath = os.path.join(self.testData, xmlFile)
+            try:
+                streamReport = self.parseReport(xmlToJobReport, xmlPath)
+            except Exception:
+                # corrupt reports must fail with both
+                self.assertRaises(Exception, self.parseReport, xmlTreeToJobReport, xmlPath)
+                continue
+            treeReport = self.parseReport(xmlTreeToJobReport, xmlPath)
+            self.assertEqual(streamReport.data.dictionary_whole_tree_(), treeReport.data.dictionary_whole_tree_(),
+                             "Different reports for %s" % xmlFile)
+
+        xmlPath = os.path.join(self.testDir, "Synthetic.xml")
+        writeSyntheticReport(xmlPath, 5, 20)
+        report = self.parseReport(xmlToJobReport, xmlPath)
+        self.assertEqual(report.data.dictionary_whole_tree_(),
+                         self.parseReport(xmlTreeToJobReport, xmlPath).data.dictionary_whole_tree_())
+        self.assertEqual(len(report.getAllInputFiles()), 5)
+        outputFile = report.getAllFiles()[0]
+        runs = dict((run.run, run) for run in outputFile["runs"])
+        self.assertEqual(sorted(runs), [1, 2, 3])
+        self.assertEqual(len(runs[2].eventsPerLumi), 20)
+        return
+
+    @attr('performance')
+    def testBenchmark(self):
+        """
+        _testBenchmark_
+
+        Compare wall time and peak memory of both parsers on large reports.
+        """
+        for numInputFiles, numLumis in [(100, 100), (1000, 50), (20, 10000)]:
+            xmlPath = os.path.join(self.testDir, "Synthetic.xml")
+            writeSyntheticReport(xmlPath, numInputFiles, numLumis)
+            print("\n  %d input files, %d lumis per run, %.1f MB" % (numInputFiles, numLumis,
+                                                                    os.path.getsize(xmlPath) / 1024 ** 2))
+            for name, parser in [("tree", xmlTreeToJobReport), ("stream", xmlToJobReport)]:
+                wallTime, peakRSS = self.measureParser(parser, xmlPath)
+                print("  %-6s parser: %.2f s, peak memory +%.1f MB" % (name, wallTime, peakRSS))
+        return
+
+
+if __name__ == "__main__":
+    unittest.main()
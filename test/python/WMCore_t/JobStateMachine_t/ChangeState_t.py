@@ -12,7 +12,7 @@ from WMCore.DAOFactory import DAOFactory
 from WMCore.Database.CMSCouch import CouchServer
 from WMCore.FwkJobReport.Report import Report
 from WMCore.JobSplitting.SplitterFactory import SplitterFactory
-from WMCore.JobStateMachine.ChangeState import ChangeState, Transitions
+from WMCore.JobStateMachine.ChangeState import ChangeState, Transitions, prepareFWJR
 from WMCore.WMBS.File import File
 from WMCore.WMBS.Fileset import Fileset
 from WMCore.WMBS.Subscription import Subscription
@@ -485,6 +485,60 @@ class TestChangeState(unittest.TestCase):
 
         return
 
+    def testPreparedJobSerialization(self):
+        """
+        _testPreparedJobSerialization_
+
+        Verify that a FWJR prepared beforehand is serialized like the report.
+        """
+        change = ChangeState(self.config, "changestate_t")
+
+        locationAction = self.daoFactory(classname="Locations.New")
+        locationAction.execute("site1", pnn="T2_CH_CERN")
+
+        testWorkflow = Workflow(spec=self.specUrl, owner="Steve",
+                                name="wf001", task=self.taskName)
+        testWorkflow.create()
+        testFileset = Fileset(name="TestFileset")
+        testFileset.create()
+
+        testFile = File(lfn="SomeLFNC", locations=set(["T2_CH_CERN"]))
+        testFile.create()
+        testFileset.addFile(testFile)
+        testFileset.commit()
+
+        testSubscription = Subscription(fileset=testFileset,
+                                        workflow=testWorkflow)
+        testSubscription.create()
+
+        splitter = SplitterFactory()
+        jobFactory = splitter(package="WMCore.WMBS",
+                              subscription=testSubscription)
+        jobGroup = jobFactory(files_per_job=1)[0]
+
+        testJobA = jobGroup.jobs[0]
+        testJobA["user"] = "sfoulkes"
+        testJobA["group"] = "DMWM"
+        testJobA["taskType"] = "Processing"
+
+        change.propagate([testJobA], 'created', 'new')
+        myReport = Report()
+        reportPath = os.path.join(getTestBase(),
+                                  "WMCore_t/JobStateMachine_t/Report.pkl")
+        myReport.unpersist(reportPath)
+        testJobA["fwjr"] = prepareFWJR(myReport)
+
+        change.propagate([testJobA], 'executing', 'created')
+
+        changeStateDB = self.couchServer.connectDatabase(dbname="changestate_t/fwjrs")
+        result = changeStateDB.loadView("FWJRDump", "fwjrsByWorkflowName")
+        self.assertEqual(len(result["rows"]), 1)
+        fwjrDoc = changeStateDB.document(result["rows"][0]["value"]["id"])
+
+        self.assertEqual(fwjrDoc["fwjr"]["task"], self.taskName)
+        self.assertEqual(sorted(fwjrDoc["fwjr"]["steps"].keys()), sorted(myReport.listSteps()))
+        return
+
     def testDuplicateJobReports(self):
         """
         _testDuplicateJobReports_
@@ -11,10 +11,6 @@ import unittest
 import threading
 
 from subprocess import Popen, PIPE
-try:
-    import cPickle as pickle
-except ImportError:
-    import pickle
 
 # Imports for testing
 from WMQuality.TestInit import TestInit
@@ -37,6 +33,7 @@ from WMComponent.ErrorHandler.ErrorHandlerPoller   import ErrorHandlerPoller
 
 # WMBS Objects
 from WMCore.WMBS.Job          import Job
+from WMCore.WMBS.JobArchive   import JobLoader
 from WMCore.WMBS.File         import File
 from WMCore.WMBS.Fileset      import Fileset
 from WMCore.WMBS.Workflow     import Workflow
@@ -443,11 +440,10 @@ class WMAgentTest(unittest.TestCase):
 
         # First job should be in here
         self.assertTrue('job_1' in os.listdir(groupDirectory))
-        jobFile = os.path.join(groupDirectory, 'job_1', 'job.pkl')
-        self.assertTrue(os.path.isfile(jobFile))
-        f = open(jobFile, 'r')
-        job = pickle.load(f)
-        f.close()
+        jobLoader = JobLoader()
+        self.assertTrue(jobLoader.exists(os.path.join(groupDirectory, 'job_1'), 1))
+        job = jobLoader.load(os.path.join(groupDirectory, 'job_1'), 1)
+        jobLoader.close()
 
 
         self.assertEqual(job['workflow'], name)
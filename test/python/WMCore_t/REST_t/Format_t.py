@@ -1,3 +1,5 @@
+import unittest
+
 from WMCore.REST.Format import RESTFormat
 from WMCore.REST.Format import XMLFormat
 from WMCore.REST.Format import JSONFormat
@@ -12,3 +14,22 @@ RawFormat()
 DigestETag('md5')
 MD5ETag()
 SHA1ETag()
+
+
+class FormatTest(unittest.TestCase):
+
+    def testChunkCoalescing(self):
+        """Coalesced chunks give the same output and ETag"""
+        rows = [{"id": i, "name": "row%d" % i} for i in range(100)]
+        for fmt, args in ((JSONFormat, ()), (XMLFormat, ("app",))):
+            outputs = []
+            for chunk_size in (0, 512):
+                etag = SHA1ETag()
+                chunks = list(fmt(*(args + (chunk_size,))).stream_chunked(rows, etag, "<start>", "<end>"))
+                outputs.append(("".join(chunks), etag.value(), len(chunks)))
+            self.assertEqual(outputs[0][:2], outputs[1][:2])
+            self.assertEqual(outputs[0][2], len(rows) + 2)
+            self.assertTrue(outputs[1][2] < 20)
+
+if __name__ == "__main__":
+    unittest.main()
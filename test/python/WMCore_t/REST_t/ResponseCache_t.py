@@ -0,0 +1,44 @@
+"""Unit tests for the REST response cache."""
+
+import time
+import unittest
+
+from WMCore.REST.ResponseCache import ResponseCache
+
+
+class ResponseCacheTest(unittest.TestCase):
+
+    def testGetPut(self):
+        """Responses are served until they expire"""
+        cache = ResponseCache(max_size=100)
+        self.assertEqual(cache.get("a"), None)
+        self.assertTrue(cache.put("a", "x" * 10, '"etag"', "deflate", 60))
+        entry = cache.get("a")
+        self.assertEqual((entry.body, entry.etag, entry.encoding), ("x" * 10, '"etag"', "deflate"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        self.assertFalse(cache.put("b", "y", '"etag"', None, 0))
+        cache.put("b", "y", '"etag"', None, 0.01)
+        time.sleep(0.02)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual((len(cache), cache.size), (1, 10))
+
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def testMaxSize(self):
+        """Least recently used responses are evicted to stay under the size limit"""
+        cache = ResponseCache(max_size=100)
+        self.assertFalse(cache.put("big", "x" * 101, '"etag"', None, 60))
+        for key in ("a", "b", "c"):
+            cache.put(key, "x" * 40, '"etag"', None, 60)
+        self.assertEqual(cache.get("a"), None)
+        self.assertNotEqual(cache.get("b"), None)
+        cache.put("d", "x" * 40, '"etag"', None, 60)
+        self.assertEqual(cache.get("c"), None)
+        self.assertNotEqual(cache.get("b"), None)
+        self.assertEqual(cache.size, 80)
+
+
+if __name__ == "__main__":
+    unittest.main()
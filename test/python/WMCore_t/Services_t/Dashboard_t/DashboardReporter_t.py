@@ -92,6 +92,8 @@ class DashboardReporterTest(unittest.TestCase):
         self.reporter.handleSteps(job)
         job = self.createTestJob(self.errorReport)
         self.reporter.handleSteps(job)
+        job = self.createTestJob({'dashboardSteps': self.reporter.getStepsInformation(self.processingReport)})
+        self.reporter.handleSteps(job)
 
     def testPerformanceReport(self):
         """
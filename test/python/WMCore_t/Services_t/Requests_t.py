@@ -129,6 +129,37 @@ class testRepeatCalls(RESTBaseUnitTest):
         if fail_count > 0:
             raise Exception('Test did not pass!')
 
+    def testMultiRequest(self):
+        """Several requests, made one after the other without pycurl"""
+        req = Requests.Requests(self.urlbase, {'req_cache_path': self.cache_path})
+        rows = list(req.makeMultiRequest(['/'] * 3 + ['/doesnotexist'], decoder=False,
+                                         incoming_headers={'Cache-Control': 'no-cache'}))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual([row['status'] for row in rows], [200, 200, 200, 404])
+        self.assertEqual(rows[-1]['uri'], '/doesnotexist')
+        self.assertTrue(rows[-1]['error'])
+        for row in rows:
+            self.assertEqual(row['attempts'], 1)
+            self.assertTrue(row['latency'] >= 0)
+
+    def testMultiRequest_with_pycurl(self):
+        """Several requests in flight at once"""
+        idict = {'req_cache_path': self.cache_path, 'pycurl': 1}
+        req = Requests.Requests(self.urlbase, idict)
+        rows = list(req.makeMultiRequest(['/'] * 5 + ['/doesnotexist'], decoder=False, numConn=3,
+                                         incoming_headers={'Cache-Control': 'no-cache'}))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(sorted(row['status'] for row in rows), [200] * 5 + [404])
+        for row in rows:
+            self.assertEqual(row['error'] is None, row['uri'] == '/')
+
+        # nothing listening there, every request gets retried before reporting the error
+        self.rt.stop()
+        rows = list(req.makeMultiRequest(['/'] * 2, decoder=False, retries=1))
+        self.assertEqual([row['attempts'] for row in rows], [2, 2])
+        self.assertTrue(all(row['status'] is None and row['error'] for row in rows))
+        self.rt.start(blocking=False)
+
     def testRecoveryFromConnRefused(self):
         """Connections succeed after server down"""
         import socket
@@ -16,7 +16,7 @@ import cherrypy
 from nose.plugins.attrib import attr
 
 from WMCore.Services.Requests import Requests
-from WMCore.Services.Service import Service, isfile, cache_expired
+from WMCore.Services.Service import Service, isfile, cache_expired, MemoryCache, pruneCacheDir
 from WMQuality.TestInitCouchApp import TestInitCouchApp as TestInit
 
 
@@ -301,6 +301,102 @@ class ServiceTest(unittest.TestCase):
         self.logger.info('6th call to refreshCache - should fail, cache is dead now')
         self.assertRaises(HTTPException, service.refreshCache, cache, '/lies')
 
+    def testMemoryCache(self):
+        """LRU eviction within the byte limit"""
+        cache = MemoryCache(10)
+        cache.set('a', 'aaaa', 1)
+        cache.set('b', 'bbbb', 2)
+        self.assertEqual(cache.get('a'), ('aaaa', 1))
+        # b is now the least recently used
+        cache.set('c', 'cccc', 3)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual((len(cache), cache.size), (2, 8))
+        cache.set('a', 'a', 4)
+        self.assertEqual((cache.get('a'), cache.size), (('a', 4), 5))
+        # too big to be cached at all
+        cache.set('d', 'd' * 11, 5)
+        self.assertEqual((len(cache), cache.get('d')), (2, None))
+        cache.remove('c')
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def testPruneCacheDir(self):
+        """Oldest cache files are removed first, other files are left alone"""
+        now = time.time()
+        for i, name in enumerate(['123_GET_a', '-45_POST_b', '6_GET_c', 'service.log']):
+            path = os.path.join(self.testDir, name)
+            with open(path, 'w') as f:
+                f.write('x' * 10)
+            os.utime(path, (now - 100 + i, now - 100 + i))
+        self.assertEqual(pruneCacheDir(self.testDir, 25), 1)
+        self.assertEqual(sorted(os.listdir(self.testDir)), ['-45_POST_b', '6_GET_c', 'service.log'])
+        self.assertEqual(pruneCacheDir(self.testDir, 0), 2)
+        self.assertEqual(os.listdir(self.testDir), ['service.log'])
+
+    def testCacheTiers(self):
+        """Cache files are served from memory, then from disk once they change"""
+        myConfig = {'logger': self.logger,
+                    'endpoint': 'http://cmssw.cvs.cern.ch',
+                    'cacheduration': 1,
+                    'staleduration': 1}
+        service = Service(myConfig)
+        cache = 'tierscachetest'
+        cachefile = service.cacheFileName(cache)
+        with open(cachefile, 'w') as f:
+            f.write('first')
+
+        self.assertEqual(service.refreshCache(cache, '/lies').read(), 'first')
+        with service.refreshCache(cache, '/lies') as fd:
+            self.assertEqual(fd.read(), 'first')
+        self.assertEqual(service.refreshCache(cache, '/lies', openfile=False), cachefile)
+        stats = service.getCacheStats()
+        self.assertEqual((stats['diskHits'], stats['memoryHits'], stats['misses']), (2, 1, 0))
+        self.assertEqual((stats['memoryEntries'], stats['memoryBytes']), (1, 5))
+
+        # updated by someone else, the memory copy is not valid anymore
+        with open(cachefile, 'w') as f:
+            f.write('second')
+        os.utime(cachefile, (time.time() + 10, time.time() + 10))
+        self.assertEqual(service.refreshCache(cache, '/lies').read(), 'second')
+        self.assertEqual(service.getCacheStats()['diskHits'], 3)
+
+        # expired but within staleduration, served while refreshed in the background
+        os.utime(cachefile, (time.time() - 5400, time.time() - 5400))
+        self.assertEqual(service.refreshCache(cache, '/lies').read(), 'second')
+        self.assertEqual(service.getCacheStats()['staleHits'], 1)
+
+        # dead, it has to be fetched
+        os.utime(cachefile, (time.time() - 9000, time.time() - 9000))
+        self.assertRaises(HTTPException, service.refreshCache, cache, '/lies')
+        self.assertEqual(service.getCacheStats()['misses'], 1)
+
+        service.clearCache(cache)
+        self.assertEqual(service.getCacheStats()['memoryEntries'], 0)
+
+    def testBackgroundRefresh(self):
+        """Stale cache files are refreshed with a Requests instance of their own"""
+        myConfig = {'logger': self.logger,
+                    'endpoint': 'http://cmssw.cvs.cern.ch',
+                    'cacheduration': 1,
+                    'staleduration': 1}
+        service = Service(myConfig)
+        cache = 'refreshcachetest'
+        cachefile = service.cacheFileName(cache)
+        with open(cachefile, 'w') as f:
+            f.write('stale')
+        os.utime(cachefile, (time.time() - 5400, time.time() - 5400))
+
+        usedRequests = []
+        service.getData = lambda cachefile, *args, **kwargs: usedRequests.append(kwargs.get('requests'))
+        self.assertEqual(service.refreshCache(cache, '/lies').read(), 'stale')
+        for _ in range(50):
+            if not service._refreshing:
+                break
+            time.sleep(0.1)
+        self.assertEqual(len(usedRequests), 1)
+        self.assertTrue(isinstance(usedRequests[0], Requests))
+        self.assertFalse(usedRequests[0] is service['requests'])
+
     def testCacheFileName(self):
         """Hash url + data to get cache file name"""
         hashes = {}
@@ -8,7 +8,10 @@ import os
 import tempfile
 import unittest
 
-from WMCore.Services.pycurl_manager import RequestHandler, ResponseHeader, getdata, cern_sso_cookie
+import pycurl
+
+from WMCore.Services.pycurl_manager import RequestHandler, ResponseHeader, getdata, cern_sso_cookie, \
+    CurlHandlePool
 
 
 class PyCurlManager(unittest.TestCase):
@@ -42,6 +45,45 @@ class PyCurlManager(unittest.TestCase):
                 headers += 1
         self.assertTrue(headers, 3)
 
+    def testHandlePool(self):
+        """
+        Test reuse, size limit and idle eviction of the curl handle pool.
+        """
+        pool = CurlHandlePool(size=1, idleTimeout=300)
+        url1 = "https://cmsweb.cern.ch/dbs/prod/global/DBSReader/help"
+        url2 = "https://cmsweb.cern.ch/dbs/prod/global/DBSReader/datatiers"
+        curl1 = pool.getHandle(url1)
+        curl2 = pool.getHandle(url2)
+        self.assertNotEqual(curl1, curl2)
+        pool.releaseHandle(url1, curl1)
+        pool.releaseHandle(url2, curl2)
+        self.assertEqual(pool.numIdle(), 1)
+        # same host, the idle handle is reused
+        self.assertEqual(pool.getHandle(url2), curl1)
+        self.assertEqual(pool.numIdle(url1), 0)
+        self.assertEqual((pool.created, pool.reused), (2, 1))
+
+        # a forked process doesn't reuse the handles of its parent
+        pool.releaseHandle(url1, curl1)
+        pid = os.fork()
+        if pid == 0:
+            os._exit(0 if pool.numIdle() == 0 and pool.getHandle(url1) != curl1 else 1)
+        self.assertEqual(os.waitpid(pid, 0)[1], 0)
+        self.assertEqual(pool.numIdle(), 1)
+
+        pool.idleTimeout = -1
+        self.assertNotEqual(pool.getHandle(url1), curl1)
+        self.assertEqual(pool.numIdle(), 0)
+
+        mgr = RequestHandler({'pool_size': 2})
+        self.assertEqual(mgr.pool.size, 2)
+        # the handle of a failed transfer is not reused
+        url = "http://localhost:1/nothing"
+        self.assertRaises(pycurl.error, mgr.request, url, {})
+        self.assertEqual(mgr.pool.numIdle(url), 0)
+        self.assertEqual(mgr.pool.created, 1)
+        self.assertEqual(RequestHandler().pool, self.mgr.pool)
+
     def testSingle(self):
         """
         Test single call to CERN SSO url.
@@ -193,6 +193,35 @@ class TrivialFileCatalogTest(unittest.TestCase):
         pfn = tfc.matchLFN('srmv2', in_lfn)
         self.assertEqual(out_pfn, pfn)
 
+    def testMatchLFNs(self):
+        """
+        Match a batch of LFNs, including chained rules, and check that the
+        cached results are dropped when a mapping is added.
+
+        """
+        tfc = TrivialFileCatalog()
+        tfc.addMapping("direct", "/+store/temp/(.*)", "/tmp/$1", mapping_type="lfn-to-pfn")
+        tfc.addMapping("direct", "/+(.*)", "/castor/cern.ch/cms/$1", mapping_type="lfn-to-pfn")
+        tfc.addMapping("srmv2", "/+castor/(.*)", "srm://srm.cern.ch/castor/$1",
+                       chain="direct", mapping_type="lfn-to-pfn")
+
+        lfns = ["/store/data/a.root", "/store/temp/b.root", "/store/data/a.root"]
+        self.assertEqual(tfc.matchLFNs("direct", lfns),
+                         {"/store/data/a.root": "/castor/cern.ch/cms/store/data/a.root",
+                          "/store/temp/b.root": "/tmp/b.root"})
+        self.assertEqual(tfc.matchLFNs("srmv2", lfns),
+                         {"/store/data/a.root": "srm://srm.cern.ch/castor/cern.ch/cms/store/data/a.root",
+                          "/store/temp/b.root": None})
+        self.assertEqual(tfc.matchLFNs("dcap", lfns[:1]), {"/store/data/a.root": None})
+
+        tfc.addMapping("dcap", "/+(.*)", "dcap://dcap.cern.ch/$1", mapping_type="lfn-to-pfn")
+        self.assertEqual(tfc.matchLFN("dcap", lfns[0]), "dcap://dcap.cern.ch/store/data/a.root")
+
+        tfc.cacheSize = 2
+        tfc.matchLFNs("direct", ["/store/%s" % i for i in range(10)])
+        self.assertEqual(len(tfc._matchCache), 2)
+        self.assertEqual(tfc.matchLFN("direct", "/store/0"), "/castor/cern.ch/cms/store/0")
+
 
 if __name__ == "__main__":
     unittest.main()
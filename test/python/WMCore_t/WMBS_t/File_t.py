@@ -12,7 +12,7 @@ import unittest
 from WMCore.DAOFactory import DAOFactory
 from WMCore.DataStructs.File import File as WMFile
 from WMCore.DataStructs.Run import Run
-from WMCore.WMBS.File import File, addFilesToWMBSInBulk
+from WMCore.WMBS.File import File, addFilesToWMBSInBulk, lineageLevel
 from WMCore.WMBS.Fileset import Fileset
 from WMCore.WMBS.Job import Job
 from WMCore.WMBS.JobGroup import JobGroup
@@ -689,6 +689,60 @@ class FileTest(unittest.TestCase):
 
         return
 
+    def testGetLineage(self):
+        """
+        _testGetLineage_
+
+        Load the ancestors and descendants of several files at once and
+        verify the adjacency dictionary and the files at every level.
+        D is the only unmerged file.
+        """
+        testFiles = {}
+        for name in "ABCDEF":
+            testFile = File(lfn="/this/is/a/lfn%s" % name, size=1024, events=10,
+                            checksums={'cksum': 1}, locations="T1_US_FNAL_Disk",
+                            merged=(name != "D"))
+            testFile.create()
+            testFiles[name] = testFile
+
+        testFiles["A"].addParent(lfn="/this/is/a/lfnB")
+        testFiles["A"].addParent(lfn="/this/is/a/lfnC")
+        testFiles["B"].addParent(lfn="/this/is/a/lfnD")
+        testFiles["C"].addParent(lfn="/this/is/a/lfnD")
+        testFiles["D"].addParent(lfn="/this/is/a/lfnE")
+        testFiles["F"].addParent(lfn="/this/is/a/lfnE")
+        ids = dict((name, testFile["id"]) for name, testFile in testFiles.items())
+
+        lineage = testFiles["A"].getLineage([ids["A"], ids["F"]], level=5)
+        self.assertEqual(lineage, {ids["A"]: set([ids["B"], ids["C"]]),
+                                   ids["B"]: set([ids["D"]]),
+                                   ids["C"]: set([ids["D"]]),
+                                   ids["D"]: set([ids["E"]]),
+                                   ids["F"]: set([ids["E"]])})
+        self.assertEqual(lineageLevel(lineage, [ids["A"]], 2), [ids["D"]])
+        self.assertEqual(lineageLevel(lineage, [ids["A"], ids["F"]], 1),
+                         sorted([ids["B"], ids["C"], ids["E"]]))
+        self.assertEqual(lineageLevel(lineage, [ids["A"]], 4), [])
+
+        lineage = testFiles["A"].getLineage([ids["A"]], level=1)
+        self.assertEqual(lineage, {ids["A"]: set([ids["B"], ids["C"]])})
+
+        lineage = testFiles["E"].getLineage([ids["E"]], level=2, ancestors=False)
+        self.assertEqual(lineage, {ids["E"]: set([ids["D"], ids["F"]]),
+                                   ids["D"]: set([ids["B"], ids["C"]])})
+
+        ancestors = testFiles["A"].getAncestors(level=2, type="file")
+        self.assertEqual(len(ancestors), 1)
+        self.assertEqual(ancestors[0]["lfn"], "/this/is/a/lfnD")
+        self.assertEqual(ancestors[0]["checksums"], {'cksum': '1'})
+        self.assertFalse(ancestors[0]["merged"])
+
+        ancestors = testFiles["A"].getAncestors(level=1, type="file")
+        self.assertEqual(sorted(ancestor["lfn"] for ancestor in ancestors),
+                         ["/this/is/a/lfnB", "/this/is/a/lfnC"])
+        self.assertTrue(all(ancestor["merged"] for ancestor in ancestors))
+        return
+
     def testGetLocationBulk(self):
         """
         _testGetLocationBulk_
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""
+_JobArchive_t_
+
+Unit tests for the job archives
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from WMCore.DataStructs.Job import Job
+from WMCore.WMBS.JobArchive import (JobArchive, JobArchiveException, JobLoader,
+                                    archivePath, writeJobArchive)
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+class JobArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.collectionDir = os.path.join(self.testDir, "JobCollection_1_0")
+        os.mkdir(self.collectionDir)
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir, ignore_errors=True)
+        return
+
+    def makeJob(self, jobID):
+        job = Job(name="job_%d" % jobID)
+        job['id'] = jobID
+        job['cache_dir'] = os.path.join(self.collectionDir, "job_%d" % jobID)
+        job['possiblePSN'] = set(["T1_US_FNAL"])
+        os.mkdir(job['cache_dir'])
+        return job
+
+    def testArchive(self):
+        """
+        _testArchive_
+
+        Write an archive, read jobs back by id, add jobs to it.
+        """
+        jobs = [self.makeJob(jobID) for jobID in range(1, 11)]
+        filename = archivePath(jobs[0]['cache_dir'])
+        self.assertEqual(filename, os.path.join(self.collectionDir, "jobs.archive"))
+        writeJobArchive(filename, jobs[:5])
+
+        with JobArchive(filename) as archive:
+            self.assertEqual(archive.jobIDs(), [1, 2, 3, 4, 5])
+            self.assertTrue(3 in archive)
+            self.assertFalse(6 in archive)
+            job = archive.getJob(3)
+            self.assertEqual(job['name'], "job_3")
+            self.assertEqual(job['possiblePSN'], set(["T1_US_FNAL"]))
+            self.assertRaises(KeyError, archive.getJob, 6)
+
+        # new jobs are added, rewritten jobs replaced
+        jobs[0]['name'] = "renamed"
+        writeJobArchive(filename, jobs[5:] + jobs[:1])
+        with JobArchive(filename) as archive:
+            self.assertEqual(len(archive), 10)
+            self.assertEqual(archive.getJob(1)['name'], "renamed")
+            self.assertEqual(archive.getJob(10)['name'], "job_10")
+        self.assertEqual(os.listdir(self.collectionDir).count("jobs.archive"), 1)
+
+        with open(filename, "wb") as handle:
+            handle.write(b"garbage\n")
+        self.assertRaises(JobArchiveException, JobArchive, filename)
+        return
+
+    def testJobLoader(self):
+        """
+        _testJobLoader_
+
+        Jobs are loaded from the archives or from their job.pkl files.
+        """
+        jobs = [self.makeJob(jobID) for jobID in range(1, 4)]
+        writeJobArchive(archivePath(jobs[0]['cache_dir']), jobs[:2])
+        with open(os.path.join(jobs[2]['cache_dir'], "job.pkl"), "wb") as handle:
+            pickle.dump(jobs[2], handle, pickle.HIGHEST_PROTOCOL)
+        otherJob = self.makeJob(4)
+
+        loader = JobLoader(maxOpen=1)
+        for job in jobs:
+            self.assertTrue(loader.exists(job['cache_dir'], job['id']))
+            self.assertEqual(loader.load(job['cache_dir'], job['id'])['name'], job['name'])
+        self.assertFalse(loader.exists(otherJob['cache_dir'], otherJob['id']))
+        self.assertRaises(IOError, loader.load, otherJob['cache_dir'], otherJob['id'])
+
+        # jobs in other collections, only the last one stays open
+        otherCollection = os.path.join(self.testDir, "JobCollection_2_0")
+        os.mkdir(otherCollection)
+        self.assertFalse(loader.exists(os.path.join(otherCollection, "job_5"), 5))
+        self.assertEqual(len(loader._archives), 1)
+        self.assertEqual(loader.load(jobs[0]['cache_dir'], 1)['name'], "job_1")
+        loader.close()
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
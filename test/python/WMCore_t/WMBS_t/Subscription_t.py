@@ -1513,6 +1513,63 @@ class SubscriptionTest(unittest.TestCase):
         testFileF.delete()
         return
 
+    def testFilesOfStatusBulkLoad(self):
+        """
+        _testFilesOfStatusBulkLoad_
+
+        Verify that the checksums, run/lumis and locations of the subscription
+        files are loaded for the whole set of files.
+        """
+        testWorkflow = Workflow(spec="spec.xml", owner="Simon",
+                                name="wf001", task='Test')
+        testWorkflow.create()
+
+        testFileset = Fileset(name="TestFileset")
+        testFileset.create()
+
+        testFiles = []
+        for i in range(5):
+            testFile = File(lfn="/this/is/a/lfn%s" % i, size=1024, events=20,
+                            checksums={"cksum": str(100 + i), "adler32": "ab%s" % i},
+                            locations={"goodse.cern.ch"})
+            testFile.addRun(Run(1, *[2 * i, 2 * i + 1]))
+            testFile.create()
+            testFileset.addFile(testFile)
+            testFiles.append(testFile)
+        testFile = File(lfn="/this/is/a/lfnNoChecksum", size=1024, events=20,
+                        locations={"goodse.cern.ch"})
+        testFile.create()
+        testFileset.addFile(testFile)
+        testFileset.commit()
+
+        testSubscription = Subscription(fileset=testFileset,
+                                        workflow=testWorkflow)
+        testSubscription.create()
+
+        availableFiles = testSubscription.filesOfStatus("Available", loadRunLumi=True)
+        self.assertEqual(len(availableFiles), 6)
+        for availableFile in availableFiles:
+            self.assertEqual(availableFile["locations"], {"goodse.cern.ch"})
+            if availableFile["lfn"] == "/this/is/a/lfnNoChecksum":
+                self.assertEqual(availableFile["checksums"], {})
+                self.assertEqual(len(availableFile["runs"]), 0)
+                continue
+            i = int(availableFile["lfn"][-1])
+            self.assertEqual(availableFile["checksums"],
+                             {"cksum": str(100 + i), "adler32": "ab%s" % i})
+            self.assertEqual(len(availableFile["runs"]), 1)
+            run = list(availableFile["runs"])[0]
+            self.assertEqual(run.run, 1)
+            self.assertEqual(sorted(run.lumis), [2 * i, 2 * i + 1])
+
+        # run/lumis are not loaded by default
+        availableFiles = testSubscription.filesOfStatus("Available", loadChecksums=False)
+        for availableFile in availableFiles:
+            self.assertEqual(availableFile["checksums"], {})
+            self.assertEqual(len(availableFile["runs"]), 0)
+
+        return
+
     def testJobs(self):
         """
         _testJobs_
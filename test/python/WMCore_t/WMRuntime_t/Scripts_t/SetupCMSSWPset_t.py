@@ -22,6 +22,7 @@ from WMCore.WMSpec.WMStep import WMStep
 from WMCore.WMSpec.Steps.Templates.CMSSW import CMSSWStepHelper
 from WMCore.WMSpec.Steps import StepFactory
 from WMCore.WMSpec.Steps.Fetchers.PileupFetcher import PileupFetcher
+from WMCore.WMRuntime.Tools.PileupConfig import PileupConfig
 from WMCore.Storage.SiteLocalConfig import loadSiteLocalConfig
 from WMQuality.TestInit import TestInit
 import WMCore.WMBase
@@ -285,8 +286,10 @@ class SetupCMSSWPsetTest(unittest.TestCase):
         mixModules, dataMixModules = setupScript._getPileupMixingModules()
 
         # load in the pileup configuration in the form of dict which
-        # PileupFetcher previously saved in a JSON file
-        pileupDict = setupScript._getPileupConfigFromJson()
+        # PileupFetcher previously saved in the job sandbox
+        pileupConfigFile = os.path.join(setupScript.stepSpace.location, "pileupconf.json")
+        with PileupConfig(pileupConfigFile) as pileupConfig:
+            pileupDict = pileupConfig.getPileupDict()
 
         # get the sub dict for particular pileup type
         # for pileupDict structure description - see PileupFetcher._queryDbsAndGetPileupConfig
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""
+_PileupConfig_t_
+
+Unit tests for the compact pileup configuration format
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from WMCore.WMRuntime.Tools.PileupConfig import (PileupConfig, compressLFNs, expandLFNs,
+                                                 writePileupConfig)
+
+
+class PileupConfigTest(unittest.TestCase):
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        self.pileupDict = {
+            "mc": {"/MinBias/Run-v1/GEN-SIM#1": {"FileList": [{"logical_file_name": "/store/mc/MinBias/2.root"},
+                                                              {"logical_file_name": "/store/mc/MinBias/1.root"}],
+                                                 "NumberOfEvents": 200,
+                                                 "PhEDExNodeNames": ["T1_US_FNAL_Disk", "T2_CH_CERN"]},
+                   "/MinBias/Run-v1/GEN-SIM#2": {"FileList": [{"logical_file_name": "/store/mc/MinBias/3.root"}],
+                                                 "NumberOfEvents": 100,
+                                                 "PhEDExNodeNames": ["T2_CH_CERN"]},
+                   "/MinBias/Run-v1/GEN-SIM#3": {"FileList": [{"logical_file_name": "/store/mc/MinBias/4.root"}],
+                                                 "NumberOfEvents": 50,
+                                                 "PhEDExNodeNames": []}},
+            "data": {"/Data/Run-v1/RAW#1": {"FileList": [{"logical_file_name": "/store/data/Run/1.root"}],
+                                            "NumberOfEvents": 10,
+                                            "PhEDExNodeNames": ["T1_US_FNAL_Disk"]}}}
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir, ignore_errors=True)
+        return
+
+    def testCompressLFNs(self):
+        """
+        _testCompressLFNs_
+
+        LFNs are sorted and share the prefix of the previous one.
+        """
+        lfns = ["/store/b/2.root", "/store/a/1.root", "/store/b/10.root", "/other.root"]
+        entries = compressLFNs(lfns)
+        self.assertEqual(entries, [[0, "/other.root"], [1, "store/a/1.root"],
+                                   [7, "b/10.root"], [9, "2.root"]])
+        self.assertEqual(list(expandLFNs(entries)), sorted(lfns))
+        self.assertEqual(compressLFNs([]), [])
+        return
+
+    def testReadWrite(self):
+        """
+        _testReadWrite_
+
+        Write the configuration and read it back, selecting blocks by PNN.
+        """
+        filename = os.path.join(self.testDir, "pileupconf.json")
+        writePileupConfig(filename, self.pileupDict)
+
+        with PileupConfig(filename) as config:
+            self.assertEqual(sorted(config.pileupTypes()), ["data", "mc"])
+            self.assertEqual(config.blockNames("mc"), sorted(self.pileupDict["mc"]))
+            self.assertEqual(config.blockNames("mc", "T1_US_FNAL_Disk"), ["/MinBias/Run-v1/GEN-SIM#1"])
+            self.assertEqual(config.blockNames("mc", "T2_CH_CERN"),
+                             ["/MinBias/Run-v1/GEN-SIM#1", "/MinBias/Run-v1/GEN-SIM#2"])
+            self.assertEqual(config.blockNames("mc", "T2_DE_DESY"), [])
+            self.assertEqual(config.blockNames("cosmics"), [])
+            self.assertEqual(config.blockInfo("mc", "/MinBias/Run-v1/GEN-SIM#1"),
+                             {"NumberOfEvents": 200, "PhEDExNodeNames": ["T1_US_FNAL_Disk", "T2_CH_CERN"]})
+            self.assertEqual(list(config.blockFiles("mc", "/MinBias/Run-v1/GEN-SIM#1")),
+                             ["/store/mc/MinBias/1.root", "/store/mc/MinBias/2.root"])
+            self.assertEqual(list(config.blockFiles("data", "/Data/Run-v1/RAW#1")),
+                             ["/store/data/Run/1.root"])
+
+            pileupDict = config.getPileupDict()
+            self.assertEqual(sorted(pileupDict["mc"]), sorted(self.pileupDict["mc"]))
+            self.assertEqual(len(pileupDict["mc"]["/MinBias/Run-v1/GEN-SIM#1"]["FileList"]), 2)
+            pileupDict = config.getPileupDict("T1_US_FNAL_Disk")
+            self.assertEqual(list(pileupDict["data"]), ["/Data/Run-v1/RAW#1"])
+            self.assertEqual(list(pileupDict["mc"]), ["/MinBias/Run-v1/GEN-SIM#1"])
+        return
+
+    def testFormerFormat(self):
+        """
+        _testFormerFormat_
+
+        A configuration in the JSON format is read through the same interface.
+        """
+        filename = os.path.join(self.testDir, "pileupconf.json")
+        with open(filename, "w") as handle:
+            json.dump(self.pileupDict, handle)
+
+        with PileupConfig(filename) as config:
+            self.assertEqual(sorted(config.pileupTypes()), ["data", "mc"])
+            self.assertEqual(config.blockNames("mc", "T2_CH_CERN"),
+                             ["/MinBias/Run-v1/GEN-SIM#1", "/MinBias/Run-v1/GEN-SIM#2"])
+            self.assertEqual(config.blockInfo("data", "/Data/Run-v1/RAW#1")["NumberOfEvents"], 10)
+            self.assertEqual(sorted(config.blockFiles("mc", "/MinBias/Run-v1/GEN-SIM#1")),
+                             ["/store/mc/MinBias/1.root", "/store/mc/MinBias/2.root"])
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,7 +8,6 @@ from __future__ import print_function
 
 import os
 import unittest
-from json import JSONDecoder
 
 import WMCore.WMSpec.WMStep as WMStep
 import WMCore.WMSpec.WMTask as WMTask
@@ -16,6 +15,7 @@ from WMCore.Database.CMSCouch import CouchServer, Document
 from WMCore.Services.DBS.DBS3Reader import DBS3Reader
 from WMCore.Services.PhEDEx.PhEDEx import PhEDEx
 from WMCore.WMRuntime.SandboxCreator import SandboxCreator
+from WMCore.WMRuntime.Tools.PileupConfig import PileupConfig
 from WMCore.WMSpec.StdSpecs.TaskChain import TaskChainWorkloadFactory
 from WMCore.WMSpec.Steps.Fetchers.PileupFetcher import PileupFetcher
 from WMCore.WMSpec.WMWorkloadTools import parsePileupConfig
@@ -132,15 +132,11 @@ class PileupFetcherTest(EmulatedUnitTestCase):
             helper = WMStep.WMStepHelper(step)
             # returns e.g. instance of CMSSWHelper
             if hasattr(helper.data, "pileup"):
-                decoder = JSONDecoder()
-
                 stepPath = "%s/%s" % (taskPath, helper.name())
                 pileupConfig = "%s/%s" % (stepPath, "pileupconf.json")
                 try:
-                    f = open(pileupConfig, 'r')
-                    json = f.read()
-                    pileupDict = decoder.decode(json)
-                    f.close()
+                    with PileupConfig(pileupConfig) as config:
+                        pileupDict = config.getPileupDict()
                 except IOError:
                     m = "Could not read pileup JSON configuration file: '%s'" % pileupConfig
                     self.fail(m)
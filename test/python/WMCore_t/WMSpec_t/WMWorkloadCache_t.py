@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+_WMWorkloadCache_t_
+
+Unit tests for the workload spec cache
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from WMCore.WMSpec.WMWorkload import newWorkload
+from WMCore.WMSpec.WMWorkloadCache import WMWorkloadCache
+
+
+class WMWorkloadCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.testDir = tempfile.mkdtemp()
+        return
+
+    def tearDown(self):
+        shutil.rmtree(self.testDir, ignore_errors=True)
+        return
+
+    def saveWorkload(self, name):
+        workload = newWorkload(name)
+        workload.newTask("Processing")
+        specPath = os.path.join(self.testDir, "%s.pkl" % name)
+        workload.save(specPath)
+        return specPath
+
+    def testCache(self):
+        """
+        _testCache_
+
+        Specs are loaded once, reloaded when the file changes and evicted
+        in LRU order.
+        """
+        cache = WMWorkloadCache(maxEntries=2)
+        specPath1 = self.saveWorkload("Workload1")
+        specPath2 = self.saveWorkload("Workload2")
+
+        helper = cache.getWorkload(specPath1)
+        self.assertEqual(helper.name(), "Workload1")
+        self.assertTrue(cache.getWorkload(specPath1).data is helper.data)
+        self.assertEqual(cache.getWorkload("file:" + specPath1).name(), "Workload1")
+
+        # copies are not shared
+        copyHelper = cache.getWorkload(specPath1, copy=True)
+        self.assertFalse(copyHelper.data is helper.data)
+        self.assertEqual(copyHelper.listAllTaskPathNames(), ["/Workload1/Processing"])
+
+        stats = cache.getStats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (3, 1, 1))
+
+        # a rewritten spec is loaded again
+        workload = newWorkload("Workload1")
+        workload.newTask("Merge")
+        workload.save(specPath1)
+        os.utime(specPath1, (0, 0))
+        self.assertEqual(cache.getWorkload(specPath1).listAllTaskPathNames(), ["/Workload1/Merge"])
+        self.assertEqual(cache.getStats()['invalidated'], 1)
+
+        specPath3 = self.saveWorkload("Workload3")
+        cache.getWorkload(specPath2)
+        cache.getWorkload(specPath1)
+        cache.getWorkload(specPath3)
+        stats = cache.getStats()
+        self.assertEqual((stats['entries'], stats['evicted']), (2, 1))
+        # Workload2 was the least recently used
+        misses = stats['misses']
+        cache.getWorkload(specPath2)
+        self.assertEqual(cache.getStats()['misses'], misses + 1)
+
+        cache.clear()
+        self.assertEqual(cache.getStats()['entries'], 0)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -87,6 +87,44 @@ class DataCacheTests(unittest.TestCase):
         self.assertEqual("amaltaro_TaskChain_InclParents_HG1812_Validation_181203_121005_1483",
                          data[0]['RequestName'])
 
+    def testIndexedFilter(self):
+        data = list(DataCache.filterDataByRequest(filterDict={'RequestStatus': 'acquired'},
+                                                  maskList=['RequestType']))
+        self.assertEqual(18, len(data))
+
+        data = list(DataCache.filterDataByRequest(filterDict={'RequestStatus': ['failed', 'assignment-approved'],
+                                                              'RequestType': 'ReReco'},
+                                                  maskList=['RequestStatus']))
+        self.assertEqual(["failed"], [item['RequestStatus'] for item in data])
+
+        data = list(DataCache.filterData(filterDict={'RequestType': 'ReReco', 'IncludeParents': 'True'},
+                                         maskList=['RequestName']))
+        self.assertEqual(["amaltaro_ReReco_Parents_HG1812_Validation_181203_121714_7387"], data)
+
+        data = list(DataCache.filterData(filterDict={'RequestStatus': 'closed-out'}, maskList=['RequestName']))
+        self.assertEqual([], data)
+
+    def testUpdateRequests(self):
+        reqName = "amaltaro_ReReco_RunBlockWhite_HG1812_Validation_181203_121031_9539"
+        failedName = "amaltaro_ReReco_BlockWhiteBlack_HG1812_Validation_181203_121036_1728"
+        cacheTime = DataCache._lastedActiveDataFromAgent["time"]
+        self.assertEqual(5, len(list(DataCache.filterData({'RequestType': 'ReReco'}, ['RequestName']))))
+
+        newDoc = dict(DataCache.getlatestJobData()[reqName])
+        newDoc['RequestStatus'] = 'running-open'
+        newDoc['RequestName'] = reqName + "_new"
+        DataCache.updateRequests({newDoc['RequestName']: newDoc}, [reqName, failedName])
+
+        self.assertEqual(19, len(DataCache.getlatestJobData()))
+        self.assertEqual(cacheTime, DataCache._lastedActiveDataFromAgent["time"])
+        data = list(DataCache.filterData({'RequestType': 'ReReco'}, ['RequestName']))
+        self.assertEqual(4, len(data))
+        self.assertTrue(reqName + "_new" in data)
+        self.assertFalse(reqName in data)
+        data = list(DataCache.filterData({'RequestStatus': 'running-open'}, ['RequestName']))
+        self.assertEqual([reqName + "_new"], data)
+
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -122,6 +122,29 @@ class WorkQueueElementTest(unittest.TestCase):
         self.assertTrue(ele.passesSiteRestriction("T1_IT_CNAF"))
         self.assertFalse(ele.passesSiteRestriction("T2_DE_DESY"))
 
+    def testSitesPassingRestrictions(self):
+        """
+        Workqueue element site restriction check for a list of sites
+        """
+        sites = ["T1_US_FNAL", "T1_IT_CNAF", "T2_CH_CERN", "T2_DE_DESY"]
+        ele = WorkQueueElement(SiteWhitelist=["T1_IT_CNAF", "T2_DE_DESY"], SiteBlacklist=["T1_US_FNAL"])
+        self.assertEqual(ele.sitesPassingRestrictions(sites), set(["T1_IT_CNAF", "T2_DE_DESY"]))
+
+        ele['Inputs'] = {"/MY/BLOCK/NAME#73e99a52": ["T1_US_FNAL", "T2_DE_DESY"]}
+        self.assertEqual(ele.sitesPassingRestrictions(sites), set(["T2_DE_DESY"]))
+        ele['ParentFlag'] = True
+        ele['ParentData'] = {"/MY/BLOCK2/NAME#002590494c06": ["T1_IT_CNAF"]}
+        self.assertEqual(ele.sitesPassingRestrictions(sites), set())
+
+        # same result as the check site by site
+        ele['ParentData'] = {"/MY/BLOCK2/NAME#002590494c06": ["T1_IT_CNAF", "T2_DE_DESY"]}
+        ele['PileupData'] = {"/MY/PILEUP/NAME": ["T2_DE_DESY", "T2_CH_CERN"]}
+        self.assertEqual(ele.sitesPassingRestrictions(sites),
+                         set([site for site in sites if ele.passesSiteRestriction(site)]))
+        ele['NoInputUpdate'] = True
+        ele['NoPileupUpdate'] = True
+        self.assertEqual(ele.sitesPassingRestrictions(sites), set(["T1_IT_CNAF", "T2_DE_DESY"]))
+
     def testPassesSiteRestrictionLocationFlags(self):
         """
         Workqueue element site restriction check (same as workRestrictions)
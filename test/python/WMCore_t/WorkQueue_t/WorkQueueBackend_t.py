@@ -6,7 +6,7 @@
 import unittest
 import time
 from WMQuality.TestInitCouchApp import TestInitCouchApp as TestInit
-from WMCore.WorkQueue.WorkQueueBackend import WorkQueueBackend
+from WMCore.WorkQueue.WorkQueueBackend import SiteJobCounts, WorkQueueBackend
 from WMCore.WorkQueue.DataStructs.CouchWorkQueueElement import CouchWorkQueueElement
 from WMCore.WorkQueue.DataStructs.WorkQueueElement import WorkQueueElement
 
@@ -110,5 +110,25 @@ class WorkQueueBackendTest(unittest.TestCase):
         self.assertEqual(self.backend.db.loadView('WorkQueue', 'conflicts')['total_rows'], 0)
 
 
+
+class SiteJobCountsTest(unittest.TestCase):
+    def testJobsAtOrAbove(self):
+        """Cumulative job counts by priority follow the updates"""
+        siteJobCounts = {'T2_XX_SiteA': {10: 5, 20: 3}}
+        jobCounts = SiteJobCounts(siteJobCounts)
+        self.assertEqual(jobCounts.jobsAtOrAbove('T2_XX_SiteA', 5), 8)
+        self.assertEqual(jobCounts.jobsAtOrAbove('T2_XX_SiteA', 20), 3)
+        self.assertEqual(jobCounts.jobsAtOrAbove('T2_XX_SiteA', 21), 0)
+        self.assertEqual(jobCounts.jobsAtOrAbove('T2_XX_SiteB', 1), 0)
+
+        jobCounts.addJobs('T2_XX_SiteA', 20, 2)
+        self.assertEqual(jobCounts.jobsAtOrAbove('T2_XX_SiteA', 10), 10)
+        jobCounts.addJobs('T2_XX_SiteA', 15, 4)
+        jobCounts.addJobs('T2_XX_SiteB', 1, 1)
+        self.assertEqual(jobCounts.jobsAtOrAbove('T2_XX_SiteA', 11), 9)
+        self.assertEqual(jobCounts.jobsAtOrAbove('T2_XX_SiteB', 1), 1)
+        self.assertEqual(siteJobCounts, {'T2_XX_SiteA': {10: 5, 15: 4, 20: 5}, 'T2_XX_SiteB': {1: 1}})
+
+
 if __name__ == '__main__':
     unittest.main()